@@ -0,0 +1,25 @@
+import pytest
+
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.optimize import Optimizer
+from zai.stdlib.native_func import register_functions
+
+
+def _run_program(visitor, text, natives=(), optimize=False):
+    """
+    Evaluate text using visitor after defining the standard library natives along with
+    natives within its global scope. Return the environment of the visitor.
+    """
+    for func in register_functions() + list(natives):
+        visitor.env.peek().initialize_variable(func.name, func)
+    root = Parser(Lexer().tokenize_string(text), text).parse()
+    if optimize:
+        root = Optimizer().optimize(root)
+    visitor.visit(root)
+    return visitor.env
+
+
+@pytest.fixture
+def run_program():
+    return _run_program
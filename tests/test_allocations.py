@@ -0,0 +1,52 @@
+import threading
+
+from zai.vm import YaplVm
+from zai.allocations import AllocationTracker
+from zai.objects import IntObject
+
+PROGRAM = """func make(n) {
+    let arr = [];
+    for (i in range(0, n)) {
+        push(arr, "item" + "x");
+    }
+    return arr;
+}
+for (j in range(0, 5)) {
+    let a = make(10);
+}
+"""
+
+
+def test_allocation_tracker():
+    for explicit_stack in [False, True]:
+        tracker = AllocationTracker()
+        YaplVm(explicit_stack=explicit_stack, allocations=tracker).run_string(PROGRAM)
+
+        # Every string is created on line 4, three per iteration.
+        assert tracker.created["STR"] == 150
+        assert tracker.lines()[4] >= 150
+        # Only the array of the current call and the one held by "a" are ever alive.
+        assert tracker.created["ARRAY"] == 5 and tracker.peak_live["ARRAY"] <= 2
+        assert tracker.live["STR"] <= tracker.peak_live["STR"] < 150
+        assert tracker.created["Scope"] > 0
+        assert tracker.peak_memory > 0
+
+        string_nodes = [count for node, count in tracker.sites.items() if type(node).__name__ == "StringNode"]
+        assert string_nodes == [50, 50]
+        assert "push(arr" in tracker.report()
+
+    # Allocations are no longer recorded once the tracker stops.
+    int_count = tracker.created["INT"]
+    IntObject(1)
+    assert tracker.created["INT"] == int_count
+
+
+def test_allocation_tracker_ignores_other_threads():
+    tracker = AllocationTracker(trace_memory=False)
+    other_vm = YaplVm()
+    thread = threading.Thread(target=other_vm.run_string, args=(PROGRAM,))
+    tracker.start()
+    thread.start()
+    thread.join()
+    tracker.stop()
+    assert tracker.created == {} and tracker.sites == {}
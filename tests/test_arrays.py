@@ -0,0 +1,216 @@
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.objects import ArrayObject, IntObject, StringObject, FloatObject, new_array
+import tracemalloc
+
+
+def test_array_growth():
+    array = ArrayObject([])
+    for idx in range(0, 100):
+        array.append(IntObject(idx))
+    assert array.size == 100
+
+    assert array.pop().value == 99
+    array.insert(0, IntObject(-1))
+    assert array.size == 100
+    assert array.get_element(0).value == -1 and array.get_element(1).value == 0
+    assert ArrayObject([]).pop() is None
+
+
+def test_array_add_creates_new_array():
+    array = ArrayObject([IntObject(1)])
+    joined = array + ArrayObject([IntObject(2), IntObject(3)])
+    appended = array + IntObject(4)
+    assert array.size == 1
+    assert joined.size == 3 and str(joined) == "[1, 2, 3]"
+    assert appended.size == 2 and str(appended) == "[1, 4]"
+
+
+def test_array_natives(run_program, capsys):
+    text = """
+    let arr = [];
+    print arr;
+    reserve(arr, 10);
+    for (i in range(0, 5)) {
+        push(arr, i * 2);
+    }
+    let last = pop(arr);
+    insert(arr, 1, "x");
+    let size = len(arr);
+    let empty = pop([]);
+    let before_start = insert(arr, -1, "y");
+    let past_end = insert(arr, 6, "y");
+    let typed_past_end = insert([1, 2], 3, 3);
+    insert(arr, 5, "end");
+    print arr;
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("last").value == 8
+        assert env.peek().get_variable("size").value == 5
+        assert str(env.peek().get_variable("empty")) == "nil"
+        for name in ["before_start", "past_end", "typed_past_end"]:
+            assert str(env.peek().get_variable(name)) == "nil", name
+        assert capsys.readouterr().out.split("\n") == ["[]", "[0, x, 2, 4, 6, end]", ""]
+
+
+def test_typed_array_selection():
+    assert new_array([IntObject(1), IntObject(2)]).elem_type.name == "int64"
+    assert new_array([FloatObject(1.5)]).elem_type.name == "float64"
+    assert new_array([IntObject(1), FloatObject(2.0)]).elem_type is None
+    assert new_array([IntObject(2 ** 70)]).elem_type is None
+
+    # Empty arrays take the type of their first element.
+    array = new_array([])
+    array.append(IntObject(3))
+    assert array.elem_type.name == "int64"
+
+
+def test_typed_array_generalize():
+    array = new_array([IntObject(1), IntObject(2)])
+    array.set_element(0, IntObject(10))
+    assert array.elem_type is not None
+    assert array.get_element(0).value == 10
+
+    array.set_element(1, StringObject("a"))
+    assert array.elem_type is None
+    assert str(array) == "[10, a]"
+
+
+def test_typed_array_memory():
+    def array_memory(array_func):
+        tracemalloc.start()
+        array = array_func([IntObject(idx) for idx in range(0, 100000)])
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert array.size == 100000
+        return memory
+
+    assert array_memory(new_array) * 5 < array_memory(ArrayObject)
+
+
+def test_typed_array_natives(run_program):
+    text = """
+    let bytes = typed_array("byte");
+    push(bytes, 255);
+    let byte_type = array_type(bytes);
+    push(bytes, 256);
+    let generic_type = array_type(bytes);
+    let bools = [true, false];
+    let total = 0;
+    for (value in [1, 2, 3]) {
+        total = total + value;
+    }
+    """
+    env = run_program(Visitor(EnvironmentStack()), text)
+    assert env.peek().get_variable("byte_type").value == "byte"
+    assert env.peek().get_variable("generic_type").value == "generic"
+    assert str(env.peek().get_variable("bools")) == "[True, False]"
+    assert env.peek().get_variable("total").value == 6
+
+
+def test_typed_array_rejects_division_result():
+    # Dividing integers produces an integer object holding a float.
+    assert new_array([IntObject(1), IntObject(7 / 2)]).elem_type is None
+
+
+def test_bulk_natives(run_program):
+    text = """
+    let arr = [5, 3, 9, 1];
+    let total = sum(arr);
+    let smallest = min(arr);
+    let largest = max(["pear", "apple"]);
+    let scaled = elem_add(elem_mul(arr, 2), [1, 1, 1, 1]);
+    let less = elem_lt(arr, 4);
+    let squares = map(arr, "square");
+    let odd = filter([1, 2, 3, 4, 5], "odd");
+    let position = index_of(arr, 9);
+    let missing = index_of(["a", 1], 2);
+    sort(arr);
+    let sorted_arr = arr;
+    let reversed_arr = reverse([1, "two", 3.0]);
+    let float_sum = sum(elem_add([1.5, 2.0], 1));
+    let mixed_sum = sum([1, "two"]);
+    let int_float_add = elem_add([1, 2], 1.5);
+    let unknown_map = map(arr, "sqrt");
+    let overflow = elem_mul([9223372036854775807], 2);
+    let halves_added = elem_add([3 / 2, 1], 1);
+    let halves_negated = map([3 / 2, 1], "neg");
+    """
+    expected = {
+        "total": "18",
+        "smallest": "1",
+        "largest": "pear",
+        "scaled": "[11, 7, 19, 3]",
+        "less": "[False, True, False, True]",
+        "squares": "[25, 9, 81, 1]",
+        "odd": "[1, 3, 5]",
+        "position": "2",
+        "missing": "-1",
+        "sorted_arr": "[1, 3, 5, 9]",
+        "reversed_arr": "[3.0, two, 1]",
+        "float_sum": "5.5",
+        "mixed_sum": "nil",
+        "int_float_add": "nil",
+        "unknown_map": "nil",
+        "overflow": "[18446744073709551614]",
+        "halves_added": "[2.5, 2]",
+        "halves_negated": "[-1.5, -1]",
+    }
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        for name, value in expected.items():
+            assert str(env.peek().get_variable(name)) == value, name
+
+
+def test_bulk_natives_keep_storage(run_program):
+    text = """
+    let bytes = typed_array("byte");
+    push(bytes, 200);
+    push(bytes, 3);
+    let filtered = array_type(filter(bytes, "odd"));
+    let added = array_type(elem_add(bytes, 100));
+    let sorted_type = array_type(sort(bytes));
+    """
+    env = run_program(Visitor(EnvironmentStack()), text)
+    assert env.peek().get_variable("filtered").value == "byte"
+    assert env.peek().get_variable("added").value == "int64"
+    assert env.peek().get_variable("sorted_type").value == "byte"
+
+
+def test_array_view_shares_storage():
+    array = new_array([IntObject(idx) for idx in range(0, 10)])
+    view = array.view(2, 8)
+    inner = view.view(1, 3)
+    assert view.elements.storage is array.elements
+    assert inner.elements.storage is array.elements and inner.elements.start == 3
+    assert [elem.value for elem in inner] == [3, 4]
+    assert view.get_element(-1).value == 7
+
+    # Modifying either array copies the storage first.
+    array.set_element(3, IntObject(99))
+    view.append(IntObject(100))
+    assert str(array) == "[0, 1, 2, 99, 4, 5, 6, 7, 8, 9]"
+    assert str(view) == "[2, 3, 4, 5, 6, 7, 100]"
+    assert str(inner) == "[3, 4]"
+
+
+def test_slice_native(run_program):
+    text = """
+    let arr = ["a", "b", "c", "d"];
+    let middle = slice(arr, 1, 3);
+    reverse(middle);
+    let empty = slice(arr, 2, 2);
+    let out_of_bounds = slice(arr, 1, 5);
+    let backwards = slice(arr, 3, 1);
+    let window_sum = sum(slice([1, 2, 3, 4], 1, 4));
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert str(env.peek().get_variable("arr")) == "[a, b, c, d]"
+        assert str(env.peek().get_variable("middle")) == "[c, b]"
+        assert str(env.peek().get_variable("empty")) == "[]"
+        assert str(env.peek().get_variable("out_of_bounds")) == "nil"
+        assert str(env.peek().get_variable("backwards")) == "nil"
+        assert env.peek().get_variable("window_sum").value == 9
@@ -0,0 +1,76 @@
+import asyncio
+
+from zai.vm import YaplVm
+
+FIRST = """let i = 0;
+while (i < 3) {
+    print "first";
+    i = i + 1;
+}
+"""
+SECOND = """for (j in range(0, 3)) {
+    print "second";
+}
+"""
+
+
+def test_concurrent_scripts(capsys):
+    async def run_both():
+        await asyncio.gather(YaplVm().run_string_async(FIRST, 1), YaplVm().run_string_async(SECOND, 1))
+
+    asyncio.run(run_both())
+    # Every loop iteration ends a slice, so the scripts take turns.
+    assert capsys.readouterr().out.split() == ["first", "second"] * 3
+
+
+def test_event_loop_stays_responsive(capsys):
+    text = """func fib(n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+print fib(12);
+"""
+
+    async def run_with_ticker():
+        ticks = list()
+        vm_task = asyncio.ensure_future(YaplVm(explicit_stack=True).run_string_async(text, 50))
+        while not vm_task.done():
+            ticks.append(1)
+            await asyncio.sleep(0)
+        return len(ticks)
+
+    # fib(12) takes 465 calls, so the loop gets to run after every 50 of them.
+    assert asyncio.run(run_with_ticker()) >= 465 // 50
+    assert capsys.readouterr().out == "144\n"
+
+
+def test_async_errors_and_cancellation(capsys):
+    vm = YaplVm(max_steps=100)
+
+    async def run_forever():
+        task = asyncio.ensure_future(vm.run_string_async("func spin() {\n    while (true) {\n    }\n}\nspin();\n", 10))
+        await task
+
+    asyncio.run(run_forever())
+    assert capsys.readouterr().out == "Runtime Error: Line 2, Column 5: Step budget of 100 steps exhausted!\n"
+
+    vm = YaplVm()
+
+    async def cancel():
+        task = asyncio.ensure_future(vm.run_string_async("let k = 0;\nwhile (true) {\n    k = k + 1;\n}\n", 10))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(cancel())
+    # Abandoned evaluations leave no scopes behind and the VM can be used again.
+    assert vm.env.stack_height == 0
+    vm.run_string("print k > 0;")
+    assert capsys.readouterr().out == "True\n"
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from zai.bench import (
+    Benchmark,
+    BenchmarkError,
+    load_suite,
+    run_benchmark,
+    run_suite,
+    compare,
+    main,
+    PARSE_BENCHMARK,
+)
+
+
+class FakeClock:
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def write_suite(suite_path):
+    (suite_path / "modules").mkdir(parents=True)
+    (suite_path / "modules" / "helper.zai").write_text("func twice(x) {\n    return 2 * x;\n}\n")
+    (suite_path / "double.zai").write_text("import helper\nprint helper.twice(21);\n")
+    (suite_path / "double.expected").write_text("42\n")
+    (suite_path / "loop.zai").write_text("let t = 0;\nfor (i in range(0, 10)) {\n    t = t + i;\n}\n")
+
+
+def test_run_suite(tmp_path):
+    write_suite(tmp_path)
+    benchmarks = load_suite(tmp_path)
+    assert [benchmark.name for benchmark in benchmarks] == ["double", "loop", PARSE_BENCHMARK]
+    assert [benchmark.name for benchmark in load_suite(tmp_path, name_filter="oo")] == ["loop"]
+
+    results = run_suite(benchmarks, warmup=1, repeat=3, suite_path=tmp_path)
+    for summary in results.values():
+        assert summary["runs"] == 3
+        assert summary["min"] <= summary["median"] <= summary["max"]
+        assert summary["ops_per_sec"] == pytest.approx(1 / summary["median"])
+
+    # Programs which do not print their expected output fail.
+    (tmp_path / "double.expected").write_text("41\n")
+    with pytest.raises(BenchmarkError):
+        run_suite(load_suite(tmp_path, name_filter="double"), suite_path=tmp_path)
+
+
+def test_run_benchmark_statistics():
+    runs = list()
+    benchmark = Benchmark("count", lambda: runs.append(1))
+    summary = run_benchmark(benchmark, warmup=2, repeat=4, clock=FakeClock(0.5))
+    assert len(runs) == 6
+    assert summary["runs"] == 4 and summary["median"] == 0.5 and summary["stdev"] == 0
+    assert summary["ops_per_sec"] == 2
+
+
+def test_regression_threshold(tmp_path, capsys):
+    results = {"fast": {"median": 1.05}, "slow": {"median": 1.5}, "new": {"median": 9.0}}
+    baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}}
+    assert [regression[0] for regression in compare(results, baseline, threshold=10)] == ["slow"]
+    assert compare(results, baseline, threshold=60) == []
+
+    write_suite(tmp_path)
+    baseline_path = tmp_path / "baseline.json"
+    args = ["--suite", str(tmp_path), "--filter", "loop", "--warmup", "0", "--repeat", "2"]
+    assert main(args + ["--save_baseline", str(baseline_path)]) == 0
+    saved = json.loads(baseline_path.read_text())["benchmarks"]
+    assert list(saved) == ["loop"]
+
+    # A baseline which is much faster than any real run makes the runner fail.
+    saved["loop"]["median"] = 1e-9
+    baseline_path.write_text(json.dumps({"benchmarks": saved}))
+    assert main(args + ["--baseline", str(baseline_path)]) == 1
+    assert "REGRESSION: loop" in capsys.readouterr().out
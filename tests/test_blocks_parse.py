@@ -34,6 +34,28 @@ def test_well_formed_block():
     assert isinstance(block_node.stmnts[0], nodes.ArithBinNode) and block_node.stmnts[0].op == TokType.PLUS
     assert isinstance(block_node.stmnts[0].left, nodes.IntNode) and block_node.stmnts[0].left.val == 1
     assert isinstance(block_node.stmnts[0].right, nodes.IntNode) and block_node.stmnts[0].right.val == 2
+    # Blocks which do not declare anything are evaluated in the enclosing scope
+    assert block_node.needs_scope is False
+
+
+def test_block_with_declaration():
+    tok_stream = [
+        Token(TokType.LCURLY),
+        Token(TokType.INT, 1),
+        Token(TokType.SEMIC),
+        Token(TokType.LET),
+        Token(TokType.ID, "id"),
+        Token(TokType.ASSIGN),
+        Token(TokType.INT, 4),
+        Token(TokType.SEMIC),
+        Token(TokType.RCURLY),
+        Token(TokType.EOF),
+    ]
+    p = Parser(tok_stream, "")
+    block_node = p.block()
+
+    assert isinstance(block_node.stmnts[1], nodes.NewAssignBinNode)
+    assert block_node.needs_scope is True
 
 
 def test_missing_opening_block():
@@ -0,0 +1,102 @@
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.objects import DictObject, IntObject, FloatObject, StringObject, BoolObject, NilObject, ArrayObject, dict_key
+
+
+def test_dict_keys_follow_equality():
+    keys = [IntObject(2), FloatObject(2.0), StringObject("2"), BoolObject(True), NilObject()]
+    for key in keys:
+        for other in keys:
+            assert bool(key == other) == (dict_key(key) == dict_key(other))
+    assert dict_key(IntObject(2)) == dict_key(IntObject(4 / 2))
+    assert dict_key(ArrayObject([])) is None
+
+    dictionary = DictObject()
+    for idx, key in enumerate(keys):
+        dictionary.set(key, IntObject(idx))
+    assert dictionary.size == 5
+    assert dictionary.get(FloatObject(2.0)).value == 1
+    assert dictionary.get(StringObject("missing")) is None
+    assert dictionary.delete(NilObject()) and not dictionary.delete(NilObject())
+    assert str(dictionary) == "{2: 0, 2.0: 1, 2: 2, True: 3}"
+
+
+def test_dict_equality(run_program):
+    text = """
+    let first = dict();
+    let second = dict();
+    dict_set(first, "a", [1]);
+    dict_set(second, "a", [1]);
+    let same_equal = first == second;
+    let same_not_equal = first != second;
+    dict_set(second, "b", 2);
+    let different_equal = first == second;
+    let different_not_equal = first != second;
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        for name, value in [
+            ("same_equal", True),
+            ("same_not_equal", False),
+            ("different_equal", False),
+            ("different_not_equal", True),
+        ]:
+            result = env.peek().get_variable(name)
+            assert isinstance(result, BoolObject) and result.value is value, name
+
+
+def test_dict_natives(run_program):
+    text = """
+    let counts = dict();
+    for (word in ["a", "b", "a", "c", "a"]) {
+        let count = dict_get(counts, word);
+        if (count == nil) {
+            count = 0;
+        }
+        dict_set(counts, word, count + 1);
+    }
+    let a_count = dict_get(counts, "a");
+    let has_b = dict_has(counts, "b");
+    let deleted = dict_delete(counts, "b");
+    let has_b_after = dict_has(counts, "b");
+    let keys = dict_keys(counts);
+    let size = len(counts);
+    let bad_key = dict_set(counts, [1], 1);
+    let joined = "-";
+    for (key in counts) {
+        joined = joined + key;
+    }
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("a_count").value == 3
+        assert env.peek().get_variable("has_b").value is True
+        assert env.peek().get_variable("deleted").value is True
+        assert env.peek().get_variable("has_b_after").value is False
+        assert str(env.peek().get_variable("keys")) == "[a, c]"
+        assert env.peek().get_variable("size").value == 2
+        assert str(env.peek().get_variable("bad_key")) == "nil"
+        assert env.peek().get_variable("joined").value == "-ac"
+
+
+def test_dict_truthiness(run_program):
+    text = """
+    let empty = dict();
+    let full = dict();
+    dict_set(full, "a", 1);
+    let empty_branch = "else";
+    if (empty) {
+        empty_branch = "then";
+    }
+    let full_branch = "else";
+    if (full) {
+        full_branch = "then";
+    }
+    let not_full = !full;
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("empty_branch").value == "else"
+        assert env.peek().get_variable("full_branch").value == "then"
+        assert env.peek().get_variable("not_full").value is False
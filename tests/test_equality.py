@@ -0,0 +1,75 @@
+from zai.objects import (
+    ArrayObject,
+    BoolObject,
+    DictObject,
+    FloatObject,
+    IntObject,
+    NilObject,
+    StringObject,
+    TYPED_ARRAY_TYPES,
+    dict_key,
+    new_array,
+)
+import pytest
+
+
+def atoms():
+    return [
+        IntObject(1),
+        IntObject(2),
+        FloatObject(1.0),
+        StringObject("1"),
+        StringObject("x" * 40) + StringObject("y" * 40),
+        BoolObject(True),
+        NilObject(),
+    ]
+
+
+def test_hash_consistent_with_equality():
+    for atom in atoms():
+        for other in atoms():
+            equal = atom.raw_equals(other)
+            assert equal == bool(atom == other) == (dict_key(atom) == dict_key(other))
+            if equal:
+                assert hash(atom) == hash(other) == hash(dict_key(other))
+
+    # Atoms can be used within Python containers.
+    assert len(set(atoms() + atoms())) == len(atoms())
+    assert {IntObject(1): "one"}[IntObject(1)] == "one"
+
+
+def test_containers_not_hashable():
+    with pytest.raises(TypeError):
+        hash(ArrayObject([]))
+    with pytest.raises(TypeError):
+        hash(DictObject())
+
+
+def test_raw_equals():
+    array = new_array([IntObject(1), IntObject(2)])
+    assert array.raw_equals(array)
+    assert array.raw_equals(ArrayObject([IntObject(1), IntObject(2)]))
+    assert not array.raw_equals(new_array([FloatObject(1.0), FloatObject(2.0)]))
+    assert not array.raw_equals(IntObject(1))
+
+    byte_array = ArrayObject(TYPED_ARRAY_TYPES["byte"].new_storage([1, 2]), TYPED_ARRAY_TYPES["byte"])
+    assert array.raw_equals(byte_array) and byte_array.raw_equals(array)
+
+    nested = ArrayObject([array, StringObject("a")])
+    assert nested.raw_equals(ArrayObject([ArrayObject([IntObject(1), IntObject(2)]), StringObject("a")]))
+
+    first, second = DictObject(), DictObject()
+    for dictionary in [first, second]:
+        dictionary.set(StringObject("key"), ArrayObject([NilObject()]))
+    assert first.raw_equals(second)
+    second.set(IntObject(1), IntObject(1))
+    assert not first.raw_equals(second)
+
+
+def test_array_equality_operators():
+    array = new_array([IntObject(1), IntObject(2)])
+    equal_array = ArrayObject([IntObject(1), IntObject(2)])
+    other_array = new_array([IntObject(2)])
+    for left, right, equal in [(array, equal_array, True), (array, other_array, False)]:
+        assert isinstance(left == right, BoolObject) and (left == right).value is equal
+        assert isinstance(left != right, BoolObject) and (left != right).value is not equal
@@ -0,0 +1,91 @@
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.optimize import Optimizer
+from zai.internal_error import InternalRuntimeError
+import zai.ast_nodes as nodes
+import pytest
+
+
+def parse(text):
+    tok_stream = Lexer().tokenize_string(text)
+    return Parser(tok_stream, text).parse()
+
+
+def test_for_parse():
+    for_node = parse("for (x in range(0, 10)) { print x; }").stmnts[0]
+    assert isinstance(for_node, nodes.ForNode)
+    assert for_node.var_name == "x"
+    assert isinstance(for_node.iterable, nodes.CallNode)
+    assert isinstance(for_node.body, nodes.BlockNode)
+
+
+def test_for_loop(run_program, capsys):
+    text = """
+    let total = 0;
+    for (i in range(0, 10)) {
+        if (i == 3) {
+            continue;
+        }
+        if (i == 8) {
+            break;
+        }
+        total = total + i;
+    }
+    func find(arr, value) {
+        for (elem in arr) {
+            if (elem == value) {
+                return "found";
+            }
+        }
+        return "missing";
+    }
+    let found = find([1, "two", 3.5], "two");
+    let missing = find([1, "two", 3.5], 2);
+    for (c in "ab") {
+        print c;
+    }
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text, optimize=True)
+        assert env.peek().get_variable("total").value == 25
+        assert env.peek().get_variable("found").value == "found"
+        assert env.peek().get_variable("missing").value == "missing"
+        # The loop variable is not visible after the loop.
+        assert env.peek().get_variable("i") is None
+        assert env.stack_height == 0
+        assert capsys.readouterr().out.split() == ["a", "b"]
+
+
+def test_range_truthiness(run_program):
+    text = """
+    let empty_branch = "else";
+    if (range(3, 3)) {
+        empty_branch = "then";
+    }
+    let full_branch = "else";
+    if (range(0, 3)) {
+        full_branch = "then";
+    }
+    let not_empty = !range(3, 3);
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("empty_branch").value == "else"
+        assert env.peek().get_variable("full_branch").value == "then"
+        assert env.peek().get_variable("not_empty").value is True
+
+
+def test_for_loop_not_iterable(run_program):
+    for visitor_class in [Visitor, StackVisitor]:
+        with pytest.raises(InternalRuntimeError):
+            run_program(visitor_class(EnvironmentStack()), "for (i in 5) { print i; }", optimize=True)
+
+
+def test_for_loop_invariants():
+    root = Optimizer().optimize(parse("let n = 3; for (i in arr) { print i * n + n * 2; }"))
+    for_node = root.stmnts[1]
+    assert len(for_node.invariants) == 1
+    assert for_node.invariants[0].expr.left.val == "n"
@@ -0,0 +1,114 @@
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.env import Scope, EnvironmentStack, ActivationRecordPool
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.objects import IntObject
+
+
+def parse_function(text):
+    tok_stream = Lexer().tokenize_string(text)
+    return Parser(tok_stream, text).parse().stmnts[0]
+
+
+def test_record_reuse():
+    global_scope = Scope(None)
+    pool = ActivationRecordPool(("a", "b"))
+    record = pool.acquire(global_scope)
+    assert record.parent is global_scope
+    record.initialize_variable("a", IntObject(1))
+    assert record.get_variable("a").value == 1
+    pool.release(record)
+    assert record.scope["a"] is None
+    assert record.parent is None
+
+    reused = pool.acquire(global_scope)
+    assert reused is record
+    assert reused.parent is global_scope
+    assert reused.scope == {"a": None, "b": None}
+
+
+def test_record_with_extra_variables_not_reused():
+    pool = ActivationRecordPool(("a",))
+    record = pool.acquire(None)
+    record.initialize_variable("extra", 1)
+    pool.release(record)
+    assert pool.acquire(None) is not record
+
+
+def test_frame_layout():
+    func_node = parse_function("func f(a, b) { let c = a; if (a) { let d = b; } return c; }")
+    assert func_node.frame_layout == ("a", "b", "c")
+
+    # Functions defining closures keep allocating a fresh scope per call.
+    func_node = parse_function("func f(a) { func g() { return a; } return g; }")
+    assert func_node.frame_layout is None
+
+
+def test_pooled_recursion(run_program):
+    text = """
+    func fib(n) {
+        if (n < 2) {
+            return n;
+        }
+        let a = fib(n - 1);
+        let b = fib(n - 2);
+        return a + b;
+    }
+    let result = fib(15);
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("result").value == 610
+        assert env.stack_height == 0
+
+
+def test_block_scopes(run_program):
+    text = """
+    let total = 0;
+    let i = 0;
+    while (i < 3) {
+        if (i == 1) {
+            total = total + 10;
+        }
+        {
+            let inner = i;
+            total = total + inner;
+        }
+        i = i + 1;
+    }
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("total").value == 13
+        # Names declared within a nested block do not leak into the enclosing scope.
+        assert env.peek().get_variable("inner") is None
+        assert env.stack_height == 0
+
+
+def test_method_pools_shared_by_instances(run_program):
+    text = """
+    class Counter {
+        func constructor(start) {
+            let this.value = start;
+        }
+
+        func add(amount) {
+            let next = this.value + amount;
+            this.value = next;
+            return next;
+        }
+    }
+    let first = Counter(1);
+    let second = Counter(1);
+    first.add(2);
+    let result = second.add(5);
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        first = env.peek().get_variable("first").get_field("add")
+        second = env.peek().get_variable("second").get_field("add")
+        assert env.peek().get_variable("result").value == 6
+        assert first.frame_pool is not None and first.frame_pool is second.frame_pool
+        # The record released by the call of first.add was reused by second.add.
+        assert len(first.frame_pool.idle_records) == 1
@@ -0,0 +1,76 @@
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.internal_error import InternalRuntimeError
+import pytest
+
+
+def stats(env, name):
+    stats_dict = env.peek().get_variable(name)
+    return {str(key): value.value for key, value in stats_dict.entries.values()}
+
+
+def test_memoized_recursion(run_program):
+    text = """
+    let calls = 0;
+    func fib(n) {
+        calls = calls + 1;
+        if (n < 2) {
+            return n;
+        }
+        return fast_fib(n - 1) + fast_fib(n - 2);
+    }
+    let fast_fib = memoize(fib);
+    let result = fast_fib(60);
+    let fib_stats = memo_stats(fast_fib);
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("result").value == 1548008755920
+        assert env.peek().get_variable("calls").value == 61
+        assert stats(env, "fib_stats") == {"hits": 58, "misses": 61, "evictions": 0, "size": 61, "max_size": 128}
+
+
+def test_memoize_eviction(run_program):
+    text = """
+    let calls = 0;
+    func square(n) {
+        calls = calls + 1;
+        return n * n;
+    }
+    let cached = memoize(square, 2);
+    cached(1);
+    cached(2);
+    cached(1);
+    cached(3);
+    cached(1);
+    cached(2);
+    let lru_stats = memo_stats(cached);
+
+    func first(arr) {
+        return arr[0];
+    }
+    let cached_first = memoize(first);
+    cached_first([5]);
+    let value = cached_first([5]);
+    let array_stats = memo_stats(cached_first);
+
+    let not_function = memoize(5);
+    let bad_size = memoize(square, 0);
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        # Caching 3 evicts 2, which was used less recently than 1.
+        assert env.peek().get_variable("calls").value == 4
+        assert stats(env, "lru_stats") == {"hits": 2, "misses": 4, "evictions": 2, "size": 2, "max_size": 2}
+        # Arrays are not atoms so calls taking them are never cached.
+        assert env.peek().get_variable("value").value == 5
+        assert stats(env, "array_stats")["misses"] == 2 and stats(env, "array_stats")["size"] == 0
+        assert str(env.peek().get_variable("not_function")) == "nil"
+        assert str(env.peek().get_variable("bad_size")) == "nil"
+
+
+def test_native_arity(run_program):
+    for visitor_class in [Visitor, StackVisitor]:
+        with pytest.raises(InternalRuntimeError, match="1 to 2 arguments"):
+            run_program(visitor_class(EnvironmentStack()), "memoize();")
@@ -0,0 +1,126 @@
+import gc
+import threading
+import pytest
+
+from zai.vm import YaplVm
+from zai.memory import MemoryQuota, STRING_SIZE, ARRAY_SIZE, ELEMENT_SIZE, DICT_SIZE
+from zai.objects import StringObject, ArrayObject, DictObject, IntObject, new_array
+from zai.env import Scope
+from zai.internal_error import InternalMemoryError
+
+
+def test_memory_quota_accounting():
+    quota = MemoryQuota()
+    with quota.activate():
+        text = StringObject("abcd")
+        assert quota.used == STRING_SIZE + 4
+        arr = new_array([text, text])
+        arr.append(text)
+        assert arr.held_bytes == ARRAY_SIZE + 3 * ELEMENT_SIZE
+        arr.pop()
+        assert quota.used == STRING_SIZE + 4 + ARRAY_SIZE + 2 * ELEMENT_SIZE
+        # Objects return their bytes once they are destroyed.
+        del arr
+        del text
+        assert quota.used == 0
+        assert quota.peak == STRING_SIZE + 4 + ARRAY_SIZE + 3 * ELEMENT_SIZE
+
+    # Objects created while no quota is active are not charged, while objects
+    # destroyed after the quota was deactivated still return their bytes.
+    assert StringObject("abc").quota is None and Scope(None).quota is None
+    with quota.activate():
+        arr = ArrayObject([])
+    assert quota.used == ARRAY_SIZE
+    del arr
+    assert quota.used == 0
+
+
+def test_memory_quota_limit():
+    quota = MemoryQuota(STRING_SIZE + 10)
+    with quota.activate():
+        StringObject("short")
+        with pytest.raises(InternalMemoryError):
+            StringObject("a string longer than the limit")
+        assert quota.used == 0
+
+
+def test_vm_memory_limit(capsys):
+    growing = "let arr = [];\nwhile (true) {\n    push(arr, 1);\n}\n"
+    vm = YaplVm(memory_limit=10000)
+    vm.run_string(growing)
+    assert capsys.readouterr().out == "Runtime Error: Line 3, Column 9: Memory quota of 10000 bytes exceeded!\n"
+
+    # Temporary objects are released, so only the objects held at once count. Every
+    # VM has a quota of its own.
+    other_vm = YaplVm(memory_limit=10000)
+    other_vm.run_string(
+        """
+func temporary() {
+    let text = "piece" + "piece";
+    return [text, text];
+}
+for (i in range(0, 2000)) {
+    temporary();
+}
+"""
+    )
+    assert capsys.readouterr().out == ""
+    assert 0 < other_vm.memory_quota.peak < 10000
+    assert vm.memory_quota.used > other_vm.memory_quota.used
+
+
+def test_vm_memory_released_after_error(capsys):
+    vm = YaplVm(memory_limit=10000)
+    vm.run_string('let a = [];\npush(a, a);\nwhile (true) {\n    push(a, "x");\n}\n')
+    assert capsys.readouterr().out.startswith("Runtime Error: ")
+
+    # The array refers to itself, so it is only destroyed by the garbage collector
+    # once the VM is done evaluating code. Its bytes are still returned to the quota.
+    vm.run_string("a = nil;")
+    gc.collect()
+    vm.run_string('let b = ["y", "z"];')
+    assert capsys.readouterr().out == ""
+    assert vm.memory_quota.used < 10000 // 2
+
+
+def test_dict_memory(capsys):
+    quota = MemoryQuota()
+    with quota.activate():
+        dictionary = DictObject()
+        key = IntObject(1)
+        dictionary.set(key, key)
+        dictionary.set(key, IntObject(2))
+        assert quota.used == DICT_SIZE + ELEMENT_SIZE
+        assert dictionary.delete(key) and not dictionary.delete(key)
+        assert quota.used == DICT_SIZE
+        del dictionary
+        assert quota.used == 0
+
+    vm = YaplVm(memory_limit=50000)
+    vm.run_string("let d = dict();\nfor (i in range(0, 200000)) {\n    dict_set(d, i, i);\n}\n")
+    assert capsys.readouterr().out == "Runtime Error: Line 3, Column 13: Memory quota of 50000 bytes exceeded!\n"
+
+
+def test_vm_quotas_in_threads():
+    loop_vm = YaplVm(memory_limit=100000)
+    array_vm = YaplVm(memory_limit=10 ** 8)
+    started = threading.Barrier(2)
+
+    def run(vm, text):
+        started.wait()
+        vm.run_string(text)
+
+    threads = [
+        threading.Thread(target=run, args=(loop_vm, "let i = 0;\nwhile (i < 50000) {\n    i = i + 1;\n}\n")),
+        threading.Thread(
+            target=run, args=(array_vm, "let arr = [];\nfor (i in range(0, 20000)) {\n    push(arr, [i]);\n}\n")
+        ),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Each VM is only charged for its own objects, and no quota stays active.
+    assert loop_vm.memory_quota.peak < 5000
+    assert array_vm.memory_quota.used > 20000 * ARRAY_SIZE
+    assert StringObject("abc").quota is None
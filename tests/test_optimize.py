@@ -0,0 +1,143 @@
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.optimize import Optimizer
+import zai.ast_nodes as nodes
+
+PROGRAMS = [
+    # Invariants within the condition and body of a loop
+    """
+    let limit = 5;
+    let scale = 3;
+    let total = 0;
+    let i = 0;
+    while (i < limit * 2) {
+        total = total + (scale * scale - 1);
+        i = i + 1;
+    }
+    print total;
+    """,
+    # Inner loop invariants depend on a variable changed by the outer loop
+    """
+    let n = 0;
+    let out = 0;
+    while (n < 4) {
+        let j = 0;
+        while (j < n * 2) {
+            out = out + n * 10;
+            j = j + 1;
+        }
+        n = n + 1;
+    }
+    print out;
+    """,
+    # Names declared within the loop are not invariant
+    """
+    let acc = 0;
+    let limit = 10;
+    do {
+        let step = acc + 1;
+        acc = acc + step * 2;
+    } while (acc < limit * 5);
+    print acc;
+    """,
+    # Fields are modified both through a path and directly within a method
+    """
+    class Counter {
+        func constructor(start) {
+            let this.count = start;
+        }
+        func run(limit) {
+            while (this.count < limit * 2) {
+                count = count + 1;
+            }
+            return count;
+        }
+    }
+    let c = Counter(1);
+    print c.run(4);
+    let steps = 0;
+    while (c.count < 20) {
+        c.count = c.count + 3;
+        steps = steps + 1;
+    }
+    print steps;
+    """,
+    # Arrays are modified in place and hoisted code is only run when reached
+    """
+    let arr = [1, 2, 3];
+    let i = 0;
+    while (i < 3) {
+        if (i > 5) {
+            print undefined_value * 2;
+        }
+        arr[0] = arr[0] + 1;
+        print arr[0] * 2;
+        i = i + 1;
+    }
+    """,
+    # Loops containing "break" and "continue"
+    """
+    let i = 0;
+    let base = 4;
+    while (true) {
+        i = i + 1;
+        if (i == base / 2) {
+            continue;
+        }
+        if (i > base * 2) {
+            break;
+        }
+        print i + base * 100;
+    }
+    """,
+]
+
+
+def parse(text):
+    tok_stream = Lexer().tokenize_string(text)
+    return Parser(tok_stream, text).parse()
+
+
+def run_output(capsys, visitor_class, text, optimize):
+    root = Optimizer(hoist_invariants=optimize).optimize(parse(text))
+    visitor_class(EnvironmentStack()).visit(root)
+    return capsys.readouterr().out
+
+
+def test_same_output_with_and_without_hoisting(capsys):
+    for text in PROGRAMS:
+        expected = run_output(capsys, Visitor, text, False)
+        assert expected != ""
+        for visitor_class in [Visitor, StackVisitor]:
+            assert run_output(capsys, visitor_class, text, True) == expected
+
+
+def test_invariants_hoisted():
+    root = Optimizer().optimize(parse(PROGRAMS[0]))
+    loop = root.stmnts[4]
+    assert isinstance(loop.condition.right, nodes.InvariantNode)
+    assert isinstance(loop.condition.right.expr, nodes.ArithBinNode)
+    assert len(loop.invariants) == 2
+
+    root = Optimizer().optimize(parse(PROGRAMS[1]))
+    outer_loop = root.stmnts[2]
+    inner_loop = outer_loop.body.stmnts[1]
+    assert outer_loop.invariants == []
+    assert len(inner_loop.invariants) == 2
+
+
+def test_loops_with_calls_not_optimized():
+    text = """
+    let i = 0;
+    let n = 4;
+    while (i < n * 2) {
+        i = i + 1;
+        object_type(i);
+    }
+    """
+    root = Optimizer().optimize(parse(text))
+    assert root.stmnts[2].invariants == []
+    assert isinstance(root.stmnts[2].condition.right, nodes.ArithBinNode)
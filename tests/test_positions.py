@@ -0,0 +1,78 @@
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.internal_error import InternalRuntimeError, InternalTypeError
+import zai.ast_nodes as nodes
+import gc
+import pytest
+
+
+def parse(text):
+    return Parser(Lexer().tokenize_string(text), text).parse()
+
+
+def location(node):
+    return (nodes.position_line(node.pos), nodes.position_col(node.pos))
+
+
+def test_pack_position():
+    assert nodes.position_line(nodes.pack_position(0, 5)) == 1
+    assert nodes.position_col(nodes.pack_position(41, 5)) == 5
+    assert nodes.position_line(nodes.pack_position(41, 5)) == 42
+    # Columns which do not fit are clamped instead of overflowing into the line.
+    big_col = nodes.pack_position(3, 1 << 20)
+    assert nodes.position_line(big_col) == 4 and nodes.position_col(big_col) == nodes.POS_COL_MASK
+
+
+def test_node_positions():
+    text = """let a = 1;
+func f(x) {
+    return x * (a + 2);
+}
+"""
+    assign, func = parse(text).stmnts
+    assert location(assign) == (1, 1)
+    assert location(assign.value) == (1, 9)
+    assert location(func) == (2, 1)
+
+    ret = func.body[0]
+    assert location(ret) == (3, 5)
+    assert location(ret.expr) == (3, 14)
+    assert location(ret.expr.left) == (3, 12)
+    assert location(ret.expr.right) == (3, 16)
+    assert location(ret.expr.right.expr) == (3, 19)
+
+
+def test_error_location(run_program):
+    text = """func f(arr) {
+    let y = 1;
+    return arr[5];
+}
+f([1, 2]);
+"""
+    for visitor_class in [Visitor, StackVisitor]:
+        with pytest.raises(InternalRuntimeError) as err:
+            run_program(visitor_class(EnvironmentStack()), text)
+        assert (err.value.line_num, err.value.col_num) == (3, 15)
+        assert str(err.value).startswith("Runtime Error: Line 3, Column 15: ")
+
+        with pytest.raises(InternalTypeError) as err:
+            run_program(visitor_class(EnvironmentStack()), "let a = 1;\nlet b = a + [1];")
+        assert (err.value.line_num, err.value.col_num) == (2, 11)
+
+
+def test_error_location_leaves_no_cycles(run_program):
+    text = "func f(arr) {\n    let y = [1, 2];\n    return arr[5];\n}\nf([1, 2]);\n"
+    for visitor_class in [Visitor, StackVisitor]:
+        visitor = visitor_class(EnvironmentStack())
+        gc.collect()
+        gc.disable()
+        try:
+            with pytest.raises(InternalRuntimeError):
+                run_program(visitor, text)
+            # Frames evaluating the program are freed as soon as the error is.
+            assert gc.collect() == 0
+        finally:
+            gc.enable()
@@ -0,0 +1,117 @@
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.profiler import Profiler
+from zai.vm import YaplVm
+
+PROGRAM = """
+func fib(n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+func count_down(n) {
+    if (n == 0) {
+        return len("done");
+    }
+    return count_down(n - 1);
+}
+func main() {
+    fib(5);
+    count_down(3);
+}
+main();
+"""
+
+
+class FakeClock:
+    """
+    Clock which advances by one second every time it is read.
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+def profile(run_program, visitor_class, text):
+    profiler = Profiler(FakeClock())
+    visitor = visitor_class(EnvironmentStack())
+    visitor.profiler = profiler
+    profiler.start(text)
+    run_program(visitor, text)
+    profiler.stop()
+    return profiler
+
+
+def test_profile_counts(run_program):
+    for visitor_class in [Visitor, StackVisitor]:
+        profiler = profile(run_program, visitor_class, PROGRAM)
+        functions = profiler.functions
+        assert functions["fib"].calls == 15
+        # Tail calls replace the frame of the caller but still count as calls.
+        assert functions["count_down"].calls == 4
+        assert functions["len"].calls == 1
+        assert functions["main"].calls == 1
+        assert profiler.frames == []
+
+        # Time of recursive calls is counted once within the total time.
+        program = functions["<program>"]
+        assert functions["fib"].total_time < functions["main"].total_time < program.total_time
+        assert sum(stats.self_time for stats in functions.values()) == program.total_time
+        for stats in functions.values():
+            assert 0 < stats.self_time <= stats.total_time
+
+        # Lines are counted once per statement starting on them.
+        lines = profiler.lines
+        assert lines[3].hits == 15
+        assert lines[4].hits == 8
+        assert lines[6].hits == 7
+        assert lines[10].hits == 1 and lines[12].hits == 3
+        assert all(line.self_time > 0 for line in lines.values())
+
+
+def test_collapsed_stacks(run_program):
+    profiler = profile(run_program, Visitor, PROGRAM)
+    stacks = dict(line.rsplit(" ", 1) for line in profiler.collapsed_stacks().splitlines())
+    assert "<program>;main;fib;fib;fib;fib;fib" in stacks
+    # Tail calls are attributed to the stack of the original caller.
+    assert "<program>;main;count_down;len" in stacks
+    assert "<program>;main;count_down;count_down" not in stacks
+    assert sum(int(micros) for micros in stacks.values()) == profiler.functions["<program>"].total_time * 1000000
+
+    report = profiler.report().splitlines()
+    assert report[0].startswith("Total time:")
+    assert report[2].split()[-1] == "fib"
+    assert "return fib(n - 1) + fib(n - 2);" in "\n".join(report[report.index("") + 1:])
+
+
+def test_vm_profile(tmp_path):
+    profiler = Profiler()
+    YaplVm(profiler=profiler).run_string("func f() { return 1; } f(); f();")
+    assert profiler.functions["f"].calls == 2
+    profiler.write(tmp_path / "report.txt", tmp_path / "report.folded")
+    assert "f" in (tmp_path / "report.txt").read_text().split()
+
+
+def test_repl_profile(monkeypatch, capsys):
+    commands = iter(["func f() { return 1; }", "f();", "f();"])
+
+    def fake_input(prompt):
+        try:
+            return next(commands)
+        except StopIteration:
+            raise EOFError
+
+    profiler = Profiler()
+    vm = YaplVm(profiler=profiler)
+    monkeypatch.setattr("builtins.input", fake_input)
+    monkeypatch.setattr(vm, "_setup_readline", lambda: None)
+    vm.run_repl()
+    assert "Error" not in capsys.readouterr().out
+    assert profiler.functions["f"].calls == 2
+    assert not profiler.frames
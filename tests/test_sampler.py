@@ -0,0 +1,58 @@
+import sys
+
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.sampler import SamplingProfiler
+from zai.vm import YaplVm
+from zai.objects import NativeFuncObject, NilObject
+
+PROGRAM = """func inner(n) {
+    if (n > 0) {
+        capture();
+    }
+}
+func outer() {
+    let x = 1;
+    return inner(x);
+}
+outer();
+"""
+
+
+def test_sample_call_stack(run_program):
+    for visitor_class in [Visitor, StackVisitor]:
+        sampler = SamplingProfiler()
+        samples = list()
+
+        def capture():
+            samples.append(sampler.sample(sys._getframe()))
+            return NilObject()
+
+        sampler.native_names[capture.__code__] = "capture"
+        run_program(visitor_class(EnvironmentStack()), PROGRAM, [NativeFuncObject(capture)])
+        # The tail call of outer replaced its frame by the frame of inner.
+        assert samples == [("<program>:10", "inner:3", "capture")]
+
+
+def test_sampling_thread(tmp_path):
+    text = """
+func spin() {
+    let total = 0;
+    for (i in range(0, 30000)) {
+        total = total + i;
+    }
+    return total;
+}
+spin();
+"""
+    sampler = SamplingProfiler(0.001)
+    YaplVm(sampler=sampler).run_string(text)
+    assert sampler.sampler_thread is None
+    assert sampler.sample_count > 0 and sum(sampler.stacks.values()) == sampler.sample_count
+    assert any(stack[:2] == ("<program>:9", "spin:5") for stack in sampler.stacks)
+
+    sampler.write(tmp_path / "samples.txt", tmp_path / "samples.folded")
+    for line in (tmp_path / "samples.folded").read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("<program>") and int(count) > 0
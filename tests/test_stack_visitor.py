@@ -0,0 +1,87 @@
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.internal_error import InternalStackOverflowError, InternalRuntimeError
+import pytest
+
+
+def test_deep_recursion(run_program):
+    text = """
+    func depth(n) {
+        if (n == 0) {
+            return 0;
+        }
+        return 1 + depth(n - 1);
+    }
+    let result = depth(20000);
+    """
+    env = run_program(StackVisitor(EnvironmentStack()), text)
+    assert env.peek().get_variable("result").value == 20000
+    # All function scopes must be removed once the calls return.
+    assert env.stack_height == 0
+
+
+def test_stack_overflow(run_program):
+    text = """
+    func forever(n) {
+        return 1 + forever(n + 1);
+    }
+    forever(0);
+    """
+    visitor = StackVisitor(EnvironmentStack(), max_call_depth=50)
+    with pytest.raises(InternalStackOverflowError):
+        run_program(visitor, text)
+
+    # The environment is restored to the global scope after the error.
+    assert visitor.env.stack_height == 0
+    assert visitor.call_depth == 0
+
+
+def test_same_output_as_recursive_visitor(run_program, capsys):
+    text = """
+    func fib(n) {
+        if (n < 2) {
+            return n;
+        }
+        return fib(n - 1) + fib(n - 2);
+    }
+    class Counter {
+        func constructor(start) {
+            let this.count = start;
+        }
+        func get() {
+            return this.count;
+        }
+    }
+    let i = 0;
+    while (i < 5) {
+        i = i + 1;
+        if (i == 2) {
+            continue;
+        }
+        print fib(i);
+    }
+    do {
+        i = i - 2;
+        print i;
+    } while (i > 0);
+    let arr = [1, "two", 3.5, nil];
+    print arr[1];
+    let c = Counter(4);
+    print c.get();
+    print !(1 < 2) || (3 >= 3);
+    """
+    run_program(Visitor(EnvironmentStack()), text)
+    recursive_output = capsys.readouterr().out
+    run_program(StackVisitor(EnvironmentStack()), text)
+    stack_output = capsys.readouterr().out
+    assert recursive_output == stack_output
+    assert recursive_output.split("\n")[:4] == ["1", "2", "3", "5"]
+
+
+def test_redeclared_variable(run_program, capsys):
+    for visitor_class in [Visitor, StackVisitor]:
+        with pytest.raises(InternalRuntimeError) as err:
+            run_program(visitor_class(EnvironmentStack()), "let total = 1;\nlet total = 2;")
+        assert "Variable 'total' is already initialized!" in str(err.value)
+    assert capsys.readouterr().out == ""
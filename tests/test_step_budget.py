@@ -0,0 +1,57 @@
+import pytest
+
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.vm import YaplVm
+from zai.internal_error import InternalStepLimitError
+
+LOOPS = """
+func id(x) {
+    return x;
+}
+let total = 0;
+for (i in range(0, 10)) {
+    let j = 0;
+    while (j < 5) {
+        total = total + id(j);
+        j = j + 1;
+    }
+}
+"""
+# 10 iterations of the for loop, 50 of the while loop and 50 calls.
+LOOP_STEPS = 110
+
+
+def test_step_count(run_program):
+    for visitor_class in [Visitor, StackVisitor]:
+        for step_interval in [1, 7, 1000]:
+            visitor = visitor_class(EnvironmentStack())
+            visitor.set_step_budget(LOOP_STEPS, step_interval)
+            run_program(visitor, LOOPS)
+            assert visitor.step_count() == LOOP_STEPS
+            assert visitor.env.peek().get_variable("total").value == 100
+
+
+def test_step_budget_exhausted(run_program):
+    for visitor_class in [Visitor, StackVisitor]:
+        for step_interval in [1, 7, 1000]:
+            visitor = visitor_class(EnvironmentStack())
+            visitor.set_step_budget(LOOP_STEPS - 1, step_interval)
+            with pytest.raises(InternalStepLimitError):
+                run_program(visitor, LOOPS)
+            # The error is raised by the first step beyond the budget.
+            assert visitor.step_count() == LOOP_STEPS
+
+
+def test_vm_step_budget(capsys):
+    vm = YaplVm(explicit_stack=True, max_steps=1000)
+    # The tail calls of forever run within the frame of the first call.
+    vm.run_string("func forever(n) {\n    return forever(n + 1);\n}\nforever(0);\n")
+    assert capsys.readouterr().out == "Runtime Error: Line 4, Column 8: Step budget of 1000 steps exhausted!\n"
+
+    # Every evaluation gets a budget of its own.
+    vm.run_string("let i = 0;\nwhile (i < 600) {\n    i = i + 1;\n}\n")
+    vm.run_string("while (i < 1200) {\n    i = i + 1;\n}\n")
+    assert vm.env.peek().get_variable("i").value == 1200
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,50 @@
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.objects import StringObject, ArrayObject, IntObject
+
+
+def test_rope_concatenation():
+    piece = StringObject("x" * 40)
+    rope = piece + piece
+    longer = rope + StringObject("y")
+    assert "value" not in vars(rope)
+    # Both ropes share their pieces.
+    assert longer.parts is rope.parts and longer.part_count == 3
+    assert rope.str_len == 80 and longer.str_len == 81
+
+    # Appending to a rope which has already been extended copies it instead.
+    branch = rope + StringObject("z")
+    assert branch.parts is not rope.parts
+    assert longer.value == "x" * 80 + "y"
+    assert branch.value == "x" * 80 + "z"
+    assert rope.value == "x" * 80
+
+    short = StringObject("a") + StringObject("b")
+    assert vars(short)["value"] == "ab"
+
+
+def test_rope_program(run_program):
+    text = """
+    let s = "-";
+    for (i in range(0, 100)) {
+        s = s + "ab";
+    }
+    let first = s + "X";
+    let second = s + "Y";
+    let size = len(second);
+    let same = first == s + "X";
+    let ordered = s < first;
+    """
+    for visitor_class in [Visitor, StackVisitor]:
+        env = run_program(visitor_class(EnvironmentStack()), text)
+        assert env.peek().get_variable("first").value == "-" + "ab" * 100 + "X"
+        assert env.peek().get_variable("second").value == "-" + "ab" * 100 + "Y"
+        assert env.peek().get_variable("size").value == 202
+        assert env.peek().get_variable("same").value is True
+        assert env.peek().get_variable("ordered").value is True
+
+
+def test_array_str():
+    array = ArrayObject([IntObject(1), StringObject("two"), ArrayObject([])])
+    assert str(array) == "[1, two, []]"
@@ -0,0 +1,67 @@
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.objects import ObjectType
+
+SWITCH = """
+let values = [1, 2, 3, 7, "a", true, 2.0];
+let i = 0;
+while (i < 7) {
+    switch (values[i]) {
+        case 1:
+            print "one";
+        case 2:
+            print "two";
+            break;
+        case 3:
+            print "three";
+        case "a":
+            print "a";
+            break;
+        case true:
+            print "true";
+            break;
+        case 2:
+            print "duplicate";
+            break;
+        default:
+            print "default";
+    }
+    i = i + 1;
+}
+"""
+
+EXPECTED = ["one", "two", "two", "three", "a", "default", "a", "true", "default"]
+
+
+def parse(text):
+    tok_stream = Lexer().tokenize_string(text)
+    return Parser(tok_stream, text).parse()
+
+
+def test_jump_table():
+    switch_node = parse(SWITCH).stmnts[2].body.stmnts[0]
+    assert switch_node.jump_table == {
+        (ObjectType.INT, 1): 0,
+        (ObjectType.INT, 2): 1,
+        (ObjectType.INT, 3): 2,
+        (ObjectType.STR, "a"): 3,
+        (ObjectType.BOOL, True): 4,
+    }
+
+    # Labels which are not literals are evaluated one after another.
+    switch_node = parse("switch (x) { case 1: print 1; case y: print 2; default: print 3; }").stmnts[0]
+    assert switch_node.jump_table is None
+
+
+def test_jump_table_same_as_linear_dispatch(capsys):
+    # Wrapping a label in brackets disables the jump table.
+    linear_switch = SWITCH.replace("case 1:", "case (1):")
+    assert parse(linear_switch).stmnts[2].body.stmnts[0].jump_table is None
+
+    for text in [SWITCH, linear_switch]:
+        for visitor_class in [Visitor, StackVisitor]:
+            visitor_class(EnvironmentStack()).visit(parse(text))
+            assert capsys.readouterr().out.split() == EXPECTED
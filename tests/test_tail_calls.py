@@ -0,0 +1,61 @@
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.env import EnvironmentStack
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+import zai.ast_nodes as nodes
+import tracemalloc
+
+TAIL_LOOP = """
+func loop(n, acc) {
+    if (n == 0) {
+        return acc;
+    }
+    return loop(n - 1, acc + 1);
+}
+let result = loop(ITERATIONS, 0);
+"""
+
+
+def peak_memory(run_program, visitor, text):
+    tracemalloc.start()
+    run_program(visitor, text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_tail_call_detection():
+    text = "func f(n) { return g(n); return g(n) + 1; return n; }"
+    tok_stream = Lexer().tokenize_string(text)
+    func_node = Parser(tok_stream, text).parse().stmnts[0]
+
+    assert isinstance(func_node.body[0], nodes.ReturnNode) and func_node.body[0].tail_call is True
+    assert func_node.body[1].tail_call is False
+    assert func_node.body[2].tail_call is False
+
+
+def test_tail_recursion_beyond_recursion_limit(run_program):
+    # Far deeper than the Python recursion limit would allow without tail calls.
+    env = run_program(Visitor(EnvironmentStack()), TAIL_LOOP.replace("ITERATIONS", "20000"))
+    assert env.peek().get_variable("result").value == 20000
+    assert env.stack_height == 0
+
+
+def test_tail_recursion_constant_memory(run_program):
+    for visitor_class in [Visitor, StackVisitor]:
+        short_loop = peak_memory(run_program, visitor_class(EnvironmentStack()), TAIL_LOOP.replace("ITERATIONS", "100"))
+        long_loop = peak_memory(run_program, visitor_class(EnvironmentStack()), TAIL_LOOP.replace("ITERATIONS", "4000"))
+        # A loop 40 times longer must not need noticeably more memory.
+        assert long_loop < short_loop * 1.5
+
+
+def test_tail_call_to_native_function(run_program):
+    text = """
+    func type_of(val) {
+        return object_type(val);
+    }
+    let result = type_of("abc");
+    """
+    env = run_program(Visitor(EnvironmentStack()), text)
+    assert env.peek().get_variable("result").value == "string"
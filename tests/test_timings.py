@@ -0,0 +1,86 @@
+import threading
+
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.vm import YaplVm
+from zai.env import Scope
+from zai.objects import IntObject
+from zai.timings import PhaseTimings, AllocationCounter, count_nodes, PHASES
+
+PROGRAM = """
+func square(x) {
+    return x * x;
+}
+let total = 0;
+for (i in range(0, 10)) {
+    total = total + square(i);
+}
+"""
+
+
+def test_vm_timings():
+    timings = PhaseTimings()
+    vm = YaplVm(timings=timings)
+    vm.run_string(PROGRAM)
+    assert vm.env.peek().get_variable("total").value == 285
+
+    result = timings.as_dict()
+    assert list(result["phases"]) == PHASES
+    for times in result["phases"].values():
+        assert times["wall"] >= 0 and times["cpu"] >= 0
+    assert result["phases"]["execute"]["wall"] > 0
+
+    counters = result["counters"]
+    assert counters["tokens"] == len(Lexer().tokenize_string(PROGRAM))
+    assert counters["ast_nodes"] == count_nodes(Parser(Lexer().tokenize_string(PROGRAM), PROGRAM).parse())
+    assert counters["imports"] == 0
+    # Activation records are reused by the calls of square.
+    assert 0 < counters["scopes"] < 10
+    assert result["allocations"]["ReturnObject"] == 10
+    assert counters["objects"] == sum(result["allocations"].values())
+
+    # Counting stops along with the last phase.
+    assert IntObject.__init__.__name__ == "__init__" and Scope.__init__.__name__ == "__init__"
+    assert "execute" in timings.report()
+
+    # Measurements accumulate over every string evaluated.
+    vm.run_string("let again = 1;")
+    assert timings.as_dict()["counters"]["tokens"] > counters["tokens"]
+
+
+def test_nested_allocation_counters():
+    outer, inner = AllocationCounter(), AllocationCounter()
+    outer.start()
+    IntObject(1)
+    inner.start()
+    IntObject(2)
+    Scope(None)
+    inner.stop()
+    assert IntObject.__init__.__name__ == "counting_init"
+    IntObject(3)
+    outer.stop()
+    assert outer.counts == {"IntObject": 3, "Scope": 1}
+    assert inner.counts == {"IntObject": 1, "Scope": 1}
+    assert IntObject.__init__.__name__ == "__init__"
+    assert IntObject(4).value == 4
+
+
+def test_allocation_counters_per_thread():
+    main_counter, thread_counter = AllocationCounter(), AllocationCounter()
+
+    def allocate():
+        thread_counter.start()
+        IntObject(1)
+        thread_counter.stop()
+        # Objects created by threads without a running counter are not counted.
+        IntObject(2)
+
+    main_counter.start()
+    thread = threading.Thread(target=allocate)
+    thread.start()
+    thread.join()
+    Scope(None)
+    main_counter.stop()
+    assert main_counter.counts == {"Scope": 1}
+    assert thread_counter.counts == {"IntObject": 1}
+    assert IntObject.__init__.__name__ == "__init__"
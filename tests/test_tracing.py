@@ -0,0 +1,82 @@
+from zai.vm import YaplVm
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor
+from zai.tracing import ExecutionHooks, TracingVisitor, TracingStackVisitor
+from zai.profiler import Profiler
+from zai.ast_nodes import position_line
+
+PROGRAM = """func add(a, b) {
+    return a + b;
+}
+func twice(x) {
+    let y = add(x, x);
+    return add(y, 0);
+}
+print len("abc");
+print twice(2);
+"""
+
+
+class RecordingHooks(ExecutionHooks):
+    def __init__(self):
+        self.events = list()
+
+    def on_call(self, func_object):
+        self.events.append(("call", func_object.name))
+
+    def on_return(self, func_object):
+        self.events.append(("return", func_object.name))
+
+    def on_statement(self, stmnt):
+        self.events.append(("line", position_line(stmnt.pos)))
+
+    def on_error(self, error):
+        self.events.append(("error", error.line_num))
+
+
+def test_execution_hooks(capsys):
+    for explicit_stack in [False, True]:
+        hooks = RecordingHooks()
+        vm = YaplVm(explicit_stack=explicit_stack, hooks=hooks)
+        assert type(vm.visitor) is (TracingStackVisitor if explicit_stack else TracingVisitor)
+        vm.run_string(PROGRAM)
+        # The tail call of add replaces the frame of twice.
+        assert hooks.events == [
+            ("line", 1),
+            ("line", 4),
+            ("line", 8),
+            ("call", "len"),
+            ("return", "len"),
+            ("line", 9),
+            ("call", "twice"),
+            ("line", 5),
+            ("call", "add"),
+            ("line", 2),
+            ("return", "add"),
+            ("line", 6),
+            ("return", "twice"),
+            ("call", "add"),
+            ("line", 2),
+            ("return", "add"),
+        ]
+        assert capsys.readouterr().out == "3\n4\n"
+
+        # Functions stopped by an error are left after the error is reported.
+        hooks.events.clear()
+        vm.run_string("func fail(x) {\n    return x + nil;\n}\nprint fail(1) + 1;\n")
+        assert hooks.events[-4:] == [("call", "fail"), ("line", 2), ("error", 2), ("return", "fail")]
+        assert "Line 2" in capsys.readouterr().out
+
+        # Removing the hooks brings back the uninstrumented visitor.
+        vm.set_hooks(None)
+        assert type(vm.visitor) is (StackVisitor if explicit_stack else Visitor)
+        vm.run_string("print twice(3);")
+        assert capsys.readouterr().out == "6\n"
+
+
+def test_hooks_with_profiler():
+    hooks = RecordingHooks()
+    profiler = Profiler()
+    YaplVm(profiler=profiler, hooks=hooks).run_string(PROGRAM)
+    assert profiler.functions["add"].calls == 2
+    assert hooks.events.count(("call", "add")) == 2
@@ -18,12 +18,44 @@
 import argparse
 
 from zai.vm import YaplVm
+from zai.stack_visitor import DEFAULT_MAX_CALL_DEPTH
+from zai.profiler import Profiler
+from zai.sampler import SamplingProfiler, DEFAULT_SAMPLE_INTERVAL
+from zai.timings import PhaseTimings
+from zai.allocations import AllocationTracker
 from pathlib import Path
-from sys import exit
+from sys import exit, stderr
+
+
+def write_profile(profiler, report_path):
+    """
+    Write the results of profiling to report_path and a file with the same name and
+    the suffix ".folded".
+    """
+    if profiler is not None:
+        stacks_path = Path(report_path).with_suffix(".folded")
+        profiler.write(report_path, stacks_path)
+        print("Profile written to {} and {}".format(report_path, stacks_path), file=stderr)
+
+
+def write_timings(timings):
+    """
+    Print the phase timings to stderr so they are not mixed with the program output.
+    """
+    if timings is not None:
+        print(timings.report(), file=stderr, end="")
+
+
+def write_allocations(tracker, report_path):
+    """
+    Write the objects recorded by the allocation tracker to report_path.
+    """
+    if tracker is not None:
+        tracker.write(report_path)
+        print("Allocations written to {}".format(report_path), file=stderr)
 
 
 def main():
-    vm = YaplVm()
     arg_parser = argparse.ArgumentParser(
         "yapl",
         description="An interpreter for yapl.",
@@ -43,13 +75,135 @@ def main():
         required=False,
         type=str,
     )
+    arg_parser.add_argument(
+        "--explicit_stack",
+        action="store_true",
+        help="Evaluate code using an explicit call stack to allow for deep recursion.",
+    )
+    arg_parser.add_argument(
+        "--max_call_depth",
+        help="Maximum depth of the call stack used by --explicit_stack.",
+        default=DEFAULT_MAX_CALL_DEPTH,
+        type=int,
+    )
+    arg_parser.add_argument(
+        "--max_steps",
+        help="Stop the program with an error once it takes more loop iterations and function calls than this.",
+        default=None,
+        type=int,
+    )
+    arg_parser.add_argument(
+        "--memory_limit",
+        help=(
+            "Stop the program with an error once its strings, arrays, dictionaries and scopes hold more than this "
+            "many bytes."
+        ),
+        default=None,
+        type=int,
+    )
+    arg_parser.add_argument(
+        "--no_optimize",
+        action="store_true",
+        help="Evaluate code exactly as it is written without optimizing it first.",
+    )
+
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Measure the time spent within each function and write a report to --profile_output along with "
+            "collapsed call stacks for flamegraph tools to a .folded file."
+        ),
+    )
+    arg_parser.add_argument(
+        "--profile_output",
+        default="zai-profile.txt",
+        metavar="REPORT_PATH",
+        help="Path of the report written by --profile(default: zai-profile.txt).",
+    )
+
+    arg_parser.add_argument(
+        "--sample",
+        action="store_true",
+        help=(
+            "Periodically sample the call stack and write the functions and lines found most often to "
+            "--sample_output along with the sampled call stacks for flamegraph tools to a .folded file."
+        ),
+    )
+    arg_parser.add_argument(
+        "--sample_output",
+        default="zai-samples.txt",
+        metavar="REPORT_PATH",
+        help="Path of the report written by --sample(default: zai-samples.txt).",
+    )
+    arg_parser.add_argument(
+        "--sample_interval",
+        help="Time between two samples taken by --sample in milliseconds.",
+        default=DEFAULT_SAMPLE_INTERVAL * 1000,
+        type=float,
+    )
+    arg_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help=(
+            "Print the time spent lexing, parsing, optimizing and executing the code along with the number of "
+            "tokens, AST nodes, scopes, imports and objects created."
+        ),
+    )
+    arg_parser.add_argument(
+        "--allocations",
+        action="store_true",
+        help=(
+            "Record the objects created by each type and source line along with the peak number of live objects "
+            "and write them to --allocations_output."
+        ),
+    )
+    arg_parser.add_argument(
+        "--allocations_output",
+        default="zai-allocations.txt",
+        metavar="REPORT_PATH",
+        help="Path of the report written by --allocations(default: zai-allocations.txt).",
+    )
 
     args = arg_parser.parse_args()
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+    sampler = None
+    if args.sample:
+        sampler = SamplingProfiler(args.sample_interval / 1000)
+    timings = None
+    if args.timings:
+        timings = PhaseTimings()
+    tracker = None
+    if args.allocations:
+        tracker = AllocationTracker()
+    vm = YaplVm(
+        args.explicit_stack,
+        args.max_call_depth,
+        not args.no_optimize,
+        profiler,
+        sampler,
+        timings,
+        tracker,
+        max_steps=args.max_steps,
+        memory_limit=args.memory_limit,
+    )
     if args.eval_string is not None:
         vm.run_string(args.eval_string[0])
+        write_profile(profiler, args.profile_output)
+        write_profile(sampler, args.sample_output)
+        write_timings(timings)
+        write_allocations(tracker, args.allocations_output)
         exit(0)
     elif args.file_path is None:
-        vm.run_repl()
+        try:
+            vm.run_repl()
+        finally:
+            write_profile(profiler, args.profile_output)
+            write_profile(sampler, args.sample_output)
+            write_timings(timings)
+            write_allocations(tracker, args.allocations_output)
         exit(0)
     else:
         f_path = Path(args.file_path)
@@ -57,6 +211,10 @@ def main():
             file_text = f_path.open().read()
             # print(file_text)
             vm.run_string(file_text)
+            write_profile(profiler, args.profile_output)
+            write_profile(sampler, args.sample_output)
+            write_timings(timings)
+            write_allocations(tracker, args.allocations_output)
             exit(0)
 
         print("ERROR: path {} does not exist or is not a file.".format(args.file_path))
@@ -0,0 +1,149 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains the allocation tracker which records the type of every runtime
+object created along with the AST node which created it."""
+import sys
+import tracemalloc
+import weakref
+
+from zai.ast_nodes import position_line, position_col
+from zai.timings import AllocationCounter
+
+# Number of allocation sites listed by the report.
+MAX_REPORTED_SITES = 20
+
+
+def allocation_site(frame):
+    """
+    Return the innermost AST node with a source position which is being evaluated by
+    frame or the frames which called it, or None if there is no such node.
+    """
+    while frame is not None:
+        if "node" in frame.f_code.co_varnames:
+            node = frame.f_locals.get("node")
+            if getattr(node, "pos", None) is not None:
+                return node
+        frame = frame.f_back
+    return None
+
+
+class AllocationTracker(AllocationCounter):
+    """
+    Allocation counter which also records the number of objects of every ObjectType
+    (and scopes) created by each AST node, along with the largest number of objects of
+    every type alive at the same time. When trace_memory is set, tracemalloc measures
+    the peak memory used while the tracker runs.
+    """
+
+    def __init__(self, trace_memory=True):
+        super().__init__()
+        self.trace_memory = trace_memory
+        # Number of objects created, alive and alive at the same time at most for
+        # every type.
+        self.created = dict()
+        self.live = dict()
+        self.peak_live = dict()
+        # Number of objects created by every AST node.
+        self.sites = dict()
+        # Weak reference to every live object along with its type, keyed by the id of
+        # the reference since weak references compare and hash their objects.
+        self.live_refs = dict()
+        self.peak_memory = 0
+        self.started_tracing = False
+        self.source_lines = None
+
+    def start(self, source_text=None):
+        if source_text is not None:
+            self.source_lines = source_text.split("\n")
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            tracemalloc.reset_peak()
+        super().start()
+
+    def stop(self):
+        super().stop()
+        if self.trace_memory:
+            self.peak_memory = max(self.peak_memory, tracemalloc.get_traced_memory()[1])
+            if self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+
+    def record(self, obj):
+        super().record(obj)
+        obj_type = getattr(obj, "obj_type", None)
+        type_name = type(obj).__name__ if obj_type is None else obj_type.name
+        self.created[type_name] = self.created.get(type_name, 0) + 1
+        live = self.live.get(type_name, 0) + 1
+        self.live[type_name] = live
+        if live > self.peak_live.get(type_name, 0):
+            self.peak_live[type_name] = live
+        ref = weakref.ref(obj, self._release)
+        self.live_refs[id(ref)] = (ref, type_name)
+
+        # Skip the frames of record and of the wrapped __init__ method.
+        node = allocation_site(sys._getframe(2))
+        if node is not None:
+            self.sites[node] = self.sites.get(node, 0) + 1
+
+    def _release(self, ref):
+        entry = self.live_refs.pop(id(ref), None)
+        if entry is not None:
+            self.live[entry[1]] -= 1
+
+    def lines(self):
+        """
+        Return the number of objects created by the nodes found on each source line.
+        """
+        lines = dict()
+        for node, count in self.sites.items():
+            line_num = position_line(node.pos)
+            lines[line_num] = lines.get(line_num, 0) + count
+        return lines
+
+    def report(self):
+        """
+        Return tables of the objects created by type, by source line and by AST node.
+        """
+        lines = list()
+        lines.append("{:<16} {:>12} {:>12}".format("type", "created", "peak live"))
+        for type_name, count in sorted(self.created.items(), key=lambda item: item[1], reverse=True):
+            lines.append("{:<16} {:>12} {:>12}".format(type_name, count, self.peak_live[type_name]))
+        if self.trace_memory:
+            lines.append("Peak traced memory: {:.1f} KiB".format(self.peak_memory / 1024))
+
+        lines.append("")
+        lines.append("{:>10} {:>12}  {}".format("line", "created", "source"))
+        for line_num, count in sorted(self.lines().items(), key=lambda item: item[1], reverse=True):
+            source = ""
+            if self.source_lines is not None and line_num <= len(self.source_lines):
+                source = self.source_lines[line_num - 1].strip()
+            lines.append("{:>10} {:>12}  {}".format(line_num, count, source))
+
+        lines.append("")
+        lines.append("{:>10} {:>12}  {}".format("line:col", "created", "node"))
+        sites = sorted(self.sites.items(), key=lambda item: item[1], reverse=True)
+        for node, count in sites[:MAX_REPORTED_SITES]:
+            location = "{}:{}".format(position_line(node.pos), position_col(node.pos))
+            lines.append("{:>10} {:>12}  {}".format(location, count, type(node).__name__))
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_path):
+        with open(report_path, "w") as report_file:
+            report_file.write(self.report())
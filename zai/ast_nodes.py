@@ -18,12 +18,45 @@
 """ Module defining nodes used in the abstract syntax tree created by the parser. """
 from abc import ABC, abstractmethod
 
+from zai.objects import ObjectType
+from zai.tokens import TokType
+
+# Number of low bits of a packed source position which hold the column number.
+POS_COL_BITS = 16
+POS_COL_MASK = (1 << POS_COL_BITS) - 1
+
+
+def pack_position(line_num, col_num):
+    """
+    Pack the line and column of a token into a single integer. Columns past the
+    largest representable column are clamped to it.
+    """
+    return (line_num << POS_COL_BITS) | min(col_num, POS_COL_MASK)
+
+
+def position_line(pos):
+    """
+    Return the line number(starting from 1) of a packed source position.
+    """
+    return (pos >> POS_COL_BITS) + 1
+
+
+def position_col(pos):
+    """
+    Return the column number of a packed source position.
+    """
+    return pos & POS_COL_MASK
+
 
 class ASTNode(ABC):
     """
     Base class from which all AST nodes are derived.
     """
 
+    # Packed position of the token the node was created from, or None for nodes
+    # which do not come from the source text.
+    pos = None
+
     @abstractmethod
     def __str__(self):
         pass
@@ -58,7 +91,7 @@ class PrintNode(ASTNode):
         self.expr = expr
 
     def accept(self, visitor):
-        visitor.visit_print(self)
+        return visitor.visit_print(self)
 
     def __str__(self):
         return "{}".format(self.expr)
@@ -78,12 +111,12 @@ class PropertyAccessNode(ASTNode):
 
 class ReassignBinNode(ASTNode):
     def __init__(self, symbol_path, symbol_name, value):
-        self.path = symbol_path  # Path leading to the symbol
-        self.name = symbol_name  # The actual symbol name within the environment
+        self.symbol_path = symbol_path  # Path leading to the symbol
+        self.symbol_name = symbol_name  # The actual symbol name within the environment
         self.value = value
 
     def __str__(self):
-        return "REPLACE_ASSIGN_NODE {} {} {}".format(self.name, self.path, self.value)
+        return "REPLACE_ASSIGN_NODE {} {} {}".format(self.symbol_name, self.symbol_path, self.value)
 
     def accept(self, visitor):
         return visitor.visit_replace_assign(self)
@@ -91,12 +124,12 @@ class ReassignBinNode(ASTNode):
 
 class NewAssignBinNode(ASTNode):
     def __init__(self, symbol_path, symbol_name, value):
-        self.path = symbol_path
-        self.name = symbol_name
+        self.symbol_path = symbol_path
+        self.symbol_name = symbol_name
         self.value = value
 
     def __str__(self):
-        return "NEW_ASSIGN_NODE {} {} {}".format(self.name, self.path, self.value)
+        return "NEW_ASSIGN_NODE {} {} {}".format(self.symbol_name, self.symbol_path, self.value)
 
     def accept(self, visitor):
         return visitor.visit_new_assign(self)
@@ -206,6 +239,8 @@ class WhileNode(ASTNode):
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
+        # Expressions hoisted out of the loop by the optimizer.
+        self.invariants = list()
 
     def __str__(self):
         return "WHILE_NODE: condition: {} body:{}".format(self.condition, self.body)
@@ -214,11 +249,28 @@ class WhileNode(ASTNode):
         return visitor.visit_while(self)
 
 
+class ForNode(ASTNode):
+    def __init__(self, var_name, iterable, body):
+        self.var_name = var_name
+        self.iterable = iterable
+        self.body = body
+        # Expressions hoisted out of the loop by the optimizer.
+        self.invariants = list()
+
+    def __str__(self):
+        return "FOR_NODE: variable: {} iterable: {} body:{}".format(self.var_name, self.iterable, self.body)
+
+    def accept(self, visitor):
+        return visitor.visit_for(self)
+
+
 class SwitchNode(ASTNode):
     def __init__(self, switch_cond, switch_cases, default_case):
         self.switch_cond = switch_cond
         self.switch_cases = switch_cases
         self.default_case = default_case
+        # Index of the case matching each value when all labels are literals.
+        self.jump_table = switch_jump_table(switch_cases)
 
     def __str__(self):
         return "SWITCH_NODE: condition: {} cases:{} default:{}".format(
@@ -309,6 +361,7 @@ class FuncNode(ASTNode):
         self.name = name
         self.args = args
         self.body = body
+        self.frame_layout = frame_layout(args, body)
 
     def __str__(self):
         return "FUNC_NODE {}".format(self.name)
@@ -320,6 +373,9 @@ class FuncNode(ASTNode):
 class BlockNode(ASTNode):
     def __init__(self, block_stmnts):
         self.stmnts = block_stmnts
+        # Blocks which do not declare anything are evaluated within the enclosing
+        # scope instead of creating a new one.
+        self.needs_scope = declares_names(block_stmnts)
 
     def __str__(self):
         output = str()
@@ -348,6 +404,7 @@ class ClassMethodNode(ASTNode):
         self.name = name
         self.args = args
         self.body = body
+        self.frame_layout = frame_layout(args, body, ["this"])
 
     def __str__(self):
         return "CLASS_METHOD_NODE {}".format(self.name)
@@ -404,6 +461,9 @@ class ContinueNode(ASTNode):
 class ReturnNode(ASTNode):
     def __init__(self, return_expr):
         self.expr = return_expr
+        # Returning the result of a call is always a call in tail position since
+        # nothing is left to evaluate within the current function once it returns.
+        self.tail_call = isinstance(return_expr, CallNode)
 
     def __str__(self):
         return "RETURN_NODE {}".format(self.expr)
@@ -416,6 +476,8 @@ class DoWhileNode(ASTNode):
     def __init__(self, cond, body):
         self.cond = cond
         self.body = body
+        # Expressions hoisted out of the loop by the optimizer.
+        self.invariants = list()
 
     def __str__(self):
         return "DO_WHILE_NODE {}, {}".format(self.cond, self.body)
@@ -506,3 +568,103 @@ class SubassignNode(ASTNode):
 
     def accept(self, visitor):
         return visitor.visit_sub_assign(self)
+
+
+class InvariantNode(ASTNode):
+    def __init__(self, expr):
+        """
+        Wraps an expression whose value does not change while the enclosing loop runs.
+        The value is computed the first time it is needed after the loop is entered
+        and reused until the loop is entered again.
+        """
+        self.expr = expr
+        self.value = None
+        self.pos = expr.pos
+
+    def __str__(self):
+        return "INVARIANT_NODE: {}".format(self.expr)
+
+    def accept(self, visitor):
+        return visitor.visit_invariant(self)
+
+
+def iter_child_nodes(node):
+    """
+    Yield all AST nodes which are direct children of node.
+    """
+    for value in vars(node).values():
+        yield from _iter_nodes(value)
+
+
+def _iter_nodes(value):
+    if isinstance(value, ASTNode):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for elem in value:
+            yield from _iter_nodes(elem)
+
+
+def walk(node):
+    """
+    Yield node and all of its descendants.
+    """
+    pending = [node]
+    while pending:
+        curr_node = pending.pop()
+        yield curr_node
+        pending.extend(iter_child_nodes(curr_node))
+
+
+def declares_names(stmnts):
+    """
+    Check if any of the statements introduces a new name into the scope they are
+    evaluated in.
+    """
+    for stmnt in stmnts:
+        if isinstance(stmnt, (NewAssignBinNode, FuncNode, ClassDefNode, ImportNode)):
+            return True
+    return False
+
+
+def switch_jump_table(switch_cases):
+    """
+    Map the value of every case label to the index of the first case using it so the
+    matching case can be found without evaluating the labels. Return None unless all
+    labels are integer, string or boolean literals.
+    """
+    jump_table = dict()
+    for idx, (case_label, _) in enumerate(switch_cases):
+        if isinstance(case_label, IntNode):
+            key = (ObjectType.INT, case_label.val)
+        elif isinstance(case_label, StringNode):
+            key = (ObjectType.STR, case_label.val)
+        elif isinstance(case_label, BoolNode):
+            key = (ObjectType.BOOL, case_label.val == TokType.TRUE)
+        else:
+            return None
+        jump_table.setdefault(key, idx)
+    return jump_table
+
+
+def frame_layout(args, body, extra_names=None):
+    """
+    Determine the names of all variables which live within the scope of a function
+    call. Return None if the scope of a call can be captured by a function or class
+    defined within the body since it cannot be reused once the call is done.
+    """
+    for stmnt in body:
+        for node in walk(stmnt):
+            if isinstance(node, (FuncNode, ClassDefNode, ImportNode)):
+                return None
+
+    local_names = [arg.lexeme for arg in args]
+    if extra_names is not None:
+        local_names.extend(extra_names)
+    for stmnt in body:
+        if (
+            isinstance(stmnt, NewAssignBinNode)
+            and stmnt.symbol_path is None
+            and isinstance(stmnt.symbol_name, SymbolNode)
+        ):
+            local_names.append(stmnt.symbol_name.val)
+    return tuple(dict.fromkeys(local_names))
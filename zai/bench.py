@@ -0,0 +1,297 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains the benchmark runner which times the programs of a benchmark suite
+and compares the results against a stored baseline. Run it with python -m zai.bench."""
+import argparse
+import io
+import json
+import os
+import statistics
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from zai.lexer import Lexer
+from zai.parse import Parser
+from zai.vm import YaplVm
+
+DEFAULT_SUITE_PATH = Path(__file__).resolve().parent.parent / "benchmarks" / "suite"
+# Name of the suite directory containing the modules imported by the programs.
+MODULES_DIR = "modules"
+# Name of the benchmark which lexes and parses the source of every program in the
+# suite, repeated PARSE_REPEAT times.
+PARSE_BENCHMARK = "lex_parse"
+PARSE_REPEAT = 20
+DEFAULT_WARMUP = 1
+DEFAULT_REPEAT = 5
+# Slowdown of the median time in percent beyond which a benchmark regressed.
+DEFAULT_THRESHOLD = 10.0
+
+
+class BenchmarkError(Exception):
+    """
+    Raised when a benchmark program does not produce its expected output.
+    """
+
+
+class Benchmark:
+    """
+    A single benchmark of the suite. Running it once performs one operation.
+    """
+
+    def __init__(self, name, run, expected_output=None):
+        self.name = name
+        self.run = run
+        self.expected_output = expected_output
+
+    def check(self, output):
+        if self.expected_output is not None and output != self.expected_output:
+            raise BenchmarkError(
+                "Benchmark {} printed {!r} instead of {!r}.".format(self.name, output, self.expected_output)
+            )
+
+
+def _program_runner(text, explicit_stack, max_steps):
+    def run():
+        YaplVm(explicit_stack=explicit_stack, max_steps=max_steps).run_string(text)
+
+    return run
+
+
+def _parse_runner(text):
+    def run():
+        Parser(Lexer().tokenize_string(text), text).parse()
+
+    return run
+
+
+def load_suite(suite_path, explicit_stack=False, name_filter=None, max_steps=None):
+    """
+    Return the benchmarks of the suite found at suite_path: one for every .zai program,
+    which is checked against the .expected file next to it when there is one, and one
+    which lexes and parses the source of all programs. Only the benchmarks whose name
+    contains name_filter are returned when it is given. The programs are run with a
+    step budget of max_steps.
+    """
+    suite_path = Path(suite_path)
+    benchmarks = list()
+    sources = list()
+    for program_path in sorted(suite_path.glob("*.zai")):
+        text = program_path.read_text()
+        sources.append(text)
+        expected_path = program_path.with_suffix(".expected")
+        expected_output = None
+        if expected_path.exists():
+            expected_output = expected_path.read_text()
+        run = _program_runner(text, explicit_stack, max_steps)
+        benchmarks.append(Benchmark(program_path.stem, run, expected_output))
+    if sources:
+        benchmarks.append(Benchmark(PARSE_BENCHMARK, _parse_runner("\n".join(sources * PARSE_REPEAT))))
+
+    if name_filter is not None:
+        benchmarks = [benchmark for benchmark in benchmarks if name_filter in benchmark.name]
+    return benchmarks
+
+
+def summarize(times):
+    """
+    Return the statistical summary of the times(in seconds) measured for a benchmark.
+    """
+    median = statistics.median(times)
+    return {
+        "runs": len(times),
+        "mean": statistics.mean(times),
+        "median": median,
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "min": min(times),
+        "max": max(times),
+        "ops_per_sec": 1 / median if median > 0 else float("inf"),
+    }
+
+
+def run_benchmark(benchmark, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT, clock=time.perf_counter):
+    """
+    Run a benchmark warmup times without measuring it and then repeat times, checking
+    the output of every run, and return the summary of the measured times.
+    """
+    times = list()
+    for index in range(warmup + repeat):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            start = clock()
+            benchmark.run()
+            elapsed = clock() - start
+        benchmark.check(output.getvalue())
+        if index >= warmup:
+            times.append(elapsed)
+    return summarize(times)
+
+
+def run_suite(benchmarks, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT, suite_path=None):
+    """
+    Run every benchmark and return the summaries keyed by benchmark name. Modules
+    imported by the programs are looked up within the modules directory of suite_path.
+    """
+    previous_path = os.environ.get("ZAI_PATH")
+    if suite_path is not None:
+        modules_path = str(Path(suite_path).resolve() / MODULES_DIR)
+        os.environ["ZAI_PATH"] = modules_path if previous_path is None else modules_path + ":" + previous_path
+    try:
+        return {benchmark.name: run_benchmark(benchmark, warmup, repeat) for benchmark in benchmarks}
+    finally:
+        if previous_path is None:
+            os.environ.pop("ZAI_PATH", None)
+        else:
+            os.environ["ZAI_PATH"] = previous_path
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare the median times of the results with the ones of the baseline and return
+    a list of (name, baseline median, median, change in percent) for every benchmark
+    which slowed down by more than threshold percent.
+    """
+    regressions = list()
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        base_median = baseline[name]["median"]
+        change = (summary["median"] / base_median - 1) * 100
+        if change > threshold:
+            regressions.append((name, base_median, summary["median"], change))
+    return regressions
+
+
+def report(results, baseline=None):
+    """
+    Return the results as a human readable table including the change of the median
+    time compared to the baseline when one is given.
+    """
+    lines = list()
+    lines.append(
+        "{:<20} {:>12} {:>12} {:>12} {:>12} {:>10}".format(
+            "benchmark", "ops/sec", "median(s)", "mean(s)", "stdev(s)", "change"
+        )
+    )
+    for name, summary in results.items():
+        change = ""
+        if baseline is not None and name in baseline:
+            change = "{:+.1f}%".format((summary["median"] / baseline[name]["median"] - 1) * 100)
+        lines.append(
+            "{:<20} {:>12.2f} {:>12.6f} {:>12.6f} {:>12.6f} {:>10}".format(
+                name, summary["ops_per_sec"], summary["median"], summary["mean"], summary["stdev"], change
+            )
+        )
+    return "\n".join(lines) + "\n"
+
+
+def save_baseline(results, baseline_path):
+    with open(baseline_path, "w") as baseline_file:
+        json.dump({"benchmarks": results}, baseline_file, indent=2, sort_keys=True)
+
+
+def load_baseline(baseline_path):
+    with open(baseline_path, "r") as baseline_file:
+        return json.load(baseline_file)["benchmarks"]
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        "zai.bench",
+        description="Run the zai benchmark suite and compare the results against a baseline.",
+    )
+    arg_parser.add_argument(
+        "--suite",
+        help="Directory containing the benchmark programs.",
+        default=str(DEFAULT_SUITE_PATH),
+    )
+    arg_parser.add_argument(
+        "--filter",
+        help="Only run the benchmarks whose name contains this string.",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--warmup",
+        help="Number of runs of each benchmark before measuring it.",
+        default=DEFAULT_WARMUP,
+        type=int,
+    )
+    arg_parser.add_argument(
+        "--repeat",
+        help="Number of measured runs of each benchmark.",
+        default=DEFAULT_REPEAT,
+        type=int,
+    )
+    arg_parser.add_argument(
+        "--explicit_stack",
+        action="store_true",
+        help="Evaluate the programs using an explicit call stack.",
+    )
+    arg_parser.add_argument(
+        "--max_steps",
+        help="Run the programs with a step budget of this many steps(to measure the cost of checking it).",
+        default=None,
+        type=int,
+    )
+    arg_parser.add_argument(
+        "--save_baseline",
+        metavar="BASELINE_PATH",
+        help="Store the results as JSON to BASELINE_PATH.",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--baseline",
+        metavar="BASELINE_PATH",
+        help="Compare the results against the baseline stored at BASELINE_PATH.",
+        default=None,
+    )
+    arg_parser.add_argument(
+        "--threshold",
+        help="Exit with an error when a median time is this many percent slower than the baseline.",
+        default=DEFAULT_THRESHOLD,
+        type=float,
+    )
+
+    args = arg_parser.parse_args(argv)
+    if args.repeat < 1:
+        arg_parser.error("--repeat must be at least 1.")
+    benchmarks = load_suite(args.suite, args.explicit_stack, args.filter, args.max_steps)
+    if not benchmarks:
+        arg_parser.error("No benchmarks found within {}.".format(args.suite))
+    baseline = None
+    if args.baseline is not None:
+        baseline = load_baseline(args.baseline)
+
+    results = run_suite(benchmarks, args.warmup, args.repeat, args.suite)
+    print(report(results, baseline), end="")
+    if args.save_baseline is not None:
+        save_baseline(results, args.save_baseline)
+        print("Baseline written to {}".format(args.save_baseline))
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, base_median, median, change in regressions:
+            print(
+                "REGRESSION: {} took {:.6f}s instead of {:.6f}s({:+.1f}%).".format(name, median, base_median, change)
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
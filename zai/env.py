@@ -19,12 +19,21 @@
 Module containing classes related to managing the interpreter environment
 and nested scopes.
 """
+from zai import memory
 
 
 class Scope:
+    # MemoryQuota charged for the scope and the number of bytes charged.
+    quota = None
+    held_bytes = 0
+    __del__ = memory.release_memory
+
     def __init__(self, parent):
         self.scope = dict()
         self.parent = parent
+        quota = memory.active_quota.get()
+        if quota is not None:
+            quota.charge(self, memory.SCOPE_SIZE)
 
     def initialize_variable(self, var_name, value):
         """
@@ -44,7 +53,8 @@ class Scope:
         """
         assert var_name is not None, "Variable name to be replaced is None."
         assert value is not None, "Variable value to be replaced is None"
-        if var_name in self.scope.keys():
+        # Slots of activation records which have not been assigned yet hold None.
+        if self.scope.get(var_name) is not None:
             self.scope[var_name] = value
             return True
         elif self.parent is None:
@@ -83,6 +93,47 @@ class Scope:
         return str(self.scope)
 
 
+class ActivationRecordPool:
+    """
+    Pool of scopes which are reused as activation records by the calls of a single
+    function. Each record contains one slot for every argument and local variable of
+    the function so its size never changes while the function runs.
+    """
+
+    # Maximum number of idle records kept by a pool. Records used by deep recursion
+    # beyond this number are left to the garbage collector.
+    max_idle_records = 64
+
+    def __init__(self, local_names):
+        self.local_names = local_names
+        self.empty_slots = dict.fromkeys(local_names)
+        self.idle_records = list()
+
+    def acquire(self, parent):
+        """
+        Return an activation record whose parent scope is parent. All slots of the
+        record are empty.
+        """
+        if self.idle_records:
+            record = self.idle_records.pop()
+            record.parent = parent
+            return record
+
+        record = Scope(parent)
+        record.scope.update(self.empty_slots)
+        return record
+
+    def release(self, record):
+        """
+        Return a record to the pool once the call using it is done.
+        """
+        # Records which gained variables outside of their layout cannot be reused.
+        if len(self.idle_records) < self.max_idle_records and len(record.scope) == len(self.empty_slots):
+            record.scope.update(self.empty_slots)
+            record.parent = None
+            self.idle_records.append(record)
+
+
 class EnvironmentStack:
     """
     Class responsible for managing a stack of environment scopes.
@@ -116,6 +167,13 @@ class EnvironmentStack:
         self.scopes.append(Scope(parent_scope))
         self.stack_height += 1
 
+    def push_scope(self, scope):
+        """
+        Put an existing scope on top of the scope stack.
+        """
+        self.scopes.append(scope)
+        self.stack_height += 1
+
     def __str__(self):
         env_stack = str()
         for scope in self.scopes:
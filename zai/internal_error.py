@@ -24,6 +24,11 @@ class InternalError(Exception):
     Base class for all internal errors used by the interpreter.
     """
 
+    # Line(starting from 1) and column of the source code being evaluated when an
+    # error was raised at runtime, if it is known.
+    line_num = None
+    col_num = None
+
     def __init__(
         self,
     ):
@@ -35,6 +40,23 @@ class InternalError(Exception):
     def __repr__(self):
         raise NotImplementedError()
 
+    def set_location(self, line_num, col_num):
+        """
+        Record the source location an error raised at runtime is attributed to. Only
+        the first location recorded is kept, which is the innermost one.
+        """
+        if self.line_num is None:
+            self.line_num = line_num
+            self.col_num = col_num
+
+    def location_str(self):
+        """
+        Return the location of the error as a prefix of its message.
+        """
+        if self.line_num is None:
+            return ""
+        return "Line {}, Column {}: ".format(self.line_num, self.col_num)
+
 
 class InternalTypeError(InternalError):
     def __init__(self, operation, left_type, right_type=None):
@@ -54,7 +76,7 @@ class InternalTypeError(InternalError):
             )
 
     def __str__(self):
-        return "Typecheck Error: {}".format(self.err_msg)
+        return "Typecheck Error: {}{}".format(self.location_str(), self.err_msg)
 
     def __repr__(self):
         "Internal Runtime Error: Operation {}, Left Side: {}, Right Side: {}".format(
@@ -72,12 +94,45 @@ class InternalRuntimeError(InternalError):
         self.message = message
 
     def __str__(self):
-        return "Runtime Error: {}".format(self.message)
+        return "Runtime Error: {}{}".format(self.location_str(), self.message)
 
     def __repr__(self):
         "Internal Runtime Error: {}".format(self.message)
 
 
+class InternalStackOverflowError(InternalRuntimeError):
+    """
+    Class representing an overflow of the interpreter's call stack.
+    """
+
+    def __init__(self, max_depth):
+        """Class representing a call stack which has grown past its maximum depth."""
+        self.max_depth = max_depth
+        self.message = "Maximum call stack depth of {} exceeded!".format(max_depth)
+
+
+class InternalStepLimitError(InternalRuntimeError):
+    """
+    Class representing a program which has taken more steps than its budget allows.
+    """
+
+    def __init__(self, max_steps):
+        """Class representing an exhausted step budget."""
+        self.max_steps = max_steps
+        self.message = "Step budget of {} steps exhausted!".format(max_steps)
+
+
+class InternalMemoryError(InternalRuntimeError):
+    """
+    Class representing a program which holds more memory than its quota allows.
+    """
+
+    def __init__(self, limit):
+        """Class representing an exceeded memory quota."""
+        self.limit = limit
+        self.message = "Memory quota of {} bytes exceeded!".format(limit)
+
+
 class InternalParseError(InternalError):
     """
     Class representing an internal error encountered during parsing/lexing stages.
@@ -139,6 +139,8 @@ class Lexer:
                 self.token_stream.append(Token(TokType.COMMA, None, self.curr_lin_num, self.curr_col_num))
             elif self.curr_char == ";":
                 self.token_stream.append(Token(TokType.SEMIC, None, self.curr_lin_num, self.curr_col_num))
+            elif self.curr_char == ":":
+                self.token_stream.append(Token(TokType.COLON, None, self.curr_lin_num, self.curr_col_num))
             elif self.curr_char == "{":
                 self.token_stream.append(Token(TokType.LCURLY, None, self.curr_lin_num, self.curr_col_num))
             elif self.curr_char == "}":
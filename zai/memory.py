@@ -0,0 +1,90 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains the memory quota which keeps track of the approximate number of
+bytes held by the strings, arrays, dictionaries and scopes created by a VM."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from zai.internal_error import InternalMemoryError
+
+# Approximate number of bytes held by a string object besides its characters, an
+# array object besides its elements, a single array element or dictionary entry, a
+# dictionary object besides its entries and a scope.
+STRING_SIZE = 100
+ARRAY_SIZE = 150
+ELEMENT_SIZE = 8
+DICT_SIZE = 250
+SCOPE_SIZE = 350
+
+# Quota charged for the objects being created, or None if no VM with a quota is
+# evaluating code. Every thread and asyncio task has a value of its own, so VMs
+# evaluating code at the same time are charged to their own quotas.
+active_quota = ContextVar("active_quota", default=None)
+
+
+def release_memory(self):
+    """
+    Return the bytes held by an object to the quota they were charged to once the
+    object is destroyed. Used as the __del__ method of the charged classes.
+    """
+    quota = self.quota
+    if quota is not None:
+        quota.used -= self.held_bytes
+
+
+class MemoryQuota:
+    """
+    Approximate number of bytes held by the strings, arrays, dictionaries and scopes
+    created while the quota is active, along with the largest number held at once.
+    Objects charge the active quota when they are created(and arrays and dictionaries
+    whenever they grow) and remember
+    the quota and the number of bytes charged. Creating an object which takes the
+    bytes held past the limit raises an InternalMemoryError.
+
+    The bytes held by an object are returned to its quota once the object is
+    destroyed, whether or not the quota is still active by then.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+
+    def charge(self, obj, size):
+        """
+        Charge size bytes held by obj(negative when obj shrinks) to the quota.
+        """
+        obj.quota = self
+        obj.held_bytes += size
+        self.used += size
+        if self.used > self.peak:
+            self.peak = self.used
+        if size > 0 and self.limit is not None and self.used > self.limit:
+            raise InternalMemoryError(self.limit)
+
+    @contextmanager
+    def activate(self):
+        """
+        Charge the objects created within the body of the "with" statement to this
+        quota.
+        """
+        token = active_quota.set(self)
+        try:
+            yield
+        finally:
+            active_quota.reset(token)
@@ -20,8 +20,12 @@ Module contains several classes used to represent internal objects within the
 interpreter.
 """
 from enum import Enum, auto
-from zai.env import Scope
+from collections import OrderedDict
+import array
+import operator
+from zai.env import Scope, ActivationRecordPool
 from zai.internal_error import InternalTypeError
+from zai import memory
 from abc import ABC, abstractmethod
 
 
@@ -46,6 +50,9 @@ class ObjectType(Enum):
     CONTINUE = auto()
     ARRAY = auto()
     MODULE = auto()
+    RANGE = auto()
+    DICT = auto()
+    MEMO_FUNC = auto()
 
     def __str__(self):
         type_to_str = {
@@ -62,10 +69,17 @@ class ObjectType(Enum):
             "NIL": "nil",
             "ARRAY": "array",
             "MODULE": "module namespace",
+            "RANGE": "range",
+            "DICT": "dictionary",
+            "MEMO_FUNC": "memoized function",
         }
         return type_to_str[self.name]
 
 
+# Types of objects which hold a single value and cannot contain other objects.
+ATOMIC_TYPES = (ObjectType.INT, ObjectType.FLOAT, ObjectType.STR, ObjectType.BOOL, ObjectType.NIL)
+
+
 class InternalObject(ABC):
     """
     Base class for all internal objects used in the interpreter.
@@ -75,6 +89,14 @@ class InternalObject(ABC):
     def __str__(self):
         pass
 
+    def raw_equals(self, other):
+        """
+        Check if the object is equal to other, returning a Python bool instead of a
+        boolean object. The interpreter uses it whenever it compares values itself.
+        Objects without a notion of equality are only equal to themselves.
+        """
+        return self is other
+
 
 # All atomic objects
 class NilObject(InternalObject):
@@ -93,7 +115,13 @@ class NilObject(InternalObject):
 
     def __eq__(self, other):
         assert other is not None, "Other is none in __eq__ function for nil object."
-        return BoolObject(self.obj_type == other.obj_type)
+        return BoolObject(self.raw_equals(other))
+
+    def raw_equals(self, other):
+        return self is other or self.obj_type == other.obj_type
+
+    def __hash__(self):
+        return hash((self.obj_type, None))
 
     def __ne__(self, other):
         return ~(self.__eq__(other))
@@ -155,7 +183,13 @@ class BoolObject(InternalObject):
 
     def __eq__(self, other):
         assert other is not None, "Other value in bool internal object __eq__ is none"
-        return BoolObject(self.obj_type == other.obj_type and self.value == other.value)
+        return BoolObject(self.raw_equals(other))
+
+    def raw_equals(self, other):
+        return self is other or (self.obj_type == other.obj_type and self.value == other.value)
+
+    def __hash__(self):
+        return hash((self.obj_type, self.value))
 
     def __ne__(self, other):
         # Using the invert operator(~) will return a new boolean object.
@@ -228,12 +262,38 @@ class BoolObject(InternalObject):
 class StringObject(InternalObject):
     """
     Internal object used to represent strings within the interpreter.
+
+    Concatenating long strings produces a rope instead of copying both strings. A
+    rope keeps the pieces of the string within a list which can be shared by ropes
+    built on top of each other: appending to the most recently created rope adds the
+    new piece to the end of the same list, so building a string one piece at a time
+    takes linear time. The pieces are only joined into the value of the string the
+    first time it is needed.
     """
 
+    # Concatenations shorter than this are copied right away since joining them
+    # later costs more than copying them.
+    ROPE_MIN_LEN = 64
+    # MemoryQuota charged for the string and the number of bytes charged.
+    quota = None
+    held_bytes = 0
+    __del__ = memory.release_memory
+
     def __init__(self, string_val):
         self.value = string_val
         self.str_len = len(string_val)
         self.obj_type = ObjectType.STR
+        quota = memory.active_quota.get()
+        if quota is not None:
+            quota.charge(self, memory.STRING_SIZE + self.str_len)
+
+    def __getattr__(self, name):
+        # Only called for attributes which are not set. The value of a rope is set
+        # the first time it is accessed.
+        if name != "value":
+            raise AttributeError(name)
+        self.value = "".join(self.parts[: self.part_count])
+        return self.value
 
     def __repr__(self):
         return "STR_OBJ {}".format(self.value)
@@ -241,9 +301,18 @@ class StringObject(InternalObject):
     def __str__(self):
         return self.value
 
+    def __iter__(self):
+        return map(StringObject, self.value)
+
     def __eq__(self, other):
         assert other is not None, "Other variable is none in __eq__ function for string object."
-        return BoolObject(self.obj_type == other.obj_type and self.value == other.value)
+        return BoolObject(self.raw_equals(other))
+
+    def raw_equals(self, other):
+        return self is other or (self.obj_type == other.obj_type and self.value == other.value)
+
+    def __hash__(self):
+        return hash((self.obj_type, self.value))
 
     def __ne__(self, other):
         return ~self.__eq__(other)
@@ -274,10 +343,21 @@ class StringObject(InternalObject):
             raise InternalTypeError(">=", self.obj_type, other.obj_type)
 
     def __add__(self, other):
-        if other.obj_type == ObjectType.STR:
+        if other.obj_type != ObjectType.STR:
+            raise InternalTypeError("+", self.obj_type, other.obj_type)
+
+        str_len = self.str_len + other.str_len
+        if str_len < StringObject.ROPE_MIN_LEN:
             return StringObject(self.value + other.value)
+
+        parts = self.__dict__.get("parts")
+        if "value" not in self.__dict__ and len(parts) == self.part_count:
+            # No other rope has been built on top of this one yet, so it can share
+            # its list of pieces with the new rope.
+            parts.append(other.value)
         else:
-            raise InternalTypeError("+", self.obj_type, other.obj_type)
+            parts = [self.value, other.value]
+        return _new_rope(parts, str_len)
 
     def __sub__(self, other):
         raise InternalTypeError("-", self.obj_type, other.obj_type)
@@ -309,6 +389,21 @@ class StringObject(InternalObject):
         return True
 
 
+def _new_rope(parts, str_len):
+    """
+    Create a string object whose value consists of all pieces within the list parts.
+    """
+    rope = StringObject.__new__(StringObject)
+    rope.parts = parts
+    rope.part_count = len(parts)
+    rope.str_len = str_len
+    rope.obj_type = ObjectType.STR
+    quota = memory.active_quota.get()
+    if quota is not None:
+        quota.charge(rope, memory.STRING_SIZE + str_len)
+    return rope
+
+
 class FloatObject(InternalObject):
     """
     Numeric internal object used to store floats.
@@ -324,6 +419,19 @@ class FloatObject(InternalObject):
     def __str__(self):
         return "{}".format(self.value)
 
+    def __eq__(self, other):
+        assert other is not None, "Other variable is none in __eq__ function for float object."
+        return BoolObject(self.raw_equals(other))
+
+    def raw_equals(self, other):
+        return self is other or (self.obj_type == other.obj_type and self.value == other.value)
+
+    def __hash__(self):
+        return hash((self.obj_type, self.value))
+
+    def __ne__(self, other):
+        return ~(self.__eq__(other))
+
     def __add__(self, other):
         if other.obj_type in [ObjectType.FLOAT, ObjectType.INT]:
             return FloatObject(self.value + other.value)
@@ -404,7 +512,13 @@ class IntObject(InternalObject):
 
     def __eq__(self, other):
         assert other is not None, "Other variable is None in __eq__ method for numeric objects."
-        return BoolObject(self.obj_type == other.obj_type and self.value == other.value)
+        return BoolObject(self.raw_equals(other))
+
+    def raw_equals(self, other):
+        return self is other or (self.obj_type == other.obj_type and self.value == other.value)
+
+    def __hash__(self):
+        return hash((self.obj_type, self.value))
 
     def __ne__(self, other):
         return ~(self.__eq__(other))
@@ -474,41 +588,264 @@ class IntObject(InternalObject):
         return bool(self.value)
 
 
+class TypedArrayType:
+    """
+    Describes the raw values stored by a typed array and how they are converted from
+    and to internal objects.
+    """
+
+    def __init__(self, name, type_code, obj_type, raw_type, box, value_range=None):
+        self.name = name
+        # Type code of the array.array used to store the raw values.
+        self.type_code = type_code
+        # Type of the internal objects which can be stored within the array.
+        self.obj_type = obj_type
+        # Python type of the values held by those internal objects. Integer objects
+        # may hold floats(ex. the result of a division).
+        self.raw_type = raw_type
+        # Function used to create an internal object from a raw value.
+        self.box = box
+        # Smallest and largest integer which can be stored.
+        self.value_range = value_range
+
+    def accepts(self, value):
+        """
+        Check if the internal object value can be stored as a raw value.
+        """
+        if getattr(value, "obj_type", None) != self.obj_type or type(value.value) is not self.raw_type:
+            return False
+        if self.value_range is not None:
+            return self.value_range[0] <= value.value <= self.value_range[1]
+        return True
+
+    def new_storage(self, raw_values=()):
+        return array.array(self.type_code, raw_values)
+
+
+class StorageWindow:
+    """
+    Read-only sequence of the elements start up to but not including stop of the
+    storage of another array. Array views use it as their storage so creating a view
+    does not copy any elements.
+    """
+
+    def __init__(self, storage, start, stop):
+        self.storage = storage
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            positions = range(self.start, self.stop)[idx]
+            if positions.step == 1:
+                return self.storage[positions.start:positions.stop]
+            return self.storage[self.start:self.stop][idx]
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("Storage window index out of range.")
+        return self.storage[self.start + idx]
+
+    def __iter__(self):
+        if isinstance(self.storage, array.array):
+            # Storage referenced by a window is never resized, so its buffer can be
+            # exported to iterate over the raw values as fast as over an array.
+            return iter(memoryview(self.storage)[self.start:self.stop])
+        return map(self.storage.__getitem__, range(self.start, self.stop))
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(map(operator.eq, self, other))
+
+    def __repr__(self):
+        return "STORAGE_WINDOW start: {}, stop: {}, storage: {}".format(self.start, self.stop, self.storage)
+
+    def index(self, value):
+        return self.storage.index(value, self.start, self.stop) - self.start
+
+
 class ArrayObject(InternalObject):
     """
-    Array internal object used to store a variable amount of elements.
+    Array internal object used to store a variable amount of elements. The elements
+    are kept in a Python list which over-allocates its storage so appending to the
+    end of an array takes amortized constant time.
+
+    Arrays whose elements are all integers, floats or booleans are stored as typed
+    arrays instead. They keep the raw values of their elements within an array.array
+    and create internal objects only when an element is read. Storing a value of any
+    other type turns a typed array back into a regular array.
+
+    Views created by view() share the storage of the array they were created from.
+    Both arrays are marked as shared and whichever is modified first copies the
+    storage, so a view behaves like an independent copy of the elements.
     """
 
-    def __init__(self, elements):
+    # MemoryQuota charged for the array and the number of bytes charged.
+    quota = None
+    held_bytes = 0
+    __del__ = memory.release_memory
+
+    def __init__(self, elements, elem_type=None):
+        """
+        Keyword Arguments:
+        elements  -- Python list of internal objects or, for typed arrays, an
+                     array.array holding the raw values of the elements.
+        elem_type -- TypedArrayType of the elements of a typed array.
+        """
         self.elements = elements
-        self.size = len(elements)
+        self.elem_type = elem_type
+        # Set if the storage may be referenced by another array.
+        self.shared = False
         self.obj_type = ObjectType.ARRAY
+        quota = memory.active_quota.get()
+        if quota is not None:
+            quota.charge(self, memory.ARRAY_SIZE + memory.ELEMENT_SIZE * len(elements))
+
+    @property
+    def size(self):
+        return len(self.elements)
+
+    def view(self, start, stop):
+        """
+        Return an array containing the elements start up to but not including stop
+        without copying them.
+        """
+        storage = self.elements
+        if isinstance(storage, StorageWindow):
+            start += storage.start
+            stop += storage.start
+            storage = storage.storage
+
+        view = ArrayObject(StorageWindow(storage, start, stop), self.elem_type)
+        view.shared = True
+        self.shared = True
+        return view
+
+    def unshare(self):
+        """
+        Copy the storage of the array if another array may reference it. Must be
+        called before the storage is modified in place.
+        """
+        if self.shared:
+            self.elements = self.elements[:]
+            self.shared = False
+
+    def generalize(self):
+        """
+        Turn a typed array into a regular array holding internal objects.
+        """
+        if self.elem_type is not None:
+            self.elements = list(map(self.elem_type.box, self.elements))
+            self.elem_type = None
+            self.shared = False
+
+    def _storable(self, value):
+        """
+        Return the representation of value which is kept within the storage of the
+        array. A typed array which cannot store value is turned into a regular one.
+        """
+        if self.elem_type is None:
+            if self.elements:
+                return value
+            # Empty arrays take the type of the first element added to them.
+            elem_type = TYPED_ARRAY_OBJ_TYPES.get(getattr(value, "obj_type", None))
+            if elem_type is None or not elem_type.accepts(value):
+                return value
+            self.elem_type = elem_type
+            self.elements = elem_type.new_storage()
+
+        if self.elem_type.accepts(value):
+            return value.value
+        self.generalize()
+        return value
+
+    def get_element(self, idx):
+        if self.elem_type is None:
+            return self.elements[idx]
+        return self.elem_type.box(self.elements[idx])
+
+    def set_element(self, idx, value):
+        self.unshare()
+        stored_value = self._storable(value)
+        self.elements[idx] = stored_value
+
+    def append(self, value):
+        """
+        Add value to the end of the array.
+        """
+        self.unshare()
+        stored_value = self._storable(value)
+        self.elements.append(stored_value)
+        if self.quota is not None:
+            self.quota.charge(self, memory.ELEMENT_SIZE)
+
+    def pop(self):
+        """
+        Remove the last element of the array and return it. Return None if the array
+        is empty.
+        """
+        if not self.elements:
+            return None
+        self.unshare()
+        if self.quota is not None:
+            self.quota.charge(self, -memory.ELEMENT_SIZE)
+        if self.elem_type is None:
+            return self.elements.pop()
+        return self.elem_type.box(self.elements.pop())
+
+    def insert(self, idx, value):
+        """
+        Insert value before the element at position idx.
+        """
+        self.unshare()
+        stored_value = self._storable(value)
+        self.elements.insert(idx, stored_value)
+        if self.quota is not None:
+            self.quota.charge(self, memory.ELEMENT_SIZE)
+
+    def reserve(self, capacity):
+        """
+        Hint that the array will grow to hold capacity elements. Python lists
+        manage their own capacity and cannot be resized ahead of time without
+        changing their length, so there is nothing to do beyond checking the hint.
+        """
+        assert capacity >= 0, "Capacity reserved for an array is negative."
 
     def __repr__(self):
         return "ARRAY_OBJ elements: {}, size: {}".format(self.elements, self.size)
 
+    def __iter__(self):
+        if self.elem_type is None:
+            return iter(self.elements)
+        return map(self.elem_type.box, self.elements)
+
     def __str__(self):
-        arr_str = "["
-        for idx in range(0, self.size - 1):
-            arr_str += str(self.elements[idx]) + ", "
-        arr_str += str(self.elements[self.size - 1])
-        arr_str += "]"
-        return arr_str
+        return "[" + ", ".join(str(elem) for elem in self) + "]"
 
     def __eq__(self, other):
         assert other is not None, "Other variable in __eq__ function is None."
-        if self.obj_type == other.obj_type:
-            # Check if size of both arrays are equal
-            if self.size == other.size:
-                # Deep comparison of each element inside
-                for idx in range(0, self.size):
-                    if self.elements[idx] != other.elements[idx]:
-                        return BoolObject(False)
-                return BoolObject(True)
-            else:
-                return BoolObject(False)
-        else:
-            return BoolObject(False)
+        return BoolObject(self.raw_equals(other))
+
+    def raw_equals(self, other):
+        if self is other:
+            return True
+        elif self.obj_type != other.obj_type or self.size != other.size:
+            return False
+        elif self.elem_type is not None and other.elem_type is not None:
+            # Raw values of typed arrays are only equal if the element types are too.
+            if self.elem_type.obj_type != other.elem_type.obj_type:
+                return self.size == 0
+            return self.elements == other.elements
+        # Deep comparison of each element inside
+        for elem, other_elem in zip(self, other):
+            if not elem.raw_equals(other_elem):
+                return False
+        return True
+
+    # Arrays can be modified so they cannot be hashed.
+    __hash__ = None
 
     def __lt__(self, other):
         raise InternalTypeError("<", self.obj_type, other.obj_type)
@@ -517,7 +854,7 @@ class ArrayObject(InternalObject):
         raise InternalTypeError("<=", self.obj_type, other.obj_type)
 
     def __ne__(self, other):
-        return not (self.__eq__(other))
+        return BoolObject(not self.raw_equals(other))
 
     def __gt__(self, other):
         raise InternalTypeError(">", self.obj_type, other.obj_type)
@@ -526,10 +863,18 @@ class ArrayObject(InternalObject):
         raise InternalTypeError(">=", self.obj_type, other.obj_type)
 
     def __add__(self, other):
-        if other.obj_type == ObjectType.ARRAY:
-            self.elements.extend(other.elements)
+        # Adding produces a new array. Use append() to grow an array in place.
+        new_array = ArrayObject(self.elements[:], self.elem_type)
+        if other.obj_type != ObjectType.ARRAY:
+            new_array.append(other)
+        elif self.elem_type is other.elem_type:
+            new_array.elements.extend(other.elements)
+            if new_array.quota is not None:
+                new_array.quota.charge(new_array, memory.ELEMENT_SIZE * len(other.elements))
         else:
-            self.elements.append(other)
+            for elem in other:
+                new_array.append(elem)
+        return new_array
 
     def __sub__(self, other):
         raise InternalTypeError("-", self.obj_type, other.obj_type)
@@ -561,6 +906,162 @@ class ArrayObject(InternalObject):
         return True
 
 
+class RangeObject(InternalObject):
+    """
+    Internal object used to represent a sequence of consecutive integers. The
+    integers are only created while the range is iterated over.
+    """
+
+    def __init__(self, start, end):
+        self.obj_type = ObjectType.RANGE
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return "RANGE_OBJ start: {}, end: {}".format(self.start, self.end)
+
+    def __str__(self):
+        return "range({}, {})".format(self.start, self.end)
+
+    def __iter__(self):
+        return map(IntObject, range(self.start, self.end))
+
+    def __invert__(self):
+        return BoolObject(not self.__bool__())
+
+    def __bool__(self):
+        return self.start < self.end
+
+
+class DictObject(InternalObject):
+    """
+    Dictionary internal object mapping keys to values. Only integers, floats, strings,
+    booleans and nil can be used as keys. Each key is stored under its type and raw
+    value, so two keys refer to the same entry exactly when they are equal.
+    """
+
+    # MemoryQuota charged for the dictionary and the number of bytes charged.
+    quota = None
+    held_bytes = 0
+    __del__ = memory.release_memory
+
+    def __init__(self):
+        # Maps the type and raw value of each key to the key object and its value.
+        self.entries = dict()
+        self.obj_type = ObjectType.DICT
+        quota = memory.active_quota.get()
+        if quota is not None:
+            quota.charge(self, memory.DICT_SIZE)
+
+    @property
+    def size(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Return the value stored under key or None if there is no such value.
+        """
+        entry = self.entries.get(dict_key(key))
+        if entry is None:
+            return None
+        return entry[1]
+
+    def set(self, key, value):
+        hash_key = dict_key(key)
+        new_key = hash_key not in self.entries
+        self.entries[hash_key] = (key, value)
+        if new_key and self.quota is not None:
+            self.quota.charge(self, memory.ELEMENT_SIZE)
+
+    def has(self, key):
+        return dict_key(key) in self.entries
+
+    def delete(self, key):
+        """
+        Remove the value stored under key. Return False if there is no such value.
+        """
+        if self.entries.pop(dict_key(key), None) is None:
+            return False
+        if self.quota is not None:
+            self.quota.charge(self, -memory.ELEMENT_SIZE)
+        return True
+
+    def keys(self):
+        """
+        Return a list of all keys in the order they were first stored.
+        """
+        return [entry[0] for entry in self.entries.values()]
+
+    def __repr__(self):
+        return "DICT_OBJ entries: {}".format(self.entries)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __str__(self):
+        return "{" + ", ".join("{}: {}".format(key, value) for key, value in self.entries.values()) + "}"
+
+    def __eq__(self, other):
+        assert other is not None, "Other variable in __eq__ function is None."
+        return BoolObject(self.raw_equals(other))
+
+    def raw_equals(self, other):
+        if self is other:
+            return True
+        elif self.obj_type != other.obj_type or self.size != other.size:
+            return False
+        for hash_key, (_, value) in self.entries.items():
+            other_entry = other.entries.get(hash_key)
+            if other_entry is None or not value.raw_equals(other_entry[1]):
+                return False
+        return True
+
+    # Dictionaries can be modified so they cannot be hashed.
+    __hash__ = None
+
+    def __ne__(self, other):
+        return BoolObject(not self.raw_equals(other))
+
+    def __lt__(self, other):
+        raise InternalTypeError("<", self.obj_type, other.obj_type)
+
+    def __le__(self, other):
+        raise InternalTypeError("<=", self.obj_type, other.obj_type)
+
+    def __gt__(self, other):
+        raise InternalTypeError(">", self.obj_type, other.obj_type)
+
+    def __ge__(self, other):
+        raise InternalTypeError(">=", self.obj_type, other.obj_type)
+
+    def __add__(self, other):
+        raise InternalTypeError("+", self.obj_type, other.obj_type)
+
+    def __sub__(self, other):
+        raise InternalTypeError("-", self.obj_type, other.obj_type)
+
+    def __mul__(self, other):
+        raise InternalTypeError("*", self.obj_type, other.obj_type)
+
+    def __truediv__(self, other):
+        raise InternalTypeError("/", self.obj_type, other.obj_type)
+
+    def __and__(self, other):
+        return BoolObject(bool(self) and bool(other))
+
+    def __or__(self, other):
+        return BoolObject(bool(self) or bool(other))
+
+    def __neg__(self):
+        raise InternalTypeError("-", self.obj_type)
+
+    def __invert__(self):
+        return BoolObject(not self.__bool__())
+
+    def __bool__(self):
+        return self.size > 0
+
+
 class ReturnObject(InternalObject):
     """
     Internal object used to represent return objects within the interpreter.
@@ -581,6 +1082,25 @@ class ReturnObject(InternalObject):
         return BoolObject(self.obj_type == other.obj_type and self.value == other.value)
 
 
+class TailCallObject(ReturnObject):
+    """
+    Internal object used to represent a "return" statement whose value is the result
+    of calling another function. The call is performed by the caller after the
+    current function call frame has been discarded.
+    """
+
+    def __init__(self, func_object, arg_values):
+        super().__init__()
+        self.func_object = func_object
+        self.arg_values = arg_values
+
+    def __str__(self):
+        return "TAIL_CALL_OBJ {}".format(self.func_object)
+
+    def __repr__(self):
+        return "TAIL_CALL_OBJ {}".format(self.func_object)
+
+
 class BreakObject(InternalObject):
     """
     Internal object used to break statements produced during code execution.
@@ -622,14 +1142,20 @@ class FuncObject(InternalObject):
     Internal object used to represent a function.
     """
 
-    def __init__(self, name, arg_symbols, body, env):
+    def __init__(self, name, arg_symbols, body, env, frame_layout=None):
         self.obj_type = ObjectType.FUNC
         self.name = name
         self.args = arg_symbols
+        self.arg_names = [arg.lexeme for arg in arg_symbols]
         self.arity = len(arg_symbols)
         self.body = body
         # Reference to the current env
         self.env = env
+        # Activation records are reused only when the local variables of the function
+        # are known ahead of time.
+        self.frame_pool = None
+        if frame_layout is not None:
+            self.frame_pool = ActivationRecordPool(frame_layout)
 
     def __str__(self):
         return "<function object {}>".format(self.name)
@@ -643,22 +1169,86 @@ class NativeFuncObject(InternalObject):
     Internal object used to represent a function.
     """
 
-    def __init__(self, func):
+    def __init__(self, func, name=None):
         self.obj_type = ObjectType.NATIVE_FUNC
-        self.name = func.__name__
+        # Name used within Zai when it differs from the name of the Python function.
+        self.name = func.__name__ if name is None else name
         self.arity = func.__code__.co_argcount
+        # Arguments with a default value(always None) may be left out.
+        self.min_arity = self.arity - len(func.__defaults__ or ())
         self.body = func
 
+    def accepts_arg_count(self, arg_count):
+        return self.min_arity <= arg_count <= self.arity
+
+    def arity_str(self):
+        """
+        Describe the number of arguments accepted by the function.
+        """
+        if self.min_arity == self.arity:
+            return str(self.arity)
+        return "{} to {}".format(self.min_arity, self.arity)
+
     def __str__(self):
         return "<native function object {}>".format(self.name)
 
 
+class MemoFuncObject(InternalObject):
+    """
+    Internal object wrapping a function whose results are cached. Calls whose
+    arguments are all atoms return the cached result of the first call made with
+    equal arguments. The least recently used results are evicted once the cache
+    holds max_size of them.
+    """
+
+    def __init__(self, func, max_size):
+        self.obj_type = ObjectType.MEMO_FUNC
+        self.func = func
+        self.max_size = max_size
+        # Maps tuples of argument values to results, least recently used first.
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        """
+        Return the result cached for the arguments described by key or None if there
+        is no such result. A key of None describes arguments which cannot be cached.
+        """
+        if key is None:
+            self.misses += 1
+            return None
+        result = self.cache.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.cache.move_to_end(key)
+        return result
+
+    def store(self, key, result):
+        self.cache[key] = result
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def __str__(self):
+        return "<memoized {}>".format(self.func)
+
+
 class ClassDefObject(InternalObject):
     def __init__(self, class_name, class_methods):
         """setup class object"""
         self.obj_type = ObjectType.CLASS_DEF
         self.class_name = class_name
         self.class_methods = class_methods
+        # Pool of activation records of every method(None for methods without a frame
+        # layout), shared by the methods of all instances of the class.
+        self.frame_pools = [
+            None if method.frame_layout is None else ActivationRecordPool(method.frame_layout)
+            for method in class_methods
+        ]
 
     def __str__(self):
         return "<class definition object {}>".format(self.class_name)
@@ -685,31 +1275,33 @@ class ClassMethodObject(InternalObject):
     Internal object used to represent a class function.
     """
 
-    def __init__(self, name, arg_symbols, body, class_env):
+    def __init__(self, name, arg_symbols, body, class_env, frame_pool=None):
         self.obj_type = ObjectType.CLASS_METHOD
         self.name = name
         self.args = arg_symbols
+        self.arg_names = [arg.lexeme for arg in arg_symbols]
         self.arity = len(arg_symbols)
         self.body = body
         # Reference to the class env
         self.class_env = class_env
+        self.frame_pool = frame_pool
 
     def __str__(self):
         return "<class method object {}>".format(self.name)
 
 
 class ClassInstanceObject(InternalObject):
-    def __init__(self, class_name, class_methods):
-        """Object representing a class instance."""
+    def __init__(self, class_def):
+        """Object representing an instance of the class defined by class_def."""
         self.obj_type = ObjectType.CLASS_INSTANCE
-        self.class_name = class_name
+        self.class_name = class_def.class_name
         self.namespace = Scope(None)
 
         # Register all class methods in the internal environment
-        for method in class_methods:
+        for method, frame_pool in zip(class_def.class_methods, class_def.frame_pools):
             self.namespace.initialize_variable(
                 method.name,
-                ClassMethodObject(method.name, method.args, method.body, self.namespace),
+                ClassMethodObject(method.name, method.args, method.body, self.namespace, frame_pool),
             )
 
     def __str__(self):
@@ -717,3 +1309,73 @@ class ClassInstanceObject(InternalObject):
 
     def get_field(self, field_name):
         return self.namespace.get_variable(field_name)
+
+
+def _box_bool(raw_value):
+    return BoolObject(raw_value != 0)
+
+
+# Types of typed arrays which can be created by name.
+TYPED_ARRAY_TYPES = {
+    "int64": TypedArrayType("int64", "q", ObjectType.INT, int, IntObject, (-(2 ** 63), 2 ** 63 - 1)),
+    "float64": TypedArrayType("float64", "d", ObjectType.FLOAT, float, FloatObject),
+    "bool": TypedArrayType("bool", "b", ObjectType.BOOL, bool, _box_bool),
+    "byte": TypedArrayType("byte", "B", ObjectType.INT, int, IntObject, (0, 255)),
+}
+
+# Type of the typed array used to store elements of each type when the type of the
+# array is not given explicitly.
+TYPED_ARRAY_OBJ_TYPES = {
+    ObjectType.INT: TYPED_ARRAY_TYPES["int64"],
+    ObjectType.FLOAT: TYPED_ARRAY_TYPES["float64"],
+    ObjectType.BOOL: TYPED_ARRAY_TYPES["bool"],
+}
+
+# Functions creating an internal object of each atomic type from its raw value.
+ATOM_BOX_FUNCS = {
+    ObjectType.INT: IntObject,
+    ObjectType.FLOAT: FloatObject,
+    ObjectType.STR: StringObject,
+    ObjectType.BOOL: BoolObject,
+}
+
+
+def dict_key(value):
+    """
+    Return the key under which value is stored within a dictionary, or None if value
+    cannot be used as a key. Keys of equal objects are equal and have the same hash
+    as the objects themselves.
+    """
+    if value.obj_type in ATOM_BOX_FUNCS:
+        return (value.obj_type, value.value)
+    elif value.obj_type == ObjectType.NIL:
+        return (ObjectType.NIL, None)
+    return None
+
+
+def new_array(elements):
+    """
+    Create an array containing the internal objects within the list elements. The
+    array is a typed array if all elements have the same integer, float or boolean
+    type.
+    """
+    if elements:
+        elem_type = TYPED_ARRAY_OBJ_TYPES.get(getattr(elements[0], "obj_type", None))
+        if elem_type is not None and all(elem_type.accepts(elem) for elem in elements):
+            return ArrayObject(elem_type.new_storage([elem.value for elem in elements]), elem_type)
+    return ArrayObject(elements)
+
+
+def array_from_raw(obj_type, raw_values):
+    """
+    Create an array containing internal objects of type obj_type built from the raw
+    Python values within raw_values. The array is a typed array whenever its storage
+    can hold all of the values.
+    """
+    elem_type = TYPED_ARRAY_OBJ_TYPES.get(obj_type)
+    if elem_type is None:
+        return ArrayObject(list(map(ATOM_BOX_FUNCS[obj_type], raw_values)))
+    try:
+        return ArrayObject(elem_type.new_storage(raw_values), elem_type)
+    except (OverflowError, TypeError):
+        return ArrayObject(list(map(elem_type.box, raw_values)))
@@ -0,0 +1,191 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains the optimizer which rewrites the AST produced by the parser before
+it is evaluated."""
+import zai.ast_nodes as ast_nodes
+
+# Expressions which are worth hoisting out of a loop. Plain literals and symbols are
+# already as cheap to evaluate as a hoisted value.
+HOISTABLE_NODES = (
+    ast_nodes.ArithBinNode,
+    ast_nodes.EqBinNode,
+    ast_nodes.LogicBinNode,
+    ast_nodes.RelopBinNode,
+    ast_nodes.UnaryNode,
+    ast_nodes.BracketNode,
+    ast_nodes.PropertyAccessNode,
+)
+
+LITERAL_NODES = (
+    ast_nodes.IntNode,
+    ast_nodes.FloatNode,
+    ast_nodes.StringNode,
+    ast_nodes.BoolNode,
+    ast_nodes.NilNode,
+)
+
+# Nodes which may change any value in the environment. Calls can reassign variables
+# outside of the loop while "++" and "--" modify a value in place, so it may change
+# through any variable referencing it.
+OPAQUE_NODES = (ast_nodes.CallNode, ast_nodes.IncrNode, ast_nodes.DecrNode)
+
+ASSIGNMENT_NODES = (
+    ast_nodes.ReassignBinNode,
+    ast_nodes.NewAssignBinNode,
+    ast_nodes.AddassignNode,
+    ast_nodes.SubassignNode,
+)
+
+
+class LoopInfo:
+    """
+    Summary of everything a loop modifies while it runs.
+    """
+
+    def __init__(self, assigned_names, writes_fields):
+        self.assigned_names = assigned_names
+        # Set if the loop assigns to a field of a class instance or a module.
+        self.writes_fields = writes_fields
+
+
+class Optimizer:
+    def __init__(self, hoist_invariants=True):
+        """
+        Keyword Arguments:
+        hoist_invariants -- Evaluate loop-invariant expressions once per loop entry.
+        """
+        self.hoist_invariants = hoist_invariants
+
+    def optimize(self, ast_root):
+        """
+        Optimize the AST in place and return its root.
+        """
+        if self.hoist_invariants:
+            # Loops are reached before the loops nested within them so outer loops get
+            # to hoist the largest expressions first.
+            for node in ast_nodes.walk(ast_root):
+                if isinstance(node, (ast_nodes.WhileNode, ast_nodes.DoWhileNode, ast_nodes.ForNode)):
+                    self._hoist_loop(node)
+        return ast_root
+
+    def _loop_info(self, loop):
+        """
+        Collect the names assigned within a loop. Return None if the loop contains
+        anything which may modify values the optimizer cannot see.
+        """
+        assigned_names = set()
+        writes_fields = False
+        for node in ast_nodes.walk(loop):
+            if isinstance(node, OPAQUE_NODES):
+                return None
+            elif isinstance(node, ASSIGNMENT_NODES):
+                if node.symbol_path is not None:
+                    writes_fields = True
+                elif isinstance(node.symbol_name, ast_nodes.SymbolNode):
+                    assigned_names.add(node.symbol_name.val)
+                elif isinstance(node.symbol_name, ast_nodes.ArrayAccessNode):
+                    assigned_names.add(node.symbol_name.array_name.val)
+            elif isinstance(node, (ast_nodes.FuncNode, ast_nodes.ClassDefNode)):
+                assigned_names.add(node.name if isinstance(node, ast_nodes.FuncNode) else node.class_name)
+            elif isinstance(node, ast_nodes.ImportNode):
+                assigned_names.add(node.module_name if node.import_name is None else node.import_name)
+            elif isinstance(node, ast_nodes.ForNode):
+                assigned_names.add(node.var_name)
+        return LoopInfo(assigned_names, writes_fields)
+
+    def _hoist_loop(self, loop):
+        """
+        Replace the loop-invariant expressions within the condition and body of loop.
+        The values iterated over by a for loop are evaluated only once anyway.
+        """
+        loop_info = self._loop_info(loop)
+        if loop_info is None:
+            return
+
+        if isinstance(loop, ast_nodes.WhileNode):
+            loop.condition = self._rewrite(loop.condition, loop, loop_info)
+        elif isinstance(loop, ast_nodes.DoWhileNode):
+            loop.cond = self._rewrite(loop.cond, loop, loop_info)
+        loop.body = self._rewrite(loop.body, loop, loop_info)
+
+    def _rewrite(self, value, loop, loop_info):
+        """
+        Return value with every maximal loop-invariant expression within it wrapped in
+        an invariant node owned by loop.
+        """
+        if isinstance(value, ast_nodes.ASTNode):
+            if isinstance(value, HOISTABLE_NODES) and self._is_invariant(value, loop_info):
+                invariant = ast_nodes.InvariantNode(value)
+                loop.invariants.append(invariant)
+                return invariant
+            self._rewrite_children(value, loop, loop_info)
+            return value
+        elif isinstance(value, list):
+            value[:] = [self._rewrite(elem, loop, loop_info) for elem in value]
+            return value
+        elif isinstance(value, tuple):
+            elems = [self._rewrite(elem, loop, loop_info) for elem in value]
+            # Keep named tuples(ex. the condition blocks of if statements) intact.
+            if hasattr(value, "_fields"):
+                return type(value)(*elems)
+            return tuple(elems)
+        return value
+
+    def _rewrite_children(self, node, loop, loop_info):
+        # Function and class bodies run within their own calls and hoisted values are
+        # never evaluated twice.
+        if isinstance(
+            node,
+            (
+                ast_nodes.FuncNode,
+                ast_nodes.ClassDefNode,
+                ast_nodes.InvariantNode,
+                ast_nodes.PropertyAccessNode,
+            ),
+        ):
+            return
+
+        for attr_name, attr_value in vars(node).items():
+            # Skip assignment targets and the expressions hoisted out of nested loops.
+            if attr_name in ["symbol_path", "symbol_name", "invariants"]:
+                continue
+            setattr(node, attr_name, self._rewrite(attr_value, loop, loop_info))
+
+    def _is_invariant(self, node, loop_info):
+        """
+        Check if evaluating node always produces the same value while the loop runs.
+        """
+        if isinstance(node, (LITERAL_NODES, ast_nodes.InvariantNode, ast_nodes.ThisNode)):
+            return True
+        elif isinstance(node, ast_nodes.SymbolNode):
+            return node.val not in loop_info.assigned_names
+        elif isinstance(node, ast_nodes.BinOpNode):
+            return self._is_invariant(node.left, loop_info) and self._is_invariant(node.right, loop_info)
+        elif isinstance(node, ast_nodes.UnaryNode):
+            return self._is_invariant(node.value, loop_info)
+        elif isinstance(node, ast_nodes.BracketNode):
+            return self._is_invariant(node.expr, loop_info)
+        elif isinstance(node, ast_nodes.PropertyAccessNode):
+            # Fields of "this" can also be reassigned without a path so the name of the
+            # property must not be assigned within the loop either.
+            return (
+                not loop_info.writes_fields
+                and node.right.val not in loop_info.assigned_names
+                and self._is_invariant(node.left, loop_info)
+            )
+        return False
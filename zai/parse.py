@@ -82,25 +82,35 @@ class Parser:
                 self.curr_tok.tok_type,
             )
 
+    def located(self, node, tok):
+        """
+        Record the position of tok as the source position of node, unless the node
+        already has one or tok has no position, and return the node.
+        """
+        if node is not None and node.pos is None and tok.line_num is not None:
+            node.pos = ast_nodes.pack_position(tok.line_num, tok.col_num)
+        return node
+
     def atom(self):
         """
         Parse an atom(pritive) object.
         """
+        start_tok = self.curr_tok
         # if self.curr_tok.tok_type == TokType.THIS:
         #     self.match(TokType.THIS)
         #     return ThisNode()
         if self.curr_tok.tok_type == TokType.DQUOTE:
             self.match(TokType.DQUOTE)
             str_token = self.match(TokType.STRING)
-            node = ast_nodes.StringNode(str_token.lexeme)
+            node = self.located(ast_nodes.StringNode(str_token.lexeme), start_tok)
             self.match(TokType.DQUOTE)
             return node
         elif self.curr_tok.tok_type == TokType.INT:
             node = self.match(TokType.INT)
-            return ast_nodes.IntNode(node.lexeme)
+            return self.located(ast_nodes.IntNode(node.lexeme), node)
         elif self.curr_tok.tok_type == TokType.FLOAT:
             node = self.match(TokType.FLOAT)
-            return ast_nodes.FloatNode(node.lexeme)
+            return self.located(ast_nodes.FloatNode(node.lexeme), node)
         elif self.curr_tok.tok_type == TokType.LSQUARE:
             self.match(TokType.LSQUARE)
             array_elem = list()
@@ -110,13 +120,13 @@ class Parser:
                 if self.curr_tok.tok_type != TokType.RSQUARE:
                     self.match(TokType.COMMA)
             self.match(TokType.RSQUARE)
-            return ast_nodes.ArrayNode(array_elem)
+            return self.located(ast_nodes.ArrayNode(array_elem), start_tok)
         elif self.curr_tok.tok_type == TokType.NIL:
             self.match(TokType.NIL)
-            return ast_nodes.NilNode()
+            return self.located(ast_nodes.NilNode(), start_tok)
         else:
             node = self.match(TokType.TRUE, TokType.FALSE)
-            return ast_nodes.BoolNode(node.tok_type)
+            return self.located(ast_nodes.BoolNode(node.tok_type), node)
 
     def arglist(self):
         """
@@ -135,25 +145,24 @@ class Parser:
 
         if self.curr_tok.tok_type == TokType.ID:
             node = self.match(TokType.ID)
-            left = ast_nodes.SymbolNode(node.lexeme)
+            left = self.located(ast_nodes.SymbolNode(node.lexeme), node)
 
         while self.curr_tok in [TokType.LSQUARE, TokType.LROUND, TokType.DOT]:
             if self.curr_tok.tok_type == TokType.DOT:
-                self.match(TokType.DOT)
+                op = self.match(TokType.DOT)
                 node = self.match(TokType.ID)
-                property_name = ast_nodes.SymbolNode(node.lexeme)
-                left = ast_nodes.PropertyAccessNode(left, property_name)
-                print("Here", left)
+                property_name = self.located(ast_nodes.SymbolNode(node.lexeme), node)
+                left = self.located(ast_nodes.PropertyAccessNode(left, property_name), op)
             elif self.curr_tok.tok_type == TokType.LSQUARE:
-                self.match(TokType.LSQUARE)
+                op = self.match(TokType.LSQUARE)
                 arr_idx = self.or_expr()
                 self.match(TokType.RSQUARE)
-                left = ast_nodes.ArrayAccessNode(left, arr_idx)
+                left = self.located(ast_nodes.ArrayAccessNode(left, arr_idx), op)
             elif self.curr_tok.tok_type == TokType.LROUND:
-                self.match(TokType.LROUND)
+                op = self.match(TokType.LROUND)
                 func_args = self.arglist()
                 self.match(TokType.RROUND)
-                left = ast_nodes.CallNode(left, func_args)
+                left = self.located(ast_nodes.CallNode(left, func_args), op)
 
         return left
 
@@ -168,14 +177,14 @@ class Parser:
         ]:
             return self.access()
         elif self.curr_tok.tok_type == TokType.LROUND:
-            self.match(TokType.LROUND)
+            op = self.match(TokType.LROUND)
             expr = self.or_expr()
             self.match(TokType.RROUND)
-            return ast_nodes.BracketNode(expr)
+            return self.located(ast_nodes.BracketNode(expr), op)
         elif self.curr_tok.tok_type in [TokType.BANG, TokType.MINUS]:
             op = self.match(TokType.BANG, TokType.MINUS)
             fact = self.factor()
-            return ast_nodes.UnaryNode(op.tok_type, fact)
+            return self.located(ast_nodes.UnaryNode(op.tok_type, fact), op)
         # TODO: Handle case of it being an "ID" token instead of just num.
         elif self.curr_tok.tok_type in [TokType.INT, TokType.ID] and self.peek() in [
             TokType.INCR,
@@ -188,9 +197,9 @@ class Parser:
             while self.curr_tok.tok_type in [TokType.INCR, TokType.DECR]:
                 op = self.match(TokType.INCR, TokType.DECR)
                 if op.tok_type == TokType.INCR:
-                    node = ast_nodes.IncrNode(node)
+                    node = self.located(ast_nodes.IncrNode(node), op)
                 elif op.tok_type == TokType.DECR:
-                    node = ast_nodes.DecrNode(node)
+                    node = self.located(ast_nodes.DecrNode(node), op)
             return node
         else:
             return self.atom()
@@ -203,7 +212,7 @@ class Parser:
         while self.curr_tok.tok_type in [TokType.MUL, TokType.DIV]:
             op = self.match(TokType.MUL, TokType.DIV)
             right = self.factor()
-            left = ast_nodes.ArithBinNode(left, op.tok_type, right)
+            left = self.located(ast_nodes.ArithBinNode(left, op.tok_type, right), op)
 
         return left
 
@@ -215,7 +224,7 @@ class Parser:
         while self.curr_tok.tok_type in [TokType.PLUS, TokType.MINUS]:
             op = self.match(TokType.PLUS, TokType.MINUS)
             right = self.term()
-            left = ast_nodes.ArithBinNode(left, op.tok_type, right)
+            left = self.located(ast_nodes.ArithBinNode(left, op.tok_type, right), op)
 
         return left
 
@@ -233,7 +242,7 @@ class Parser:
         ]:
             op = self.match(TokType.GT, TokType.GTE, TokType.LT, TokType.LTE)
             right = self.add_expr()
-            left = ast_nodes.RelopBinNode(left, op.tok_type, right)
+            left = self.located(ast_nodes.RelopBinNode(left, op.tok_type, right), op)
 
         return left
 
@@ -245,7 +254,7 @@ class Parser:
         while self.curr_tok.tok_type in [TokType.EQ, TokType.NEQ]:
             op = self.match(TokType.EQ, TokType.NEQ)
             right = self.rel_expr()
-            left = ast_nodes.EqBinNode(left, op.tok_type, right)
+            left = self.located(ast_nodes.EqBinNode(left, op.tok_type, right), op)
 
         return left
 
@@ -257,7 +266,7 @@ class Parser:
         while self.curr_tok.tok_type == TokType.AND:
             op = self.match(TokType.AND)
             right = self.eq_expr()
-            left = ast_nodes.LogicBinNode(left, op.tok_type, right)
+            left = self.located(ast_nodes.LogicBinNode(left, op.tok_type, right), op)
 
         return left
 
@@ -269,7 +278,7 @@ class Parser:
         while self.curr_tok.tok_type == TokType.OR:
             op = self.match(TokType.OR)
             right = self.and_expr()
-            left = ast_nodes.LogicBinNode(left, op.tok_type, right)
+            left = self.located(ast_nodes.LogicBinNode(left, op.tok_type, right), op)
 
         return left
 
@@ -278,16 +287,18 @@ class Parser:
 
         if self.curr_tok.tok_type == TokType.ASSIGN:
             if isinstance(left, (ast_nodes.PropertyAccessNode)):
-                self.match(TokType.ASSIGN)
+                assign_tok = self.match(TokType.ASSIGN)
                 value = self.or_expr()
 
-                return ast_nodes.ReassignBinNode(symbol_path=left.left, symbol_name=left.right, value=value)
+                node = ast_nodes.ReassignBinNode(symbol_path=left.left, symbol_name=left.right, value=value)
+                return self.located(node, assign_tok)
 
             elif isinstance(left, (ast_nodes.SymbolNode, ast_nodes.ArrayAccessNode)):
-                self.match(TokType.ASSIGN)
+                assign_tok = self.match(TokType.ASSIGN)
                 value = self.or_expr()
 
-                return ast_nodes.ReassignBinNode(symbol_path=None, symbol_name=left, value=value)
+                node = ast_nodes.ReassignBinNode(symbol_path=None, symbol_name=left, value=value)
+                return self.located(node, assign_tok)
             else:
                 print("Error! Cannot assign value to non symbol")
         else:
@@ -405,7 +416,7 @@ class Parser:
         Parse a function definition.
         """
 
-        self.match(TokType.FUNC)
+        func_tok = self.match(TokType.FUNC)
         func_name = self.match(TokType.ID).lexeme
         self.match(TokType.LROUND)
 
@@ -429,20 +440,20 @@ class Parser:
             func_body.append(func_stmnt)
         self.match(TokType.RCURLY)
 
-        return ast_nodes.FuncNode(func_name, func_args, func_body)
+        return self.located(ast_nodes.FuncNode(func_name, func_args, func_body), func_tok)
 
     def block(self):
         """
         Parse a block which acts as a nested scope within the program.
         """
 
-        self.match(TokType.LCURLY)
+        start_tok = self.match(TokType.LCURLY)
         block_stmnts = list()
         while self.curr_tok.tok_type != TokType.RCURLY:
             stmnt = self.statement()
             block_stmnts.append(stmnt)
         self.match(TokType.RCURLY)
-        return ast_nodes.BlockNode(block_stmnts)
+        return self.located(ast_nodes.BlockNode(block_stmnts), start_tok)
 
     def while_statement(self):
         """
@@ -456,10 +467,25 @@ class Parser:
         body = self.block()
         return ast_nodes.WhileNode(condition, body)
 
+    def for_statement(self):
+        """
+        Parse a for statement which iterates over the values of an expression.
+        """
+        self.match(TokType.FOR)
+        self.match(TokType.LROUND)
+        var_name = self.match(TokType.ID).lexeme
+        self.match(TokType.IN)
+        iterable = self.or_expr()
+        self.match(TokType.RROUND)
+
+        body = self.block()
+        return ast_nodes.ForNode(var_name, iterable, body)
+
     def switch_stmnt_case(self):
         """
         Parse a single switch statement case.
         """
+        start_tok = self.curr_tok
         stmnt_block = list()
         while self.curr_tok.tok_type not in [
             TokType.CASE,
@@ -473,7 +499,7 @@ class Parser:
         # case. The only difference between the two is how parsing is done. Block nodes
         # require curly brackets while switch case statements do not necessarily
         # require them.
-        return ast_nodes.BlockNode(stmnt_block)
+        return self.located(ast_nodes.BlockNode(stmnt_block), start_tok)
 
     def switch_statement(self):
         """
@@ -515,6 +541,7 @@ class Parser:
             # The parsing procedure is the same for both so there is no point
             # in rewriting the code in a separate parsing procedure.
             method_node = ast_nodes.ClassMethodNode(func_node.name, func_node.args, func_node.body)
+            method_node.pos = func_node.pos
             class_methods.append(method_node)
 
         self.match(TokType.RCURLY)
@@ -572,8 +599,13 @@ class Parser:
 
     def statement(self):
         """
-        Parse a single statement.
+        Parse a single statement. Statements which have no source position yet are
+        given the position of their first token.
         """
+        start_tok = self.curr_tok
+        return self.located(self._statement(), start_tok)
+
+    def _statement(self):
         if self.curr_tok.tok_type == TokType.IF:
             return self.if_statement()
         elif self.curr_tok.tok_type == TokType.FUNC:
@@ -582,6 +614,8 @@ class Parser:
             return self.class_def()
         elif self.curr_tok.tok_type == TokType.WHILE:
             return self.while_statement()
+        elif self.curr_tok.tok_type == TokType.FOR:
+            return self.for_statement()
         elif self.curr_tok.tok_type == TokType.SWITCH:
             return self.switch_statement()
         elif self.curr_tok.tok_type == TokType.LCURLY:
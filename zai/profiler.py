@@ -0,0 +1,246 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Module contains the profiler which measures the time spent within each Zai
+function and on each line of the source code."""
+import time
+
+from zai.ast_nodes import position_line
+
+# Name of the frame which contains all code executed outside of any function.
+PROGRAM_FRAME_NAME = "<program>"
+
+
+class FunctionStats:
+    """
+    Time spent within all calls of a single function.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        # Time spent between entering and leaving the function, counted only for
+        # the outermost call of recursive functions.
+        self.total_time = 0.0
+        # Time spent within the function itself without the functions it called.
+        self.self_time = 0.0
+
+
+class LineStats:
+    """
+    Time spent evaluating the statements starting on a single line of the source code.
+    """
+
+    def __init__(self, line_num):
+        self.line_num = line_num
+        # Number of times a statement starting on the line was evaluated.
+        self.hits = 0
+        # Time spent on the line without the functions called from it.
+        self.self_time = 0.0
+
+
+class CallTreeNode:
+    """
+    Node of the tree of all call stacks seen while profiling. Each node represents
+    one function called from the call stack represented by its parent.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.self_time = 0.0
+        self.children = dict()
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = CallTreeNode(name)
+            self.children[name] = node
+        return node
+
+
+class Frame:
+    """
+    A call of a function which has not returned yet.
+    """
+
+    def __init__(self, stats, tree_node, start_time):
+        self.stats = stats
+        self.tree_node = tree_node
+        self.start_time = start_time
+        # Time spent within the functions called by this one.
+        self.child_time = 0.0
+        # Statistics of the line of the statement currently evaluated by the call.
+        self.line = None
+
+
+class Profiler:
+    """
+    Deterministic profiler which is notified by a visitor whenever a Zai or native
+    function is entered or left and whenever a statement is evaluated. It records the
+    number of calls along with the total and self time of every function, the time
+    spent within every call stack and the self time of every line.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.functions = dict()
+        self.lines = dict()
+        # Lines of the profiled source code shown next to the time spent on them.
+        self.source_lines = None
+        # Time at which the time spent on the current line was last recorded.
+        self.line_start_time = 0.0
+        self.call_tree = CallTreeNode(PROGRAM_FRAME_NAME)
+        self.frames = list()
+        # Number of unfinished calls of each function.
+        self.active_calls = dict()
+
+    def start(self, source_text=None):
+        """
+        Start measuring the time spent outside of any function while evaluating
+        source_text.
+        """
+        if source_text is not None:
+            self.source_lines = source_text.split("\n")
+        if not self.frames:
+            self._push(PROGRAM_FRAME_NAME, self.call_tree)
+
+    def stop(self):
+        """
+        Finish all calls which are still running(ex. after a runtime error) and the
+        program itself.
+        """
+        while self.frames:
+            self.exit_function()
+
+    def enter_function(self, func_object):
+        parent = self.frames[-1]
+        self._push(func_object.name, parent.tree_node.child(func_object.name))
+
+    def exit_function(self):
+        now = self.clock()
+        self._charge_line(now)
+        frame = self.frames.pop()
+        elapsed = now - frame.start_time
+        self_time = elapsed - frame.child_time
+        stats = frame.stats
+        stats.self_time += self_time
+        frame.tree_node.self_time += self_time
+
+        active_calls = self.active_calls[stats.name] - 1
+        self.active_calls[stats.name] = active_calls
+        if active_calls == 0:
+            stats.total_time += elapsed
+        if self.frames:
+            self.frames[-1].child_time += elapsed
+
+    def enter_statement(self, stmnt):
+        """
+        Start measuring the time spent on the line of a statement about to be evaluated.
+        """
+        if stmnt.pos is None:
+            return
+        now = self.clock()
+        self._charge_line(now)
+        line_num = position_line(stmnt.pos)
+        line = self.lines.get(line_num)
+        if line is None:
+            line = LineStats(line_num)
+            self.lines[line_num] = line
+        line.hits += 1
+        self.frames[-1].line = line
+
+    def _charge_line(self, now):
+        """
+        Add the time spent since the last line event to the current line of the
+        innermost call.
+        """
+        if self.frames:
+            line = self.frames[-1].line
+            if line is not None:
+                line.self_time += now - self.line_start_time
+        self.line_start_time = now
+
+    def _push(self, name, tree_node):
+        stats = self.functions.get(name)
+        if stats is None:
+            stats = FunctionStats(name)
+            self.functions[name] = stats
+        stats.calls += 1
+        self.active_calls[name] = self.active_calls.get(name, 0) + 1
+        now = self.clock()
+        self._charge_line(now)
+        self.frames.append(Frame(stats, tree_node, now))
+
+    def report(self):
+        """
+        Return a table of all functions and a table of all lines, both sorted by the
+        time spent within them.
+        """
+        all_stats = sorted(self.functions.values(), key=lambda stats: stats.self_time, reverse=True)
+        program_time = sum(stats.self_time for stats in all_stats)
+        lines = list()
+        lines.append("Total time: {:.6f}s".format(program_time))
+        lines.append("{:>10} {:>12} {:>12} {:>8}  {}".format("calls", "total(s)", "self(s)", "self%", "function"))
+        for stats in all_stats:
+            self_percent = 100 * stats.self_time / program_time if program_time > 0 else 0.0
+            lines.append(
+                "{:>10} {:>12.6f} {:>12.6f} {:>7.2f}%  {}".format(
+                    stats.calls, stats.total_time, stats.self_time, self_percent, stats.name
+                )
+            )
+
+        lines.append("")
+        lines.append("{:>10} {:>12} {:>12} {:>8}  {}".format("line", "hits", "self(s)", "self%", "source"))
+        all_lines = sorted(self.lines.values(), key=lambda line_stats: line_stats.self_time, reverse=True)
+        for line_stats in all_lines:
+            self_percent = 100 * line_stats.self_time / program_time if program_time > 0 else 0.0
+            source = ""
+            if self.source_lines is not None and line_stats.line_num <= len(self.source_lines):
+                source = self.source_lines[line_stats.line_num - 1].strip()
+            lines.append(
+                "{:>10} {:>12} {:>12.6f} {:>7.2f}%  {}".format(
+                    line_stats.line_num, line_stats.hits, line_stats.self_time, self_percent, source
+                )
+            )
+        return "\n".join(lines) + "\n"
+
+    def collapsed_stacks(self):
+        """
+        Return the self time of every call stack in microseconds using the collapsed
+        stack format read by flamegraph tools(ex. "<program>;main;fib 1234").
+        """
+        lines = list()
+        pending = [(self.call_tree, self.call_tree.name)]
+        while pending:
+            node, path = pending.pop()
+            micros = int(node.self_time * 1000000)
+            if micros > 0:
+                lines.append("{} {}".format(path, micros))
+            for child in node.children.values():
+                pending.append((child, path + ";" + child.name))
+        lines.sort()
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_path, stacks_path):
+        """
+        Write the report and the collapsed stacks to the given files.
+        """
+        with open(report_path, "w") as report_file:
+            report_file.write(self.report())
+        with open(stacks_path, "w") as stacks_file:
+            stacks_file.write(self.collapsed_stacks())
@@ -0,0 +1,196 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains the sampling profiler which periodically captures the Zai call
+stack of a running program from a background thread."""
+import sys
+import threading
+from types import GeneratorType
+
+from zai.ast_nodes import position_line
+from zai.profiler import PROGRAM_FRAME_NAME
+from zai.stack_visitor import StackVisitor
+from zai.stdlib.native_func import register_functions
+from zai.visitor import Visitor
+
+# Time between two samples in seconds.
+DEFAULT_SAMPLE_INTERVAL = 0.01
+# Maximum number of generators of the explicit call stack read by a single sample.
+# The generators closest to the root of deeper stacks are left out.
+MAX_SAMPLE_GENERATORS = 5000
+# Name of the frame replacing the frames left out of a sample.
+TRUNCATED_FRAME_NAME = "..."
+
+# Code of the methods which run the body of a Zai function. The function is held
+# by their "func_object" variable.
+FUNCTION_CODES = frozenset(
+    [
+        Visitor._Visitor__run_internal_function.__code__,
+        StackVisitor._run_function.__code__,
+    ]
+)
+# Code of the methods which evaluate a sequence of statements. The statement being
+# evaluated is held by their "stmnt" variable.
+STATEMENT_CODES = FUNCTION_CODES | frozenset(
+    [
+        Visitor.visit_program.__code__,
+        Visitor.visit_scope_block.__code__,
+        StackVisitor.visit_program.__code__,
+        StackVisitor.visit_scope_block.__code__,
+    ]
+)
+# Code of the methods which drive the generators of the explicit call stack kept
+# within their "stack" variable.
+STACK_RUN_CODES = frozenset([StackVisitor._run.__code__, StackVisitor._run_slices.__code__])
+
+
+class SamplingProfiler:
+    """
+    Profiler which wakes up every interval seconds on a background thread and records
+    the Zai call stack of the thread evaluating the program, made up of the name of
+    every function along with the line being evaluated within it. The stack is read
+    from the Python frames of the visitor, so evaluation itself is not slowed down by
+    any bookkeeping.
+    """
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        # Number of samples taken for every call stack.
+        self.stacks = dict()
+        self.sample_count = 0
+        self.native_names = {func.body.__code__: func.name for func in register_functions()}
+        self.thread_id = None
+        self.sampler_thread = None
+        self.stop_event = threading.Event()
+
+    def start(self, source_text=None):
+        """
+        Start sampling the calling thread.
+        """
+        if self.sampler_thread is not None:
+            return
+        self.thread_id = threading.get_ident()
+        self.stop_event.clear()
+        self.sampler_thread = threading.Thread(target=self._sample_loop, name="zai-sampler", daemon=True)
+        self.sampler_thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and wait for the background thread to finish.
+        """
+        if self.sampler_thread is None:
+            return
+        self.stop_event.set()
+        self.sampler_thread.join()
+        self.sampler_thread = None
+
+    def _sample_loop(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = self.sample(frame)
+            del frame
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.sample_count += 1
+
+    def sample(self, frame):
+        """
+        Return the Zai call stack of the thread currently executing frame as a tuple of
+        labels(ex. ("<program>:12", "main:8", "fib:3")) ordered from the root.
+        """
+        python_frames = list()
+        while frame is not None:
+            python_frames.append(frame)
+            frame = frame.f_back
+        python_frames.reverse()
+
+        # Pairs of the name of a function and the line evaluated within it.
+        calls = [[PROGRAM_FRAME_NAME, None]]
+        # Frames of the explicit call stack are read from its generators instead.
+        within_stack_run = False
+        for frame in python_frames:
+            code = frame.f_code
+            if code in STACK_RUN_CODES:
+                generators = frame.f_locals.get("stack", ())
+                if len(generators) > MAX_SAMPLE_GENERATORS:
+                    generators = generators[-MAX_SAMPLE_GENERATORS:]
+                    calls = [[TRUNCATED_FRAME_NAME, None]]
+                for generator in generators:
+                    # Follow generators delegated to using "yield from".
+                    while type(generator) is GeneratorType:
+                        if generator.gi_frame is not None:
+                            self._read_frame(generator.gi_frame, calls)
+                        generator = generator.gi_yieldfrom
+                within_stack_run = True
+            elif code in self.native_names:
+                calls.append([self.native_names[code], None])
+            elif not within_stack_run and code in STATEMENT_CODES:
+                self._read_frame(frame, calls)
+
+        return tuple(name if line_num is None else "{}:{}".format(name, line_num) for name, line_num in calls)
+
+    @staticmethod
+    def _read_frame(frame, calls):
+        """
+        Add the function run by a frame of the visitor to calls, or record the line of
+        the statement it evaluates as the current line of the innermost function.
+        """
+        code = frame.f_code
+        if code not in STATEMENT_CODES:
+            return
+        frame_locals = frame.f_locals
+        if code in FUNCTION_CODES:
+            func_object = frame_locals.get("func_object")
+            calls.append([getattr(func_object, "name", "?"), None])
+        stmnt = frame_locals.get("stmnt")
+        if stmnt is not None and stmnt.pos is not None:
+            calls[-1][1] = position_line(stmnt.pos)
+
+    def collapsed_stacks(self):
+        """
+        Return the number of samples of every call stack using the collapsed stack
+        format read by flamegraph tools(ex. "<program>:12;main:8;fib:3 42").
+        """
+        lines = ["{} {}".format(";".join(stack), count) for stack, count in self.stacks.items()]
+        lines.sort()
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """
+        Return a table of the frames found at the top of the sampled call stacks,
+        sorted by the number of samples.
+        """
+        self_samples = dict()
+        for stack, count in self.stacks.items():
+            self_samples[stack[-1]] = self_samples.get(stack[-1], 0) + count
+
+        lines = list()
+        lines.append("Samples: {} every {:.3f}ms".format(self.sample_count, self.interval * 1000))
+        lines.append("{:>10} {:>8}  {}".format("samples", "self%", "function:line"))
+        for label, count in sorted(self_samples.items(), key=lambda item: item[1], reverse=True):
+            lines.append("{:>10} {:>7.2f}%  {}".format(count, 100 * count / self.sample_count, label))
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_path, stacks_path):
+        """
+        Write the report and the collapsed stacks to the given files.
+        """
+        with open(report_path, "w") as report_file:
+            report_file.write(self.report())
+        with open(stacks_path, "w") as stacks_file:
+            stacks_file.write(self.collapsed_stacks())
@@ -0,0 +1,551 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains a visitor which evaluates the AST without relying on Python
+recursion. Every AST node containing other nodes is evaluated by a generator which
+yields its children and receives their values back. The generators are kept on an
+explicit stack which lives on the heap, so the depth of Zai recursion is limited only
+by the configured maximum call depth."""
+from types import GeneratorType
+
+import zai.ast_nodes as ast_nodes
+from zai.tokens import TokType
+from zai.visitor import Visitor
+from zai.env import Scope
+from zai.internal_error import InternalRuntimeError, InternalStackOverflowError, InternalTypeError
+from zai.utils import is_truthy, memo_key
+from zai.objects import (
+    ObjectType,
+    NilObject,
+    ReturnObject,
+    TailCallObject,
+    ClassInstanceObject,
+    new_array,
+)
+
+DEFAULT_MAX_CALL_DEPTH = 200000
+
+
+class StackVisitor(Visitor):
+    def __init__(self, environment, max_call_depth=DEFAULT_MAX_CALL_DEPTH):
+        """
+        Visitor which keeps all pending evaluations on an explicit stack instead of
+        the Python call stack.
+        """
+        super().__init__(environment)
+        self.max_call_depth = max_call_depth
+        self.call_depth = 0
+        # Set once step_interval more steps have been taken, which ends the current
+        # slice of an evaluation started by visit_slices.
+        self.slice_ended = False
+
+    def visit(self, ast_root):
+        """
+        Main entry point for all AST roots.
+        """
+        scope_height = self.env.stack_height
+        call_depth = self.call_depth
+        try:
+            return self._run(ast_root)
+        except Exception as error:
+            self._recover(error, scope_height, call_depth)
+            raise
+
+    def visit_slices(self, ast_root):
+        """
+        Generator evaluating an AST root like visit does, which suspends the evaluation
+        by yielding every step_interval steps and returns the value of the root.
+        """
+        scope_height = self.env.stack_height
+        call_depth = self.call_depth
+        try:
+            return (yield from self._run_slices(ast_root))
+        except BaseException as error:
+            # The evaluation may also be abandoned while it is suspended.
+            self._recover(error, scope_height, call_depth)
+            raise
+
+    def _recover(self, error, scope_height, call_depth):
+        """
+        Locate an error which stopped an evaluation and discard every scope and call
+        frame left behind by it so that the environment can be reused(ex. within the
+        REPL).
+        """
+        if isinstance(error, (InternalRuntimeError, InternalTypeError)):
+            self._locate_error(error)
+        while self.env.stack_height > scope_height:
+            self.env.exit_scope()
+        self.call_depth = call_depth
+
+    def _check_steps(self):
+        super()._check_steps()
+        self.slice_ended = True
+
+    def _run(self, node):
+        """
+        Evaluate a node by driving the generators produced by each visit method.
+        Every generator yields the child node it needs the value of and is resumed
+        with that value once the child has been evaluated.
+        """
+        value = node.accept(self)
+        if type(value) is not GeneratorType:
+            return value
+
+        stack = [value]
+        value = None
+        while True:
+            try:
+                child = stack[-1].send(value)
+            except StopIteration as ret:
+                stack.pop()
+                if not stack:
+                    return ret.value
+                value = ret.value
+                continue
+
+            value = child.accept(self)
+            if type(value) is GeneratorType:
+                stack.append(value)
+                value = None
+
+    def _run_slices(self, node):
+        """
+        Generator evaluating a node like _run does, which yields whenever the current
+        slice of the evaluation has ended.
+        """
+        self.slice_ended = False
+        value = node.accept(self)
+        if type(value) is not GeneratorType:
+            return value
+
+        stack = [value]
+        value = None
+        while True:
+            if self.slice_ended:
+                self.slice_ended = False
+                yield
+            try:
+                child = stack[-1].send(value)
+            except StopIteration as ret:
+                stack.pop()
+                if not stack:
+                    return ret.value
+                value = ret.value
+                continue
+
+            value = child.accept(self)
+            if type(value) is GeneratorType:
+                stack.append(value)
+                value = None
+
+    def visit_program(self, node):
+        profiler = self.profiler
+        for stmnt in node.stmnts:
+            if profiler is not None:
+                profiler.enter_statement(stmnt)
+            ret_val = yield stmnt
+            if ret_val is not None and ret_val.obj_type in [
+                ObjectType.RETURN,
+                ObjectType.BREAK,
+                ObjectType.CONTINUE,
+            ]:
+                if ret_val.obj_type == ObjectType.RETURN:
+                    msg = '"return" statement not used outside of a function or class' "method!"
+                    raise InternalRuntimeError(msg)
+                elif ret_val.obj_type == ObjectType.BREAK:
+                    msg = '"break" statement not used within a loop or a switch block!'
+                    raise InternalRuntimeError(msg)
+                elif ret_val.obj_type == ObjectType.CONTINUE:
+                    msg = '"continue" statement not used within a loop!'
+                    raise InternalRuntimeError(msg)
+
+    def visit_bracket(self, node):
+        return (yield node.expr)
+
+    def visit_arith(self, node):
+        left = yield node.left
+        right = yield node.right
+        if node.op == TokType.PLUS:
+            return left + right
+        elif node.op == TokType.MINUS:
+            return left - right
+        elif node.op == TokType.MUL:
+            return left * right
+        elif node.op == TokType.DIV:
+            return left / right
+
+    def visit_logic(self, node):
+        left = yield node.left
+        right = yield node.right
+        if node.op == TokType.AND:
+            return left & right
+        elif node.op == TokType.OR:
+            return left | right
+
+    def visit_relop(self, node):
+        left = yield node.left
+        right = yield node.right
+        if node.op == TokType.GT:
+            return left > right
+        elif node.op == TokType.GTE:
+            return left >= right
+        elif node.op == TokType.LT:
+            return left < right
+        elif node.op == TokType.LTE:
+            return left <= right
+
+    def visit_eq(self, node):
+        left = yield node.left
+        right = yield node.right
+        if node.op == TokType.EQ:
+            return left == right
+        elif node.op == TokType.NEQ:
+            return left != right
+
+    def visit_unary(self, node):
+        result = yield node.value
+        if node.op == TokType.MINUS:
+            return -result
+        elif node.op == TokType.BANG:
+            return ~result
+
+    def visit_if(self, node):
+        for condition in node.condition_blocks:
+            cond_value = yield condition.test_condition
+            if is_truthy(cond_value):
+                return (yield condition.body)
+
+        if node.else_block is not None:
+            return (yield node.else_block)
+
+    def visit_while(self, node):
+        self._reset_invariants(node)
+        cond_value = yield node.condition
+        while is_truthy(cond_value):
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
+            ret_val = yield node.body
+            if ret_val is not None:
+                if ret_val.obj_type == ObjectType.BREAK:
+                    return
+                elif ret_val.obj_type == ObjectType.CONTINUE:
+                    pass
+                else:
+                    return ret_val
+            cond_value = yield node.condition
+
+    def visit_for(self, node):
+        iterable = yield node.iterable
+        values = self._iterate(iterable)
+        self._reset_invariants(node)
+        self.env.enter_scope(self.env.peek())
+        loop_vars = self.env.peek().scope
+        for value in values:
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
+            loop_vars[node.var_name] = value
+            ret_val = yield node.body
+            if ret_val is not None:
+                if ret_val.obj_type == ObjectType.BREAK:
+                    break
+                elif ret_val.obj_type == ObjectType.CONTINUE:
+                    pass
+                else:
+                    self.env.exit_scope()
+                    return ret_val
+
+        self.env.exit_scope()
+
+    def visit_do_while(self, node):
+        self._reset_invariants(node)
+        cond_value = None
+        while cond_value is None or is_truthy(cond_value):
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
+            ret_val = yield node.body
+            if ret_val is not None:
+                if ret_val.obj_type == ObjectType.BREAK:
+                    return
+                elif ret_val.obj_type == ObjectType.CONTINUE:
+                    pass
+                else:
+                    return ret_val
+            cond_value = yield node.cond
+
+    def visit_invariant(self, node):
+        if node.value is not None:
+            return node.value
+        return self._evaluate_invariant(node)
+
+    def _evaluate_invariant(self, node):
+        return self._store_invariant(node, (yield node.expr))
+
+    def visit_print(self, node):
+        print_value = yield node.expr
+        print(str(print_value))
+
+    def visit_replace_assign(self, node):
+        new_value = yield node.value
+        if node.symbol_path is not None:
+            symbol_namespace = yield node.symbol_path
+        else:
+            symbol_namespace = self.env.peek()
+
+        array_index = None
+        if isinstance(node.symbol_name, ast_nodes.ArrayAccessNode):
+            array_index = yield node.symbol_name.array_pos
+        self._replace_assign(node, symbol_namespace, new_value, array_index)
+
+    def visit_new_assign(self, node):
+        if isinstance(node.symbol_name, ast_nodes.CallNode):
+            return self._new_assign_call()
+        elif isinstance(node.symbol_name, (ast_nodes.SymbolNode, ast_nodes.ArrayAccessNode)):
+            if node.symbol_path is None:
+                scope = self.env.peek()
+                if not scope.is_initialized(node.symbol_name.val):
+                    value = yield node.value
+                    scope.initialize_variable(node.symbol_name.val, value)
+                else:
+                    raise InternalRuntimeError("Variable '{}' is already initialized!".format(node.symbol_name.val))
+            else:
+                symbol_path = yield node.symbol_path
+                value = yield node.value
+                if isinstance(symbol_path, Scope):
+                    symbol_path.initialize_variable(node.symbol_name.val, value)
+                elif symbol_path.obj_type in [ObjectType.MODULE, ObjectType.CLASS_INSTANCE]:
+                    symbol_path.namespace.initialize_variable(node.symbol_name.val, value)
+        else:
+            raise InternalRuntimeError("Cannot assign to {}!".format(node.symbol_name))
+
+    def visit_scope_block(self, node):
+        if node.needs_scope:
+            parent_env = self.env.peek()
+            self.env.enter_scope(parent_env)
+        profiler = self.profiler
+        for stmnt in node.stmnts:
+            if profiler is not None:
+                profiler.enter_statement(stmnt)
+            ret_val = yield stmnt
+            if ret_val is not None and ret_val.obj_type in [
+                ObjectType.RETURN,
+                ObjectType.BREAK,
+                ObjectType.CONTINUE,
+            ]:
+                if node.needs_scope:
+                    self.env.exit_scope()
+                return ret_val
+
+        if node.needs_scope:
+            self.env.exit_scope()
+
+    def visit_switch(self, node):
+        test_cond = yield node.switch_cond
+
+        if node.jump_table is not None:
+            start_case_idx = self._switch_jump(node, test_cond)
+        else:
+            start_case_idx = len(node.switch_cases)
+            for idx, switch_case in enumerate(node.switch_cases):
+                case_cond = yield switch_case[0]
+                if case_cond.raw_equals(test_cond):
+                    start_case_idx = idx
+                    break
+
+        for _, case_body in node.switch_cases[start_case_idx:]:
+            ret_val = yield case_body
+            if ret_val is not None:
+                if ret_val.obj_type == ObjectType.BREAK:
+                    return
+                else:
+                    return ret_val
+
+        if node.default_case is not None:
+            return (yield node.default_case)
+
+    def _run_function(self, func_object, call_args, arg_values=None):
+        """
+        Generator which runs the body of a Zai function or class method and returns
+        the "return" value produced by it. The arguments are evaluated from call_args
+        unless their values are given by arg_values.
+        """
+        if arg_values is None:
+            arg_values = list()
+            for arg in call_args:
+                arg_values.append((yield arg))
+
+        if self.call_depth >= self.max_call_depth:
+            raise InternalStackOverflowError(self.max_call_depth)
+
+        self._enter_function(func_object, arg_values)
+        self.call_depth += 1
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter_function(func_object)
+        while True:
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
+            ret_val = None
+            for stmnt in func_object.body:
+                if profiler is not None:
+                    profiler.enter_statement(stmnt)
+                ret_val = yield stmnt
+                if ret_val is not None:
+                    ret_val = self._function_flow(ret_val)
+                    if ret_val is not None:
+                        break
+
+            if profiler is not None:
+                profiler.exit_function()
+
+            if not isinstance(ret_val, TailCallObject):
+                break
+
+            # Replace the frame of the current function with the one of the callee.
+            self._exit_function(func_object)
+            func_object = ret_val.func_object
+            self._enter_function(func_object, ret_val.arg_values)
+            if profiler is not None:
+                profiler.enter_function(func_object)
+
+        self.call_depth -= 1
+        self._exit_function(func_object)
+        return ret_val
+
+    def visit_call(self, node):
+        call_object = yield node.object_name
+        return (yield from self._call(call_object, node.call_args))
+
+    def _call(self, call_object, call_args):
+        if call_object.obj_type in [ObjectType.FUNC, ObjectType.CLASS_METHOD]:
+            ret_val = yield from self._run_function(call_object, call_args)
+            if ret_val is None or ret_val.value is None:
+                return NilObject()
+            else:
+                return ret_val.value
+
+        elif call_object.obj_type == ObjectType.NATIVE_FUNC:
+            if not call_object.accepts_arg_count(len(call_args)):
+                raise InternalRuntimeError(
+                    "Function '{}' accepts only {} arguments but {} were given".format(
+                        call_object.name, call_object.arity_str(), len(call_args)
+                    )
+                )
+            evaluated_args = list()
+            for arg in call_args:
+                evaluated_args.append((yield arg))
+            if self.profiler is None:
+                return call_object.body(*evaluated_args)
+            self.profiler.enter_function(call_object)
+            try:
+                return call_object.body(*evaluated_args)
+            finally:
+                self.profiler.exit_function()
+
+        elif call_object.obj_type == ObjectType.MEMO_FUNC:
+            arg_values = list()
+            for arg in call_args:
+                arg_values.append((yield arg))
+
+            key = memo_key(arg_values)
+            result = call_object.lookup(key)
+            if result is None:
+                ret_val = yield from self._run_function(call_object.func, call_args, arg_values)
+                result = NilObject() if ret_val is None or ret_val.value is None else ret_val.value
+                if key is not None:
+                    call_object.store(key, result)
+            return result
+
+        elif call_object.obj_type == ObjectType.CLASS_DEF:
+            instance_ptr = ClassInstanceObject(call_object)
+            self.env.enter_scope(instance_ptr.namespace)
+            self.env.peek().initialize_variable("this", instance_ptr.namespace)
+
+            class_constructor = instance_ptr.get_field("constructor")
+            if class_constructor is None and len(call_args) != 0:
+                raise InternalRuntimeError(
+                    (
+                        "Class '{}' does not have a constructor method but "
+                        "initialization detected {} arguments passed."
+                    ).format(call_object.class_name, len(call_args))
+                )
+            elif class_constructor is not None:
+                yield from self._run_function(class_constructor, call_args)
+
+            self.env.exit_scope()
+            return instance_ptr
+        else:
+            raise InternalRuntimeError("Object is not callable!")
+
+    def visit_dot_node(self, node):
+        left = yield node.left
+        return self._property_access(node, left)
+
+    def visit_return(self, node):
+        if node.expr is None:
+            return ReturnObject(NilObject())
+
+        if node.tail_call:
+            call_object = yield node.expr.object_name
+            if call_object.obj_type in [ObjectType.FUNC, ObjectType.CLASS_METHOD]:
+                arg_values = list()
+                for arg in node.expr.call_args:
+                    arg_values.append((yield arg))
+                return TailCallObject(call_object, arg_values)
+            return ReturnObject((yield from self._call(call_object, node.expr.call_args)))
+
+        return_val = yield node.expr
+        return ReturnObject(return_val)
+
+    def visit_array(self, node):
+        eval_elem = list()
+        for elem in node.elements:
+            eval_elem.append((yield elem))
+
+        return new_array(eval_elem)
+
+    def visit_array_access(self, node):
+        array_obj = yield node.array_name
+        array_idx = yield node.array_pos
+        return self._array_access(array_obj, array_idx)
+
+    def visit_incr(self, node):
+        node_val = yield node.value
+        node_val.value += 1
+        return node_val
+
+    def visit_decr(self, node):
+        node_val = yield node.value
+        node_val.value -= 1
+        return node_val
+
+    def visit_add_assign(self, node):
+        new_value = yield node.increment
+        symbol_path = None
+        if node.symbol_path is not None:
+            symbol_path = yield node.symbol_path
+        self._augmented_assign(node.symbol_name.val, symbol_path, new_value, TokType.PLUS)
+
+    def visit_sub_assign(self, node):
+        new_value = yield node.decrement
+        symbol_path = None
+        if node.symbol_path is not None:
+            symbol_path = yield node.symbol_path
+        self._augmented_assign(node.symbol_name.val, symbol_path, new_value, TokType.MINUS)
@@ -15,8 +15,34 @@
 # You should have received a copy of the GNU General Public License
 # along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
 
+import operator
 import zai.objects
 
+NUMBER_TYPES = (zai.objects.ObjectType.INT, zai.objects.ObjectType.FLOAT)
+
+# Types of elements which can be ordered by min, max and sort.
+ORDERED_TYPES = (zai.objects.ObjectType.INT, zai.objects.ObjectType.FLOAT, zai.objects.ObjectType.STR)
+
+# Operations which can be applied to every number of an array by map.
+MAP_OPERATIONS = {
+    "neg": operator.neg,
+    "abs": abs,
+    "square": lambda value: value * value,
+}
+
+# Number of results cached by a memoized function unless another size is given.
+DEFAULT_MEMO_SIZE = 128
+
+# Predicates which can be used to select the numbers of an array using filter.
+FILTER_PREDICATES = {
+    "positive": lambda value: value > 0,
+    "negative": lambda value: value < 0,
+    "zero": lambda value: value == 0,
+    "nonzero": lambda value: value != 0,
+    "even": lambda value: value % 2 == 0,
+    "odd": lambda value: value % 2 == 1,
+}
+
 
 def object_type(internal_object):
     """
@@ -25,7 +51,7 @@ def object_type(internal_object):
     """
     if internal_object.obj_type == zai.objects.ObjectType.ARRAY:
         return zai.objects.StringObject("array")
-    elif internal_object.obj_type == zai.objects.ObjectType.NUM:
+    elif internal_object.obj_type in [zai.objects.ObjectType.INT, zai.objects.ObjectType.FLOAT]:
         return zai.objects.StringObject("number")
     elif internal_object.obj_type == zai.objects.ObjectType.STR:
         return zai.objects.StringObject("string")
@@ -43,6 +69,10 @@ def object_type(internal_object):
         return zai.objects.StringObject("class_instance")
     elif internal_object.obj_type == zai.objects.ObjectType.CLASS_METHOD:
         return zai.objects.StringObject("class_method")
+    elif internal_object.obj_type == zai.objects.ObjectType.RANGE:
+        return zai.objects.StringObject("range")
+    elif internal_object.obj_type == zai.objects.ObjectType.DICT:
+        return zai.objects.StringObject("dict")
     else:
         return zai.objects.NilObject()
 
@@ -53,7 +83,7 @@ def str_len(internal_object):
     not a string object, return nil.
     """
     if internal_object.obj_type == zai.objects.ObjectType.STR:
-        return zai.objects.NumObject(internal_object.str_len)
+        return zai.objects.IntObject(internal_object.str_len)
     else:
         return zai.objects.NilObject()
 
@@ -63,11 +93,11 @@ def mod(operand1, operand2):
     Find the modulus of operand1 and operand2. Return nil if arguments
     are not numbers.
     """
-    if operand1.obj_type == zai.objects.ObjectType.NUM and operand2.obj_type == zai.objects.ObjectType.NUM:
+    if operand1.obj_type == zai.objects.ObjectType.INT and operand2.obj_type == zai.objects.ObjectType.INT:
         if operand1.value == 0 or operand2.value == 0:
             return zai.objects.NilObject()
         else:
-            return zai.objects.NumObject(operand1.value % operand2.value)
+            return zai.objects.IntObject(operand1.value % operand2.value)
     else:
         return zai.objects.NilObject()
 
@@ -76,10 +106,489 @@ def power(base, exponent):
     """
     Return the argument base raised to the power represented by exponent.
     """
-    if base.obj_type == zai.objects.ObjectType.NUM and exponent.obj_type == zai.objects.ObjectType.NUM:
-        return zai.objects.NumObject(pow(base.value, exponent.value))
+    if base.obj_type == zai.objects.ObjectType.INT and exponent.obj_type == zai.objects.ObjectType.INT:
+        return zai.objects.IntObject(pow(base.value, exponent.value))
+    else:
+        return zai.objects.NilObject()
+
+
+def int_range(start, end):
+    """
+    Return a range of all integers from start up to but not including end. Return nil
+    if the arguments are not integers.
+    """
+    if start.obj_type == zai.objects.ObjectType.INT and end.obj_type == zai.objects.ObjectType.INT:
+        return zai.objects.RangeObject(start.value, end.value)
+    else:
+        return zai.objects.NilObject()
+
+
+def obj_len(internal_object):
+    """
+    Return the number of elements of an array or dictionary or characters of a string.
+    Return nil for any other object.
+    """
+    if internal_object.obj_type in [zai.objects.ObjectType.ARRAY, zai.objects.ObjectType.DICT]:
+        return zai.objects.IntObject(internal_object.size)
+    elif internal_object.obj_type == zai.objects.ObjectType.STR:
+        return zai.objects.IntObject(internal_object.str_len)
+    else:
+        return zai.objects.NilObject()
+
+
+def push(array, value):
+    """
+    Append value to the end of an array and return the new size of the array.
+    Return nil if the first argument is not an array.
+    """
+    if array.obj_type == zai.objects.ObjectType.ARRAY:
+        array.append(value)
+        return zai.objects.IntObject(array.size)
+    else:
+        return zai.objects.NilObject()
+
+
+def pop(array):
+    """
+    Remove the last element of an array and return it. Return nil if the array is
+    empty or the argument is not an array.
+    """
+    if array.obj_type == zai.objects.ObjectType.ARRAY and array.size > 0:
+        return array.pop()
+    else:
+        return zai.objects.NilObject()
+
+
+def insert(array, idx, value):
+    """
+    Insert value into an array before the element at position idx(or at its end when
+    idx is the size of the array) and return the new size of the array. Return nil if
+    the arguments are not an array and an integer or idx is out of bounds.
+    """
+    if (
+        array.obj_type == zai.objects.ObjectType.ARRAY
+        and idx.obj_type == zai.objects.ObjectType.INT
+        and 0 <= idx.value <= array.size
+    ):
+        array.insert(idx.value, value)
+        return zai.objects.IntObject(array.size)
+    else:
+        return zai.objects.NilObject()
+
+
+def reserve(array, capacity):
+    """
+    Hint that an array will grow to contain capacity elements. Return nil if the
+    arguments are not an array and a positive integer.
+    """
+    if (
+        array.obj_type == zai.objects.ObjectType.ARRAY
+        and capacity.obj_type == zai.objects.ObjectType.INT
+        and capacity.value >= 0
+    ):
+        array.reserve(capacity.value)
+        return array
+    else:
+        return zai.objects.NilObject()
+
+
+def typed_array(type_name):
+    """
+    Create an empty typed array storing elements of the type named by type_name
+    ("int64", "float64", "bool" or "byte"). Return nil if the type is unknown.
+    """
+    if type_name.obj_type == zai.objects.ObjectType.STR and type_name.value in zai.objects.TYPED_ARRAY_TYPES:
+        elem_type = zai.objects.TYPED_ARRAY_TYPES[type_name.value]
+        return zai.objects.ArrayObject(elem_type.new_storage(), elem_type)
+    else:
+        return zai.objects.NilObject()
+
+
+def array_type(array):
+    """
+    Return the name of the type of the elements stored by a typed array or "generic"
+    for an array which can store elements of any type. Return nil if the argument is
+    not an array.
+    """
+    if array.obj_type != zai.objects.ObjectType.ARRAY:
+        return zai.objects.NilObject()
+    elif array.elem_type is None:
+        return zai.objects.StringObject("generic")
+    else:
+        return zai.objects.StringObject(array.elem_type.name)
+
+
+def array_slice(array, start, end):
+    """
+    Return a view of the elements of an array from position start up to but not
+    including end. The view shares the elements of the array until either of them
+    is modified, so creating it takes constant time. Return nil if the positions are
+    not integers within the bounds of the array.
+    """
+    if (
+        array.obj_type != zai.objects.ObjectType.ARRAY
+        or start.obj_type != zai.objects.ObjectType.INT
+        or end.obj_type != zai.objects.ObjectType.INT
+        or not 0 <= start.value <= end.value <= array.size
+    ):
+        return zai.objects.NilObject()
+    return array.view(start.value, end.value)
+
+
+def _raw_values(array):
+    """
+    Return the type shared by all elements of an array along with a sequence of
+    their raw Python values. Typed arrays return their storage directly. Return
+    (None, None) if the argument is not an array or its elements are not atoms of a
+    single type, and (None, []) for an empty generic array.
+    """
+    if array.obj_type != zai.objects.ObjectType.ARRAY:
+        return None, None
+    elif array.elem_type is not None:
+        return array.elem_type.obj_type, array.elements
+    elif not array.elements:
+        return None, []
+
+    obj_type = array.elements[0].obj_type
+    if obj_type not in zai.objects.ATOM_BOX_FUNCS:
+        return None, None
+    for elem in array.elements:
+        if elem.obj_type != obj_type:
+            return None, None
+    return obj_type, [elem.value for elem in array.elements]
+
+
+def _operand_values(operand, size):
+    """
+    Return the type and raw values of the right operand of an element-wise
+    operation, which is either an array of the given size or a single atom repeated
+    size times. Return (None, None) for any other operand.
+    """
+    if operand.obj_type == zai.objects.ObjectType.ARRAY:
+        obj_type, values = _raw_values(operand)
+        if values is None or len(values) != size:
+            return None, None
+        return obj_type, values
+    elif operand.obj_type in zai.objects.ATOM_BOX_FUNCS:
+        return operand.obj_type, [operand.value] * size
+    else:
+        return None, None
+
+
+def _arith_result_type(left_type, right_type):
+    """
+    Return the type of the result of an arithmetic operation between numbers of the
+    given types, following the rules of the interpreter: integers combine only with
+    integers while floats combine with any number.
+    """
+    if left_type == zai.objects.ObjectType.INT and right_type == zai.objects.ObjectType.INT:
+        return zai.objects.ObjectType.INT
+    elif left_type == zai.objects.ObjectType.FLOAT and right_type in NUMBER_TYPES:
+        return zai.objects.ObjectType.FLOAT
+    else:
+        return None
+
+
+def _elementwise(array, operand, operation, arith):
+    """
+    Apply operation to each element of array and the matching value of operand.
+    Arithmetic operations produce an array of numbers, while comparisons require
+    elements of the same type and produce an array of booleans. Return nil if the
+    operation is not supported for the arguments.
+    """
+    left_type, left_values = _raw_values(array)
+    if left_values is None:
+        return zai.objects.NilObject()
+    right_type, right_values = _operand_values(operand, len(left_values))
+    if right_values is None:
+        return zai.objects.NilObject()
+
+    if not left_values:
+        return zai.objects.ArrayObject([])
+    elif arith:
+        result_type = _arith_result_type(left_type, right_type)
+    elif left_type == right_type:
+        result_type = zai.objects.ObjectType.BOOL
+    else:
+        result_type = None
+
+    if result_type is None:
+        return zai.objects.NilObject()
+    return zai.objects.array_from_raw(result_type, list(map(operation, left_values, right_values)))
+
+
+def array_sum(array):
+    """
+    Return the sum of all numbers within an array. Return nil if the argument is not
+    an array of integers or an array of floats.
+    """
+    obj_type, values = _raw_values(array)
+    if values is None:
+        return zai.objects.NilObject()
+    elif obj_type == zai.objects.ObjectType.FLOAT:
+        return zai.objects.FloatObject(sum(values, 0.0))
+    elif obj_type == zai.objects.ObjectType.INT or not values:
+        return zai.objects.IntObject(sum(values))
+    else:
+        return zai.objects.NilObject()
+
+
+def array_min(array):
+    """
+    Return the smallest element of an array of numbers or strings. Return nil if the
+    array is empty or its elements cannot be ordered.
+    """
+    obj_type, values = _raw_values(array)
+    if obj_type not in ORDERED_TYPES or not values:
+        return zai.objects.NilObject()
+    return zai.objects.ATOM_BOX_FUNCS[obj_type](min(values))
+
+
+def array_max(array):
+    """
+    Return the largest element of an array of numbers or strings. Return nil if the
+    array is empty or its elements cannot be ordered.
+    """
+    obj_type, values = _raw_values(array)
+    if obj_type not in ORDERED_TYPES or not values:
+        return zai.objects.NilObject()
+    return zai.objects.ATOM_BOX_FUNCS[obj_type](max(values))
+
+
+def elem_add(array, operand):
+    """
+    Return a new array containing the sum of each number of an array and the matching
+    number of operand, which is either an array of the same size or a single number.
+    """
+    return _elementwise(array, operand, operator.add, True)
+
+
+def elem_mul(array, operand):
+    """
+    Return a new array containing the product of each number of an array and the
+    matching number of operand, which is either an array of the same size or a single
+    number.
+    """
+    return _elementwise(array, operand, operator.mul, True)
+
+
+def elem_eq(array, operand):
+    """
+    Return a new array of booleans which are true where an element of an array is
+    equal to the matching value of operand, which is either an array of the same size
+    or a single value.
+    """
+    return _elementwise(array, operand, operator.eq, False)
+
+
+def elem_lt(array, operand):
+    """
+    Return a new array of booleans which are true where an element of an array is
+    less than the matching value of operand, which is either an array of the same
+    size or a single value.
+    """
+    return _elementwise(array, operand, operator.lt, False)
+
+
+def elem_gt(array, operand):
+    """
+    Return a new array of booleans which are true where an element of an array is
+    greater than the matching value of operand, which is either an array of the same
+    size or a single value.
+    """
+    return _elementwise(array, operand, operator.gt, False)
+
+
+def array_map(array, operation_name):
+    """
+    Return a new array created by applying the native operation named by
+    operation_name ("neg", "abs" or "square") to each number of an array. Return nil
+    if the operation is unknown or the array does not contain only numbers.
+    """
+    obj_type, values = _raw_values(array)
+    if (
+        obj_type not in NUMBER_TYPES
+        or operation_name.obj_type != zai.objects.ObjectType.STR
+        or operation_name.value not in MAP_OPERATIONS
+    ):
+        return zai.objects.NilObject()
+    operation = MAP_OPERATIONS[operation_name.value]
+    return zai.objects.array_from_raw(obj_type, list(map(operation, values)))
+
+
+def array_filter(array, predicate_name):
+    """
+    Return a new array of the numbers within an array for which the native predicate
+    named by predicate_name ("positive", "negative", "zero", "nonzero", "even" or
+    "odd") is true. Return nil if the predicate is unknown or the array does not
+    contain only numbers.
+    """
+    obj_type, values = _raw_values(array)
+    if (
+        obj_type not in NUMBER_TYPES
+        or predicate_name.obj_type != zai.objects.ObjectType.STR
+        or predicate_name.value not in FILTER_PREDICATES
+    ):
+        return zai.objects.NilObject()
+    predicate = FILTER_PREDICATES[predicate_name.value]
+    if array.elem_type is not None:
+        # Keep the type of the storage(ex. byte arrays remain byte arrays).
+        return zai.objects.ArrayObject(array.elem_type.new_storage(filter(predicate, values)), array.elem_type)
+    return zai.objects.array_from_raw(obj_type, list(filter(predicate, values)))
+
+
+def array_sort(array):
+    """
+    Sort an array of numbers or strings in ascending order in place and return it.
+    Return nil if the elements of the array cannot be ordered.
+    """
+    obj_type, values = _raw_values(array)
+    if values is None or (values and obj_type not in ORDERED_TYPES):
+        return zai.objects.NilObject()
+    array.unshare()
+    if array.elem_type is not None:
+        array.elements = array.elem_type.new_storage(sorted(values))
     else:
+        array.elements.sort(key=operator.attrgetter("value"))
+    return array
+
+
+def array_reverse(array):
+    """
+    Reverse the order of the elements of an array in place and return it. Return nil
+    if the argument is not an array.
+    """
+    if array.obj_type != zai.objects.ObjectType.ARRAY:
+        return zai.objects.NilObject()
+    array.unshare()
+    array.elements.reverse()
+    return array
+
+
+def index_of(array, value):
+    """
+    Return the position of the first element of an array equal to value or -1 if
+    there is no such element. Return nil if the first argument is not an array.
+    """
+    if array.obj_type != zai.objects.ObjectType.ARRAY:
+        return zai.objects.NilObject()
+    elif array.elem_type is not None:
+        if value.obj_type == array.elem_type.obj_type:
+            try:
+                return zai.objects.IntObject(array.elements.index(value.value))
+            except ValueError:
+                pass
+        return zai.objects.IntObject(-1)
+
+    for idx, elem in enumerate(array.elements):
+        if elem.raw_equals(value):
+            return zai.objects.IntObject(idx)
+    return zai.objects.IntObject(-1)
+
+
+def new_dict():
+    """
+    Return a new empty dictionary.
+    """
+    return zai.objects.DictObject()
+
+
+def _is_dict_access(dictionary, key):
+    """
+    Check if dictionary is a dictionary and key can be used as one of its keys.
+    """
+    return dictionary.obj_type == zai.objects.ObjectType.DICT and zai.objects.dict_key(key) is not None
+
+
+def dict_get(dictionary, key):
+    """
+    Return the value stored under key within a dictionary. Return nil if there is no
+    such value or the arguments are not a dictionary and a valid key.
+    """
+    if not _is_dict_access(dictionary, key):
+        return zai.objects.NilObject()
+    value = dictionary.get(key)
+    if value is None:
+        return zai.objects.NilObject()
+    return value
+
+
+def dict_set(dictionary, key, value):
+    """
+    Store value under key within a dictionary and return the dictionary. Return nil
+    if the arguments are not a dictionary and a valid key.
+    """
+    if not _is_dict_access(dictionary, key):
+        return zai.objects.NilObject()
+    dictionary.set(key, value)
+    return dictionary
+
+
+def dict_has(dictionary, key):
+    """
+    Check if a dictionary contains a value stored under key. Return nil if the
+    arguments are not a dictionary and a valid key.
+    """
+    if not _is_dict_access(dictionary, key):
+        return zai.objects.NilObject()
+    return zai.objects.BoolObject(dictionary.has(key))
+
+
+def dict_delete(dictionary, key):
+    """
+    Remove the value stored under key within a dictionary and return whether there
+    was such a value. Return nil if the arguments are not a dictionary and a valid
+    key.
+    """
+    if not _is_dict_access(dictionary, key):
+        return zai.objects.NilObject()
+    return zai.objects.BoolObject(dictionary.delete(key))
+
+
+def dict_keys(dictionary):
+    """
+    Return an array of all keys of a dictionary in the order they were added. Return
+    nil if the argument is not a dictionary.
+    """
+    if dictionary.obj_type != zai.objects.ObjectType.DICT:
+        return zai.objects.NilObject()
+    return zai.objects.new_array(dictionary.keys())
+
+
+def memoize(func, max_size=None):
+    """
+    Return a function which caches the results of calling func, keeping the results
+    of at most max_size(128 by default) different calls. Return nil if func is not a
+    Zai function or max_size is not a positive integer.
+    """
+    if func.obj_type not in [zai.objects.ObjectType.FUNC, zai.objects.ObjectType.CLASS_METHOD]:
+        return zai.objects.NilObject()
+    if max_size is None:
+        return zai.objects.MemoFuncObject(func, DEFAULT_MEMO_SIZE)
+    elif max_size.obj_type == zai.objects.ObjectType.INT and max_size.value > 0:
+        return zai.objects.MemoFuncObject(func, max_size.value)
+    else:
+        return zai.objects.NilObject()
+
+
+def memo_stats(memo_func):
+    """
+    Return a dictionary containing the number of cache hits, misses and evictions of
+    a memoized function along with the current and maximum size of its cache. Return
+    nil if the argument is not a memoized function.
+    """
+    if memo_func.obj_type != zai.objects.ObjectType.MEMO_FUNC:
         return zai.objects.NilObject()
+    stats = zai.objects.DictObject()
+    for name, value in [
+        ("hits", memo_func.hits),
+        ("misses", memo_func.misses),
+        ("evictions", memo_func.evictions),
+        ("size", len(memo_func.cache)),
+        ("max_size", memo_func.max_size),
+    ]:
+        stats.set(zai.objects.StringObject(name), zai.objects.IntObject(value))
+    return stats
 
 
 def register_functions():
@@ -92,5 +601,35 @@ def register_functions():
     registered_functions.append(zai.objects.NativeFuncObject(object_type))
     registered_functions.append(zai.objects.NativeFuncObject(power))
     registered_functions.append(zai.objects.NativeFuncObject(mod))
+    registered_functions.append(zai.objects.NativeFuncObject(int_range, "range"))
+    registered_functions.append(zai.objects.NativeFuncObject(obj_len, "len"))
+    registered_functions.append(zai.objects.NativeFuncObject(push))
+    registered_functions.append(zai.objects.NativeFuncObject(pop))
+    registered_functions.append(zai.objects.NativeFuncObject(insert))
+    registered_functions.append(zai.objects.NativeFuncObject(reserve))
+    registered_functions.append(zai.objects.NativeFuncObject(typed_array))
+    registered_functions.append(zai.objects.NativeFuncObject(array_type))
+    registered_functions.append(zai.objects.NativeFuncObject(array_sum, "sum"))
+    registered_functions.append(zai.objects.NativeFuncObject(array_min, "min"))
+    registered_functions.append(zai.objects.NativeFuncObject(array_max, "max"))
+    registered_functions.append(zai.objects.NativeFuncObject(elem_add))
+    registered_functions.append(zai.objects.NativeFuncObject(elem_mul))
+    registered_functions.append(zai.objects.NativeFuncObject(elem_eq))
+    registered_functions.append(zai.objects.NativeFuncObject(elem_lt))
+    registered_functions.append(zai.objects.NativeFuncObject(elem_gt))
+    registered_functions.append(zai.objects.NativeFuncObject(array_map, "map"))
+    registered_functions.append(zai.objects.NativeFuncObject(array_filter, "filter"))
+    registered_functions.append(zai.objects.NativeFuncObject(array_sort, "sort"))
+    registered_functions.append(zai.objects.NativeFuncObject(array_reverse, "reverse"))
+    registered_functions.append(zai.objects.NativeFuncObject(index_of))
+    registered_functions.append(zai.objects.NativeFuncObject(array_slice, "slice"))
+    registered_functions.append(zai.objects.NativeFuncObject(new_dict, "dict"))
+    registered_functions.append(zai.objects.NativeFuncObject(dict_get))
+    registered_functions.append(zai.objects.NativeFuncObject(dict_set))
+    registered_functions.append(zai.objects.NativeFuncObject(dict_has))
+    registered_functions.append(zai.objects.NativeFuncObject(dict_delete))
+    registered_functions.append(zai.objects.NativeFuncObject(dict_keys))
+    registered_functions.append(zai.objects.NativeFuncObject(memoize))
+    registered_functions.append(zai.objects.NativeFuncObject(memo_stats))
 
     return registered_functions
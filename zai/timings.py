@@ -0,0 +1,197 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains the instrumentation measuring the time spent within each phase of
+evaluating code along with counters of the work done by the phases."""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from zai.ast_nodes import ASTNode
+from zai.env import Scope
+from zai.objects import InternalObject
+
+# Phases of evaluating code in the order in which they run.
+PHASES = ["lex", "parse", "optimize", "execute"]
+# Classes whose instances are counted by allocation counters, including instances of
+# their subclasses.
+COUNTED_CLASSES = [InternalObject, Scope]
+# Allocation counters running within the current thread or asyncio task. Objects are
+# only recorded by the counters of the context creating them, so VMs evaluating code
+# at the same time do not count each other's objects.
+running_counters = ContextVar("running_counters", default=())
+
+
+def _initialized_classes():
+    """
+    Return the counted classes and their subclasses which define an __init__ method.
+    """
+    classes = list()
+    pending = list(COUNTED_CLASSES)
+    while pending:
+        cls = pending.pop()
+        if "__init__" in vars(cls):
+            classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _counting_init(init):
+    """
+    Wrap an __init__ method so that it records the object being initialized within
+    every running allocation counter.
+    """
+
+    def counting_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        # Only the __init__ method of the class itself counts the object, not the
+        # methods of the base classes it calls.
+        if type(self).__init__ is counting_init:
+            for counter in running_counters.get():
+                counter.record(self)
+
+    return counting_init
+
+
+class AllocationCounter:
+    """
+    Counts the internal objects and scopes created while it is running by the name of
+    their class. Counting wraps the __init__ methods of the counted classes, and the
+    original methods are put back once no counter is running so allocations are not
+    slowed down otherwise. A counter only counts the objects created within the thread
+    or asyncio task which started it. Objects created without calling __init__(ex.
+    ropes) are not counted.
+    """
+
+    # Number of counters running within any thread while the methods are wrapped,
+    # along with the original __init__ method of every class.
+    running_count = 0
+    original_inits = dict()
+    wrap_lock = threading.Lock()
+
+    def __init__(self):
+        self.counts = dict()
+
+    def start(self):
+        with AllocationCounter.wrap_lock:
+            if AllocationCounter.running_count == 0:
+                for cls in _initialized_classes():
+                    AllocationCounter.original_inits[cls] = cls.__init__
+                    cls.__init__ = _counting_init(cls.__init__)
+            AllocationCounter.running_count += 1
+        running_counters.set(running_counters.get() + (self,))
+
+    def stop(self):
+        running_counters.set(tuple(counter for counter in running_counters.get() if counter is not self))
+        with AllocationCounter.wrap_lock:
+            AllocationCounter.running_count -= 1
+            if AllocationCounter.running_count == 0:
+                for cls, init in AllocationCounter.original_inits.items():
+                    cls.__init__ = init
+                AllocationCounter.original_inits.clear()
+
+    def record(self, obj):
+        """
+        Count an object which has just been initialized.
+        """
+        name = type(obj).__name__
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+
+def count_nodes(root):
+    """
+    Return the number of distinct AST nodes reachable from root.
+    """
+    seen = set()
+    pending = [root]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, ASTNode):
+            if id(value) not in seen:
+                seen.add(id(value))
+                pending.extend(vars(value).values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+    return len(seen)
+
+
+class PhaseTimings:
+    """
+    Wall clock and CPU time spent within each phase of evaluating code, accumulated
+    over every string evaluated by a VM, along with the number of tokens, AST nodes,
+    scopes, imported modules and internal objects of each type created.
+    """
+
+    def __init__(self):
+        self.wall_times = dict.fromkeys(PHASES, 0.0)
+        self.cpu_times = dict.fromkeys(PHASES, 0.0)
+        self.counters = {"tokens": 0, "ast_nodes": 0}
+        self.allocations = AllocationCounter()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Measure the time spent and the objects allocated within the body of the
+        "with" statement as part of the named phase.
+        """
+        self.allocations.start()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.wall_times[name] += time.perf_counter() - wall_start
+            self.cpu_times[name] += time.process_time() - cpu_start
+            self.allocations.stop()
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        """
+        Return all measurements as a dictionary(ex. for monitoring tools).
+        """
+        objects = dict(self.allocations.counts)
+        scopes = objects.pop("Scope", 0)
+        counters = dict(self.counters)
+        counters["scopes"] = scopes
+        counters["imports"] = objects.get("ModuleObject", 0)
+        counters["objects"] = sum(objects.values())
+        return {
+            "phases": {name: {"wall": self.wall_times[name], "cpu": self.cpu_times[name]} for name in PHASES},
+            "counters": counters,
+            "allocations": objects,
+        }
+
+    def report(self):
+        """
+        Return the measurements as a human readable table.
+        """
+        timings = self.as_dict()
+        lines = list()
+        lines.append("{:<10} {:>12} {:>12}".format("phase", "wall(s)", "cpu(s)"))
+        for name, times in timings["phases"].items():
+            lines.append("{:<10} {:>12.6f} {:>12.6f}".format(name, times["wall"], times["cpu"]))
+        lines.append("")
+        for name, value in timings["counters"].items():
+            lines.append("{:<10} {:>12}".format(name, value))
+        lines.append("")
+        allocations = sorted(timings["allocations"].items(), key=lambda item: item[1], reverse=True)
+        for name, value in allocations:
+            lines.append("{:<20} {:>12}".format(name, value))
+        return "\n".join(lines) + "\n"
@@ -31,6 +31,8 @@ class TokType(Enum):
     COMMA = auto()
     # A semicolon ";"
     SEMIC = auto()
+    # A colon ":"
+    COLON = auto()
     # Single quote '
     QUOTE = auto()
     # Double quote "
@@ -70,6 +72,7 @@ class TokType(Enum):
     ELIF = auto()
     WHILE = auto()
     FOR = auto()
+    IN = auto()
     SWITCH = auto()
     CASE = auto()
     DO = auto()
@@ -135,6 +138,7 @@ class TokType(Enum):
             "ELIF": "elif keyword",
             "WHILE": "while keyword",
             "FOR": "for keyword",
+            "IN": "in keyword",
             "SWITCH": "switch keyword",
             "CASE": "case keyword",
             "DO": "do keyword",
@@ -208,6 +212,7 @@ keywords = {
     "elif": TokType.ELIF,
     "while": TokType.WHILE,
     "for": TokType.FOR,
+    "in": TokType.IN,
     "print": TokType.PRINT,
     "true": TokType.TRUE,
     "false": TokType.FALSE,
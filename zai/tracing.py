@@ -0,0 +1,148 @@
+# Copyright 2021 by Yavor Konstantinov <ykonstantinov1@gmail.com>
+
+# This file is part of zai-pl.
+
+# zai-pl is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# zai-pl is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with zai-pl. If not, see <https://www.gnu.org/licenses/>.
+
+"""Module contains the hooks through which embedders observe the evaluation of code
+along with the instrumented visitors which notify them. The instrumented visitors are
+only used while hooks are installed, so evaluating code without hooks costs nothing
+extra."""
+from zai.visitor import Visitor
+from zai.stack_visitor import StackVisitor, DEFAULT_MAX_CALL_DEPTH
+from zai.internal_error import InternalRuntimeError, InternalTypeError
+
+
+class ExecutionHooks:
+    """
+    Callbacks notified of the events of evaluating code. Subclasses override the
+    callbacks they are interested in, the default ones do nothing.
+    """
+
+    def on_call(self, func_object):
+        """
+        Called when a function, class method or native function is entered.
+        """
+
+    def on_return(self, func_object):
+        """
+        Called when a function entered before is left, including functions left
+        because of a runtime error.
+        """
+
+    def on_statement(self, stmnt):
+        """
+        Called before a statement is executed. The source position of the statement
+        is found within stmnt.pos.
+        """
+
+    def on_error(self, error):
+        """
+        Called with a runtime or type error which stopped the evaluation, once its
+        source position has been determined.
+        """
+
+
+class HookDispatcher:
+    """
+    Instrument passed to the visitor in place of a profiler. It receives the same
+    notifications as a profiler does and passes them on to the hooks as well as to
+    the profiler used along with them, if any.
+    """
+
+    def __init__(self, hooks):
+        self.hooks = hooks
+        self.profiler = None
+        # Functions which have been entered but not yet left, innermost last.
+        self.functions = list()
+
+    def enter_function(self, func_object):
+        if self.profiler is not None:
+            self.profiler.enter_function(func_object)
+        self.functions.append(func_object)
+        self.hooks.on_call(func_object)
+
+    def exit_function(self):
+        if self.profiler is not None:
+            self.profiler.exit_function()
+        self.hooks.on_return(self.functions.pop())
+
+    def enter_statement(self, stmnt):
+        if self.profiler is not None:
+            self.profiler.enter_statement(stmnt)
+        self.hooks.on_statement(stmnt)
+
+    def unwind(self, depth):
+        """
+        Leave every function entered beyond depth after an error stopped evaluating it.
+        """
+        while len(self.functions) > depth:
+            self.hooks.on_return(self.functions.pop())
+
+
+class TracingMixin:
+    """
+    Mixin adding the notification of hooks to a visitor. The dispatcher takes the
+    place of the profiler of the visitor, while the profiler assigned to the visitor
+    is notified by the dispatcher instead.
+    """
+
+    @property
+    def profiler(self):
+        return self.dispatcher
+
+    @profiler.setter
+    def profiler(self, profiler):
+        self.dispatcher.profiler = profiler
+
+    @property
+    def hooks(self):
+        return self.dispatcher.hooks
+
+    def visit(self, ast_root):
+        depth = len(self.dispatcher.functions)
+        try:
+            return super().visit(ast_root)
+        except (InternalRuntimeError, InternalTypeError) as error:
+            self.hooks.on_error(error)
+            self.dispatcher.unwind(depth)
+            raise
+
+
+class TracingVisitor(TracingMixin, Visitor):
+    def __init__(self, environment, hooks):
+        """
+        Recursive visitor notifying hooks of the events of evaluating code.
+        """
+        self.dispatcher = HookDispatcher(hooks)
+        super().__init__(environment)
+
+
+class TracingStackVisitor(TracingMixin, StackVisitor):
+    def __init__(self, environment, hooks, max_call_depth=DEFAULT_MAX_CALL_DEPTH):
+        """
+        Visitor using an explicit call stack which notifies hooks of the events of
+        evaluating code.
+        """
+        self.dispatcher = HookDispatcher(hooks)
+        super().__init__(environment, max_call_depth)
+
+    def visit_slices(self, ast_root):
+        depth = len(self.dispatcher.functions)
+        try:
+            return (yield from super().visit_slices(ast_root))
+        except (InternalRuntimeError, InternalTypeError) as error:
+            self.hooks.on_error(error)
+            self.dispatcher.unwind(depth)
+            raise
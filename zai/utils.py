@@ -17,7 +17,7 @@
 
 """Module containing utilities functions used by the interpreter."""
 import os
-from zai.objects import ObjectType
+from zai.objects import ObjectType, ATOMIC_TYPES
 
 
 def get_module_path():
@@ -58,6 +58,8 @@ def is_truthy(internal_object):
         ObjectType.INT,
         ObjectType.NIL,
         ObjectType.ARRAY,
+        ObjectType.DICT,
+        ObjectType.RANGE,
     ]:
         return bool(internal_object)
     else:
@@ -67,13 +69,21 @@ def is_truthy(internal_object):
 
 def is_atom(obj):
     """
-    Check if an object is an atom(Boolean, Integer or string).
+    Check if an object is an atom(Boolean, Integer, Float, String or nil). Atoms
+    can be hashed.
     """
     if obj is None:
         return False
-    return obj.obj_type in [
-        ObjectType.BOOL,
-        ObjectType.INT,
-        ObjectType.STR,
-        ObjectType.NIL,
-    ]
+    # Scopes(ex. "this") do not have a type.
+    return getattr(obj, "obj_type", None) in ATOMIC_TYPES
+
+
+def memo_key(arg_values):
+    """
+    Return a key identifying the argument values of a call to a memoized function.
+    Return None if any of them is not an atom.
+    """
+    for value in arg_values:
+        if not is_atom(value):
+            return None
+    return tuple(arg_values)
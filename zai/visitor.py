@@ -19,12 +19,13 @@
 produced by the parser."""
 import zai.ast_nodes as ast_nodes
 from zai.tokens import TokType
-from zai.internal_error import InternalRuntimeError
+from zai.internal_error import InternalRuntimeError, InternalTypeError, InternalStepLimitError
 from zai.env import EnvironmentStack, Scope
 from zai.lexer import Lexer
 from zai.parse import Parser
-from zai.utils import is_truthy, read_module_contents
+from zai.utils import is_truthy, memo_key, read_module_contents
 from zai.objects import (
+    ATOMIC_TYPES,
     FloatObject,
     ObjectType,
     BoolObject,
@@ -33,14 +34,18 @@ from zai.objects import (
     FuncObject,
     StringObject,
     ReturnObject,
+    TailCallObject,
     ClassDefObject,
     ClassInstanceObject,
     ContinueObject,
     BreakObject,
-    ArrayObject,
     ModuleObject,
+    new_array,
 )
 
+# Number of steps taken between two checks of the step budget.
+DEFAULT_STEP_INTERVAL = 1000
+
 
 class Visitor:
     def __init__(self, environment):
@@ -49,15 +54,90 @@ class Visitor:
         language structures.
         """
         self.env = environment
+        # Profiler notified whenever a function is entered or left.
+        self.profiler = None
+        # Every loop iteration and function call is a step. Steps are counted down
+        # from step_countdown and only once it reaches zero are they added to
+        # steps_taken and checked against max_steps.
+        self.max_steps = None
+        self.step_interval = DEFAULT_STEP_INTERVAL
+        self.steps_taken = 0
+        self.countdown_start = DEFAULT_STEP_INTERVAL
+        self.step_countdown = DEFAULT_STEP_INTERVAL
+
+    def set_step_budget(self, max_steps, step_interval=DEFAULT_STEP_INTERVAL):
+        """
+        Start counting steps from zero and raise an InternalStepLimitError once more
+        than max_steps steps are taken, or never when max_steps is None. The steps
+        taken are added up every step_interval steps.
+        """
+        self.max_steps = max_steps
+        self.step_interval = step_interval
+        self.steps_taken = 0
+        self._restart_countdown()
+
+    def step_count(self):
+        """
+        Return the number of steps taken since the step budget was set.
+        """
+        return self.steps_taken + self.countdown_start - self.step_countdown
+
+    def _restart_countdown(self):
+        countdown = self.step_interval
+        if self.max_steps is not None:
+            # Stop at the step which exceeds the budget even when it comes before the
+            # end of the interval.
+            countdown = min(countdown, self.max_steps - self.steps_taken + 1)
+        self.countdown_start = countdown
+        self.step_countdown = countdown
+
+    def _check_steps(self):
+        """
+        Add up the steps counted down since the last check once the countdown
+        reaches zero and check them against the budget.
+        """
+        self.steps_taken += self.countdown_start
+        self.countdown_start = 0
+        if self.max_steps is not None and self.steps_taken > self.max_steps:
+            raise InternalStepLimitError(self.max_steps)
+        self._restart_countdown()
 
     def visit(self, ast_root):
         """
         Main entry point for all AST roots.
         """
-        return ast_root.accept(self)
+        try:
+            return ast_root.accept(self)
+        except (InternalRuntimeError, InternalTypeError) as error:
+            self._locate_error(error)
+            raise
+
+    @staticmethod
+    def _locate_error(error):
+        """
+        Attribute a runtime error to the source position of the innermost node which
+        was being evaluated when it was raised. The node is found within the frames of
+        the visit methods recorded by the traceback, so evaluation itself does not need
+        to keep track of the current position.
+        """
+        pos = None
+        # The first frame is the one handling the error. Reading its locals would store
+        # the error within them, creating a reference cycle through the traceback which
+        # keeps every evaluated frame alive until the garbage collector runs.
+        tb = error.__traceback__.tb_next
+        while tb is not None:
+            node_pos = getattr(tb.tb_frame.f_locals.get("node"), "pos", None)
+            if node_pos is not None:
+                pos = node_pos
+            tb = tb.tb_next
+        if pos is not None:
+            error.set_location(ast_nodes.position_line(pos), ast_nodes.position_col(pos))
 
     def visit_program(self, node):
+        profiler = self.profiler
         for stmnt in node.stmnts:
+            if profiler is not None:
+                profiler.enter_statement(stmnt)
             ret_val = stmnt.accept(self)
 
             if ret_val is not None and ret_val.obj_type in [
@@ -176,8 +256,12 @@ class Visitor:
             return node.else_block.accept(self)
 
     def visit_while(self, node):
+        self._reset_invariants(node)
         cond_value = node.condition.accept(self)
         while is_truthy(cond_value):
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
             # Detect any usage of return
             ret_val = node.body.accept(self)
             if ret_val is not None:
@@ -187,12 +271,73 @@ class Visitor:
                 # There is no need to do anything here. We need to reevaluate the test
                 # condition for the loop.
                 elif ret_val.obj_type == ObjectType.CONTINUE:
-                    continue
+                    pass
                 # "return" value is floated up
                 else:
                     return ret_val
             cond_value = node.condition.accept(self)
 
+    def _iterate(self, iterable):
+        """
+        Return a Python iterator producing every value a for loop iterates over.
+        """
+        if not isinstance(iterable, Scope) and iterable.obj_type in [
+            ObjectType.ARRAY,
+            ObjectType.RANGE,
+            ObjectType.STR,
+            ObjectType.DICT,
+        ]:
+            return iter(iterable)
+        raise InternalRuntimeError("Value {} cannot be iterated over!".format(iterable))
+
+    def visit_for(self, node):
+        values = self._iterate(node.iterable.accept(self))
+        self._reset_invariants(node)
+        # The loop variable lives in a scope of its own which encloses the body. It is
+        # assigned the next value directly instead of evaluating any Zai code.
+        self.env.enter_scope(self.env.peek())
+        loop_vars = self.env.peek().scope
+        for value in values:
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
+            loop_vars[node.var_name] = value
+            ret_val = node.body.accept(self)
+            if ret_val is not None:
+                if ret_val.obj_type == ObjectType.BREAK:
+                    break
+                elif ret_val.obj_type == ObjectType.CONTINUE:
+                    pass
+                # "return" value is floated up
+                else:
+                    self.env.exit_scope()
+                    return ret_val
+
+        self.env.exit_scope()
+
+    def _reset_invariants(self, loop_node):
+        """
+        Forget the values of the expressions hoisted out of a loop which is entered
+        again since the variables they depend on may have changed in the meantime.
+        """
+        for invariant in loop_node.invariants:
+            invariant.value = None
+
+    def _store_invariant(self, node, value):
+        """
+        Remember the value of a hoisted expression until its loop is entered again.
+        """
+        # Only atomic values are reused. Arrays and class instances can be modified
+        # within the loop while still being the same object.
+        if not isinstance(value, (Scope, type(None))) and value.obj_type in ATOMIC_TYPES:
+            node.value = value
+        return value
+
+    def visit_invariant(self, node):
+        if node.value is not None:
+            return node.value
+        return self._store_invariant(node, node.expr.accept(self))
+
     def visit_print(self, node):
         print_value = node.expr.accept(self)
         print(str(print_value))
@@ -216,18 +361,13 @@ class Visitor:
     def _replace_assign_nested(self, name, val):
         pass
 
-    def visit_replace_assign(self, node):
-        symbol_namespace = None
-        symbol_name = None
-        new_value = node.value.accept(self)
-        if node.symbol_path is not None:
-            symbol_namespace = node.symbol_path.accept(self)
-        else:
-            symbol_namespace = self.env.peek()
-
-        if isinstance(node.symbol_name, ArrayAccessNode):
+    def _replace_assign(self, node, symbol_namespace, new_value, array_index=None):
+        """
+        Replace the value of the variable described by node with new_value. If the
+        variable is an array element, array_index contains the evaluated position.
+        """
+        if isinstance(node.symbol_name, ast_nodes.ArrayAccessNode):
             symbol_name = node.symbol_name.array_name.val
-            array_index = node.symbol_name.array_pos.accept(self)
             if array_index.obj_type != ObjectType.INT:
                 err_msg = 'Array cannot be "{}" !'.format(array_index.obj_type)
                 raise InternalRuntimeError(err_msg)
@@ -238,7 +378,7 @@ class Visitor:
                 raise InternalRuntimeError(err_msg)
             else:
                 if array_index.value < array_instance.size:
-                    array_instance.elements[array_index.value] = new_value
+                    array_instance.set_element(array_index.value, new_value)
                 else:
                     err_msg = '"{}" exceeds the length of the array "{}"!'.format(array_index.value, symbol_name)
                     raise InternalRuntimeError(err_msg)
@@ -262,6 +402,19 @@ class Visitor:
                     )
                     raise InternalRuntimeError(err_msg)
 
+    def visit_replace_assign(self, node):
+        symbol_namespace = None
+        new_value = node.value.accept(self)
+        if node.symbol_path is not None:
+            symbol_namespace = node.symbol_path.accept(self)
+        else:
+            symbol_namespace = self.env.peek()
+
+        array_index = None
+        if isinstance(node.symbol_name, ast_nodes.ArrayAccessNode):
+            array_index = node.symbol_name.array_pos.accept(self)
+        self._replace_assign(node, symbol_namespace, new_value, array_index)
+
     def _new_assign_local(self, name, value):
         scope = self.env.peek()
 
@@ -269,36 +422,40 @@ class Visitor:
             value = value.accept(self)
             scope.initialize_variable(name.val, value)
         else:
-            # TODO: Raise Runtime Error
-            print("Variable abc is already initialized")
+            raise InternalRuntimeError("Variable '{}' is already initialized!".format(name.val))
 
     def _new_assign_call(self):
-        # TODO: Runtime Error
-        print("Cannot assign to function call")
+        raise InternalRuntimeError("Cannot assign to a function call!")
 
     def _new_assign_nested(self, path, name, value):
         symbol_path = path.accept(self)
+        value = value.accept(self)
         if isinstance(symbol_path, Scope):
             symbol_path.initialize_variable(name.val, value)
         elif symbol_path.obj_type in [ObjectType.MODULE, ObjectType.CLASS_INSTANCE]:
             symbol_path.namespace.initialize_variable(name.val, value)
 
     def visit_new_assign(self, node):
-        if isinstance(node.name, ast_nodes.CallNode):
+        if isinstance(node.symbol_name, ast_nodes.CallNode):
             return self._new_assign_call()
-        elif isinstance(node.name, (ast_nodes.SymbolNode, ast_nodes.ArrayAccessNode)):
-            if node.path is None:
-                self._new_assign_local(node.name, node.value)
+        elif isinstance(node.symbol_name, (ast_nodes.SymbolNode, ast_nodes.ArrayAccessNode)):
+            if node.symbol_path is None:
+                self._new_assign_local(node.symbol_name, node.value)
             else:
-                self._new_assign_nested(node.path, node.name, node.value)
+                self._new_assign_nested(node.symbol_path, node.symbol_name, node.value)
         else:
-            print("This should not happen.")
+            raise InternalRuntimeError("Cannot assign to {}!".format(node.symbol_name))
 
     def visit_scope_block(self, node):
-        # Create a new scope to evaluate the current block in
-        parent_env = self.env.peek()
-        self.env.enter_scope(parent_env)
+        # Create a new scope to evaluate the current block in. Blocks which do not
+        # declare any names are evaluated within the current scope instead.
+        if node.needs_scope:
+            parent_env = self.env.peek()
+            self.env.enter_scope(parent_env)
+        profiler = self.profiler
         for stmnt in node.stmnts:
+            if profiler is not None:
+                profiler.enter_statement(stmnt)
             ret_val = stmnt.accept(self)
             # Bubble up any flow statements
             if ret_val is not None and ret_val.obj_type in [
@@ -306,22 +463,28 @@ class Visitor:
                 ObjectType.BREAK,
                 ObjectType.CONTINUE,
             ]:
-                self.env.exit_scope()
+                if node.needs_scope:
+                    self.env.exit_scope()
                 return ret_val
 
-        self.env.exit_scope()
+        if node.needs_scope:
+            self.env.exit_scope()
 
     def visit_switch(self, node):
         # Evaluate the condition used for testing all cases
         test_cond = node.switch_cond.accept(self)
 
-        # Find the index of the first switch case which is true.
-        start_case_idx = None
-        for idx, switch_case in enumerate(node.switch_cases):
-            case_cond = switch_case[0].accept(self)
-            if is_truthy(case_cond == test_cond):
-                start_case_idx = idx
-                break
+        # Find the index of the first switch case which is true. If none of them is,
+        # only the default case is executed.
+        if node.jump_table is not None:
+            start_case_idx = self._switch_jump(node, test_cond)
+        else:
+            start_case_idx = len(node.switch_cases)
+            for idx, switch_case in enumerate(node.switch_cases):
+                case_cond = switch_case[0].accept(self)
+                if case_cond.raw_equals(test_cond):
+                    start_case_idx = idx
+                    break
 
         # Execute all switch cases after that until we encounter a "break" keyword
         # or a "return"/"continue" keywords.
@@ -337,10 +500,26 @@ class Visitor:
         if node.default_case is not None:
             return node.default_case.accept(self)
 
+    def _switch_jump(self, node, test_cond):
+        """
+        Find the index of the case matching test_cond using the jump table of a switch
+        statement whose case labels are all literals.
+        """
+        no_match_idx = len(node.switch_cases)
+        if isinstance(test_cond, Scope) or test_cond.obj_type not in [
+            ObjectType.INT,
+            ObjectType.STR,
+            ObjectType.BOOL,
+        ]:
+            return no_match_idx
+        return node.jump_table.get((test_cond.obj_type, test_cond.value), no_match_idx)
+
     def visit_func_def(self, node):
         curr_scope = self.env.peek()
         # Register the function in the current frame
-        curr_scope.initialize_variable(node.name, FuncObject(node.name, node.args, node.body, curr_scope))
+        curr_scope.initialize_variable(
+            node.name, FuncObject(node.name, node.args, node.body, curr_scope, node.frame_layout)
+        )
 
     def visit_class_def(self, node):
         """
@@ -352,10 +531,10 @@ class Visitor:
         curr_scope.initialize_variable(node.class_name, ClassDefObject(node.class_name, node.class_methods))
 
     def __run_native_function(self, func_object, call_args):
-        if func_object.arity != len(call_args):
+        if not func_object.accepts_arg_count(len(call_args)):
             raise InternalRuntimeError(
                 "Function '{}' accepts only {} arguments but {} were given".format(
-                    func_object.name, func_object.arity, len(call_args)
+                    func_object.name, func_object.arity_str(), len(call_args)
                 )
             )
 
@@ -366,27 +545,58 @@ class Visitor:
 
         # Using the "*" operator will destructure the list of evaluated internal object
         # arguments into the arguments which the function accepts.
-        return func_object.body(*evaluated_args)
-
-    def __run_internal_function(self, func_object, call_args):
+        if self.profiler is None:
+            return func_object.body(*evaluated_args)
+        self.profiler.enter_function(func_object)
+        try:
+            return func_object.body(*evaluated_args)
+        finally:
+            self.profiler.exit_function()
+
+    def _check_arity(self, func_object, arg_count):
         """
-        Runs the function represented by func_object. The arguments passed are supplied
-        by the call_args in the form of a list.
+        Raise an error if a function is called with the wrong number of arguments.
         """
-        # Evaluate the arguments
-        arg_values = list()
-        for arg in call_args:
-            val = arg.accept(self)
-            arg_values.append(val)
-
-        if len(arg_values) != func_object.arity:
+        if arg_count != func_object.arity:
             msg = 'function "{}" accepts only {} arguments but {} were given!'.format(
                 func_object.name,
                 func_object.arity,
-                len(arg_values),
+                arg_count,
             )
             raise InternalRuntimeError(msg)
 
+    def _acquire_record(self, func_object):
+        """
+        Take an activation record from the pool of func_object and fill in the
+        reference to "this" for class methods.
+        """
+        pool = func_object.frame_pool
+        if func_object.obj_type == ObjectType.FUNC:
+            if pool.idle_records:
+                record = pool.idle_records.pop()
+                record.parent = func_object.env
+                return record
+            return pool.acquire(func_object.env)
+
+        record = pool.acquire(func_object.class_env)
+        record.scope["this"] = func_object.class_env
+        return record
+
+    def _enter_function(self, func_object, arg_values):
+        """
+        Create the scope used to execute the body of func_object and bind the
+        evaluated arguments within it.
+        """
+        self._check_arity(func_object, len(arg_values))
+
+        if func_object.frame_pool is not None:
+            record = self._acquire_record(func_object)
+            slots = record.scope
+            for name, value in zip(func_object.arg_names, arg_values):
+                slots[name] = value
+            self.env.push_scope(record)
+            return
+
         if func_object.obj_type == ObjectType.FUNC:
             # Create a new scope
             self.env.enter_scope(func_object.env)
@@ -398,63 +608,165 @@ class Visitor:
         for arg_pair in zip(func_object.args, arg_values):
             self.env.peek().initialize_variable(arg_pair[0].lexeme, arg_pair[1])
 
-        for stmnt in func_object.body:
-            ret_val = stmnt.accept(self)
-            if ret_val is not None and ret_val.obj_type in [
-                ObjectType.RETURN,
-                ObjectType.BREAK,
-                ObjectType.CONTINUE,
-            ]:
-                if ret_val.obj_type == ObjectType.RETURN:
-                    return ret_val
-                elif ret_val.obj_type == ObjectType.BREAK:
-                    msg = '"break" statement not used within a loop or a switch block!'
-                    raise InternalRuntimeError(msg)
-                elif ret_val.obj_type == ObjectType.CONTINUE:
-                    msg = '"continue" statement not used within a loop!'
-                    raise InternalRuntimeError(msg)
+    def _exit_function(self, func_object):
+        """
+        Remove the scope of a finished call of func_object from the scope stack.
+        """
+        record = self.env.peek()
+        self.env.exit_scope()
+        if func_object.frame_pool is not None:
+            func_object.frame_pool.release(record)
+
+    def _function_flow(self, ret_val):
+        """
+        Inspect the value produced by a statement within a function body. Return
+        values are passed back while "break" and "continue" raise an error.
+        """
+        if ret_val is not None and ret_val.obj_type in [
+            ObjectType.RETURN,
+            ObjectType.BREAK,
+            ObjectType.CONTINUE,
+        ]:
+            if ret_val.obj_type == ObjectType.RETURN:
+                return ret_val
+            elif ret_val.obj_type == ObjectType.BREAK:
+                msg = '"break" statement not used within a loop or a switch block!'
+                raise InternalRuntimeError(msg)
+            elif ret_val.obj_type == ObjectType.CONTINUE:
+                msg = '"continue" statement not used within a loop!'
+                raise InternalRuntimeError(msg)
         return None
 
+    def __run_internal_function(self, func_object, call_args, arg_values=None):
+        """
+        Runs the function represented by func_object. The arguments passed are supplied
+        by the call_args in the form of a list, unless they have already been evaluated
+        into arg_values.
+        """
+        if arg_values is not None:
+            self._enter_function(func_object, arg_values)
+        elif func_object.frame_pool is not None:
+            # The arguments are evaluated straight into the slots of the activation
+            # record. It is placed on the scope stack only once all of them are known
+            # so they are still evaluated within the scope of the caller.
+            if len(call_args) != func_object.arity:
+                self._check_arity(func_object, len(call_args))
+            record = self._acquire_record(func_object)
+            slots = record.scope
+            for name, arg in zip(func_object.arg_names, call_args):
+                slots[name] = arg.accept(self)
+            self.env.push_scope(record)
+        else:
+            # Evaluate the arguments
+            arg_values = list()
+            for arg in call_args:
+                val = arg.accept(self)
+                arg_values.append(val)
+
+            self._enter_function(func_object, arg_values)
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter_function(func_object)
+
+        while True:
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
+            ret_val = None
+            for stmnt in func_object.body:
+                if profiler is not None:
+                    profiler.enter_statement(stmnt)
+                ret_val = stmnt.accept(self)
+                if ret_val is not None:
+                    ret_val = self._function_flow(ret_val)
+                    if ret_val is not None:
+                        break
+
+            if profiler is not None:
+                profiler.exit_function()
+
+            if not isinstance(ret_val, TailCallObject):
+                self._exit_function(func_object)
+                return ret_val
+
+            # The function returned the result of another call. The frame of the current
+            # function is no longer needed so it is replaced by the frame of the callee
+            # instead of growing the call stack.
+            self._exit_function(func_object)
+            func_object = ret_val.func_object
+            self._enter_function(func_object, ret_val.arg_values)
+            if profiler is not None:
+                profiler.enter_function(func_object)
+
     def visit_call(self, node):
         call_object = node.object_name.accept(self)
+        return self._call(call_object, node.call_args)
 
+    def _call(self, call_object, call_args):
+        """
+        Call an evaluated callable object with the arguments represented by the
+        nodes in call_args.
+        """
         # Case of function object
         if call_object.obj_type in [ObjectType.FUNC, ObjectType.CLASS_METHOD]:
-            ret_val = self.__run_internal_function(call_object, node.call_args)
-            self.env.exit_scope()
+            ret_val = self.__run_internal_function(call_object, call_args)
             if ret_val is None or ret_val.value is None:
                 return NilObject()
             else:
                 return ret_val.value
 
         elif call_object.obj_type == ObjectType.NATIVE_FUNC:
-            return self.__run_native_function(call_object, node.call_args)
+            return self.__run_native_function(call_object, call_args)
+
+        elif call_object.obj_type == ObjectType.MEMO_FUNC:
+            return self._call_memoized(call_object, call_args)
 
         elif call_object.obj_type == ObjectType.CLASS_DEF:
-            instance_ptr = ClassInstanceObject(call_object.class_name, call_object.class_methods)
+            instance_ptr = ClassInstanceObject(call_object)
             # Enter new scope to register "this" namespace
             self.env.enter_scope(instance_ptr.namespace)
             self.env.peek().initialize_variable("this", instance_ptr.namespace)
 
             class_constructor = instance_ptr.get_field("constructor")
-            if class_constructor is None and len(node.call_args) != 0:
+            if class_constructor is None and len(call_args) != 0:
                 raise InternalRuntimeError(
                     (
                         "Class '{}' does not have a constructor method but "
                         "initialization detected {} arguments passed."
-                    ).format(call_object.class_name, len(node.call_args))
+                    ).format(call_object.class_name, len(call_args))
                 )
             elif class_constructor is not None:
-                self.__run_internal_function(class_constructor, node.call_args)
+                self.__run_internal_function(class_constructor, call_args)
 
             self.env.exit_scope()
             return instance_ptr
         else:
             raise InternalRuntimeError("Object is not callable!")
 
-    def visit_dot_node(self, node):
-        left = node.left.accept(self)
-
+    def _call_memoized(self, memo_object, call_args):
+        """
+        Call the function wrapped by a memoized function object unless the result of
+        a call with equal arguments is cached.
+        """
+        arg_values = list()
+        for arg in call_args:
+            arg_values.append(arg.accept(self))
+
+        key = memo_key(arg_values)
+        result = memo_object.lookup(key)
+        if result is None:
+            ret_val = self.__run_internal_function(memo_object.func, call_args, arg_values)
+            result = NilObject() if ret_val is None or ret_val.value is None else ret_val.value
+            if key is not None:
+                memo_object.store(key, result)
+        return result
+
+    def _property_access(self, node, left):
+        """
+        Retrieve the property named by node from the evaluated left side of a
+        property access.
+        """
         if isinstance(left, Scope):
             val = left.get_variable(node.right.val)
             if val is not None:
@@ -482,7 +794,11 @@ class Visitor:
             err_msg = "variable {} is not accessible!".format(node.left.val)
             raise InternalRuntimeError(err_msg)
 
-    def visit_this(self):
+    def visit_dot_node(self, node):
+        left = node.left.accept(self)
+        return self._property_access(node, left)
+
+    def visit_this(self, node):
         curr_scope = self.env.peek()
         while curr_scope.parent is not None:
             curr_scope = curr_scope.parent
@@ -492,16 +808,26 @@ class Visitor:
         if node.expr is None:
             return ReturnObject(NilObject())
 
+        if node.tail_call:
+            call_object = node.expr.object_name.accept(self)
+            if call_object.obj_type in [ObjectType.FUNC, ObjectType.CLASS_METHOD]:
+                arg_values = list()
+                for arg in node.expr.call_args:
+                    arg_values.append(arg.accept(self))
+                return TailCallObject(call_object, arg_values)
+            return ReturnObject(self._call(call_object, node.expr.call_args))
+
         return_val = node.expr.accept(self)
         return ReturnObject(return_val)
 
-    def visit_continue(self):
+    def visit_continue(self, node):
         return ContinueObject()
 
-    def visit_break(self):
+    def visit_break(self, node):
         return BreakObject()
 
     def visit_do_while(self, node):
+        self._reset_invariants(node)
         # First execution of the body which always happens
         ret_val = node.body.accept(self)
         if ret_val is not None:
@@ -519,6 +845,9 @@ class Visitor:
         # Subsequent executions which depend on the ocndition
         cond_value = node.cond.accept(self)
         while is_truthy(cond_value):
+            self.step_countdown -= 1
+            if self.step_countdown == 0:
+                self._check_steps()
             # Detect any usage of return
             ret_val = node.body.accept(self)
             if ret_val is not None:
@@ -528,7 +857,7 @@ class Visitor:
                 # There is no need to do anything here. We need to reevaluate the test
                 # condition for the loop.
                 elif ret_val.obj_type == ObjectType.CONTINUE:
-                    continue
+                    pass
                 # "return" value is floated up
                 else:
                     return ret_val
@@ -540,11 +869,12 @@ class Visitor:
             elem_val = elem.accept(self)
             eval_elem.append(elem_val)
 
-        return ArrayObject(eval_elem)
+        return new_array(eval_elem)
 
-    def visit_array_access(self, node):
-        array_obj = node.array_name.accept(self)
-        array_idx = node.array_pos.accept(self)
+    def _array_access(self, array_obj, array_idx):
+        """
+        Retrieve the element at position array_idx of array_obj.
+        """
         if array_obj.obj_type != ObjectType.ARRAY:
             err_str = "Object is not an array and cannot be accessed using '[]'!"
             raise InternalRuntimeError(err_str)
@@ -552,11 +882,16 @@ class Visitor:
             err_str = "Array index is not a number but a '{}'!".format(str(array_idx.obj_type))
             raise InternalRuntimeError(err_str)
         if array_idx.value < array_obj.size:
-            return array_obj.elements[array_idx.value]
+            return array_obj.get_element(array_idx.value)
         else:
             msg = "Array has a size of {} but you want to access position {}".format(array_obj.size, array_idx.value)
             raise InternalRuntimeError(msg)
 
+    def visit_array_access(self, node):
+        array_obj = node.array_name.accept(self)
+        array_idx = node.array_pos.accept(self)
+        return self._array_access(array_obj, array_idx)
+
     def visit_incr(self, node):
         node_val = node.value.accept(self)
         node_val.value += 1
@@ -567,7 +902,7 @@ class Visitor:
         node_val.value -= 1
         return node_val
 
-    def visit_nil(self):
+    def visit_nil(self, node):
         return NilObject()
 
     def visit_import(self, node):
@@ -601,72 +936,45 @@ class Visitor:
             ModuleObject(node.module_name, module_path, import_scope, module_env_name),
         )
 
+    def _augmented_assign(self, symbol_name, symbol_path, new_value, op):
+        """
+        Combine the current value of a variable with new_value using the operator
+        op("+" or "-") and store the result back into the variable. The variable is
+        looked up within symbol_path if one is provided or the current scope otherwise.
+        """
+        if symbol_path is None or isinstance(symbol_path, Scope):
+            namespace = self.env.peek() if symbol_path is None else symbol_path
+        elif symbol_path.obj_type in [ObjectType.MODULE, ObjectType.CLASS_INSTANCE]:
+            namespace = symbol_path.namespace
+        else:
+            return
+
+        old_val = namespace.get_variable(symbol_name)
+        if old_val is None:
+            err_msg = ('Variable "{}" cannot be reasigned because it does not exist' " within the environment.").format(
+                symbol_name
+            )
+            raise InternalRuntimeError(err_msg)
+
+        if op == TokType.PLUS:
+            namespace.replace_variable(symbol_name, old_val + new_value)
+        elif op == TokType.MINUS:
+            namespace.replace_variable(symbol_name, old_val - new_value)
+
     def visit_add_assign(self, node):
-        # Symbol name will always be an id node
-        symbol_name = node.symbol_name.val
         # Evaluate the right hand side containing the value which will be assigned
         new_value = node.increment.accept(self)
-
         # Find if a path to the variable exists
         symbol_path = None
-        if node.symbol_path is None:
-            current_scope = self.env.peek()
-            old_val = current_scope.get_variable(symbol_name)
-            status = current_scope.replace_variable(symbol_name, old_val + new_value)
-            if status is False:
-                err_msg = (
-                    'Variable "{}" cannot be reasigned because it does not exist' " within the environment."
-                ).format(symbol_name)
-                raise InternalRuntimeError(err_msg)
-        else:
+        if node.symbol_path is not None:
             symbol_path = node.symbol_path.accept(self)
-            if isinstance(symbol_path, Scope):
-                old_val = symbol_path.get_variable(symbol_name)
-                status = symbol_path.replace_variable(symbol_name, old_val + new_value)
-                if status is False:
-                    err_msg = (
-                        'Variable "{}" cannot be reasigned because it does not'
-                        "exist within the current class environment."
-                    ).format(symbol_name)
-                    raise InternalRuntimeError(err_msg)
-            elif symbol_path.obj_type in [ObjectType.MODULE, ObjectType.CLASS_INSTANCE]:
-                old_val = symbol_path.namespace.get_variable(symbol_name)
-                status = symbol_path.namespace.replace_variable(symbol_name, old_val + new_value)
-                if status is False:
-                    err_msg = ('Variable "{}" cannot be reasigned because it does not ' "exist.").format(symbol_name)
-                    raise InternalRuntimeError(err_msg)
+        self._augmented_assign(node.symbol_name.val, symbol_path, new_value, TokType.PLUS)
 
     def visit_sub_assign(self, node):
-        # Symbol name will always be an id node
-        symbol_name = node.symbol_name.val
         # Evaluate the right hand side containing the value which will be assigned
         new_value = node.decrement.accept(self)
-
         # Find if a path to the variable exists
         symbol_path = None
-        if node.symbol_path is None:
-            current_scope = self.env.peek()
-            old_val = current_scope.get_variable(symbol_name)
-            status = current_scope.replace_variable(symbol_name, old_val - new_value)
-            if status is False:
-                err_msg = (
-                    'Variable "{}" cannot be reasigned because it does not exist' " within the  environment."
-                ).format(symbol_name)
-                raise InternalRuntimeError(err_msg)
-        else:
+        if node.symbol_path is not None:
             symbol_path = node.symbol_path.accept(self)
-            if isinstance(symbol_path, Scope):
-                old_val = symbol_path.get_variable(symbol_name)
-                status = symbol_path.replace_variable(symbol_name, old_val - new_value)
-                if status is False:
-                    err_msg = (
-                        'Variable "{}" cannot be reasigned because it does not '
-                        "exist within the current class environment."
-                    ).format(symbol_name)
-                    raise InternalRuntimeError(err_msg)
-            elif symbol_path.obj_type in [ObjectType.MODULE, ObjectType.CLASS_INSTANCE]:
-                old_val = symbol_path.namespace.get_variable(symbol_name)
-                status = symbol_path.namespace.replace_variable(symbol_name, old_val - new_value)
-                if status is False:
-                    err_msg = ('Variable "{}" cannot be reasigned because it does not ' "exist.").format(symbol_name)
-                    raise InternalRuntimeError(err_msg)
+        self._augmented_assign(node.symbol_name.val, symbol_path, new_value, TokType.MINUS)
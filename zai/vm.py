@@ -19,7 +19,12 @@
 from zai.lexer import Lexer
 from zai.env import EnvironmentStack
 from zai.parse import Parser
-from zai.visitor import Visitor
+from zai.visitor import Visitor, DEFAULT_STEP_INTERVAL
+from zai.stack_visitor import StackVisitor, DEFAULT_MAX_CALL_DEPTH
+from zai.tracing import TracingVisitor, TracingStackVisitor
+from zai.optimize import Optimizer
+from zai.timings import count_nodes
+from zai.memory import MemoryQuota
 from zai.internal_error import (
     InternalRuntimeError,
     InternalTypeError,
@@ -27,9 +32,11 @@ from zai.internal_error import (
     InternalParseError,
 )
 
+import asyncio
 import atexit
 import os
 import readline
+from contextlib import nullcontext
 
 
 class YaplVm:
@@ -38,12 +45,90 @@ class YaplVm:
     is evaluate within the same context.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        explicit_stack=False,
+        max_call_depth=DEFAULT_MAX_CALL_DEPTH,
+        optimize=True,
+        profiler=None,
+        sampler=None,
+        timings=None,
+        allocations=None,
+        hooks=None,
+        max_steps=None,
+        step_interval=DEFAULT_STEP_INTERVAL,
+        memory_limit=None,
+    ):
+        """
+        Keyword Arguments:
+        explicit_stack -- Evaluate code using an explicit call stack instead of Python
+                          recursion which allows for much deeper recursion.
+        max_call_depth -- Maximum depth of the call stack when explicit_stack is used.
+        optimize       -- Optimize the AST before evaluating it.
+        profiler       -- Profiler measuring the time spent within each function
+                          while run_string evaluates code.
+        sampler        -- SamplingProfiler sampling the call stack while run_string
+                          evaluates code.
+        timings        -- PhaseTimings measuring the time spent within each phase of
+                          run_string along with the work done by it.
+        allocations    -- AllocationTracker recording the objects created while
+                          run_string executes code.
+        hooks          -- ExecutionHooks notified of the calls, statements and errors
+                          of the evaluated code(see set_hooks).
+        max_steps      -- Maximum number of loop iterations and function calls a
+                          single evaluation may take before it is stopped by a
+                          runtime error, or None for no limit.
+        step_interval  -- Number of steps taken between two checks of max_steps.
+        memory_limit   -- Maximum number of bytes(approximately) the strings, arrays,
+                          dictionaries and scopes created by the evaluated code may
+                          hold at once before a runtime error is raised, or None for
+                          no limit.
+        """
         self.env = EnvironmentStack()
+        self.optimizer = Optimizer(hoist_invariants=optimize)
         self.repl_mode_flag = False
-        self.visitor = Visitor(self.env)
+        self.explicit_stack = explicit_stack
+        self.max_call_depth = max_call_depth
+        self.profiler = profiler
+        self.max_steps = max_steps
+        self.step_interval = step_interval
+        self.memory_quota = None
+        if memory_limit is not None:
+            self.memory_quota = MemoryQuota(memory_limit)
+        self.set_hooks(hooks)
+        self.sampler = sampler
+        self.timings = timings
+        self.allocations = allocations
         self.current_completions = None
 
+    def set_hooks(self, hooks):
+        """
+        Install the ExecutionHooks notified while code is evaluated, or remove the
+        installed ones when hooks is None. Hooks are notified by an instrumented
+        visitor which replaces the current one only while hooks are installed, so
+        evaluating code without hooks costs nothing extra. Hooks should only be
+        changed between two evaluations.
+        """
+        self.hooks = hooks
+        self.visitor = self._new_visitor(self.explicit_stack)
+
+    def _new_visitor(self, explicit_stack):
+        """
+        Create a visitor evaluating code within the environment of the VM which
+        notifies the hooks and the profiler of the VM.
+        """
+        if explicit_stack:
+            if self.hooks is None:
+                visitor = StackVisitor(self.env, self.max_call_depth)
+            else:
+                visitor = TracingStackVisitor(self.env, self.hooks, self.max_call_depth)
+        elif self.hooks is None:
+            visitor = Visitor(self.env)
+        else:
+            visitor = TracingVisitor(self.env, self.hooks)
+        visitor.profiler = self.profiler
+        return visitor
+
     def _load_stdlib(self):
         """
         Load both the standard library in the environment of the current VM instance.
@@ -55,6 +140,15 @@ class YaplVm:
         for func in native_functions:
             curr_scope.initialize_variable(func.name, func)
 
+    def _recursion_error_msg(self):
+        """
+        Produce the message displayed when the Python call stack overflows while
+        evaluating code recursively.
+        """
+        return InternalRuntimeError(
+            "Maximum recursion depth exceeded! Use the explicit call stack to allow deeper recursion."
+        )
+
     def _setup_readline(self):
         history_file = os.path.join(os.path.expanduser("~"), ".zai_history")
         try:
@@ -67,19 +161,28 @@ class YaplVm:
 
     def run_repl(self):
         """
-        Start a REPL which evaluates every command provided within one VM context.
+        Start a REPL which evaluates every command provided within one VM context
+        until the end of the input is reached. The instruments of the VM measure the
+        evaluation of every command, so their reports cover the whole session.
         """
         self.repl_mode_flag = True
         self._load_stdlib()
         self._setup_readline()
         while True:
-            lexer = Lexer()
             try:
-                str_input = input(">> ")
-                tok_stream = lexer.tokenize_string(str_input)
-                parser = Parser(tok_stream, str_input)
-                root = parser.parse()
-                val = self.visitor.visit(root)
+                try:
+                    str_input = input(">> ")
+                except EOFError:
+                    print()
+                    return
+                root = self._compile(str_input)
+                self._start_instruments(str_input)
+                self.visitor.set_step_budget(self.max_steps, self.step_interval)
+                try:
+                    with self._phase("execute"), self._quota():
+                        val = self.visitor.visit(root)
+                finally:
+                    self._stop_instruments()
                 if val is not None:
                     print(str(val))
             except InternalRuntimeError as e:
@@ -90,18 +193,117 @@ class YaplVm:
                 print(e)
             except InternalParseError as e:
                 print(e)
+            except RecursionError:
+                print(self._recursion_error_msg())
 
-    def run_string(self, input_str):
+    def _phase(self, name):
         """
-        Run a single string within the current VM context.
+        Return a context manager measuring the named phase when timings are enabled.
+        """
+        if self.timings is None:
+            return nullcontext()
+        return self.timings.phase(name)
+
+    def _quota(self):
+        """
+        Return a context manager charging the objects created to the memory quota of
+        the VM when it has one.
+        """
+        if self.memory_quota is None:
+            return nullcontext()
+        return self.memory_quota.activate()
+
+    def _compile(self, input_str):
+        """
+        Lex, parse and optimize a string and return the root of its AST.
         """
-        self._load_stdlib()
         lexer = Lexer()
-        try:
+        with self._phase("lex"):
             tok_stream = lexer.tokenize_string(input_str)
+        with self._phase("parse"):
             parser = Parser(tok_stream, input_str)
             root = parser.parse()
-            self.visitor.visit(root)
+        with self._phase("optimize"):
+            root = self.optimizer.optimize(root)
+        if self.timings is not None:
+            self.timings.count("tokens", len(tok_stream))
+            self.timings.count("ast_nodes", count_nodes(root))
+        return root
+
+    def _start_instruments(self, input_str):
+        if self.profiler is not None:
+            self.profiler.start(input_str)
+        if self.sampler is not None:
+            self.sampler.start()
+        if self.allocations is not None:
+            self.allocations.start(input_str)
+
+    def _stop_instruments(self):
+        if self.allocations is not None:
+            self.allocations.stop()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def run_string(self, input_str):
+        """
+        Run a single string within the current VM context.
+        """
+        self._load_stdlib()
+        try:
+            root = self._compile(input_str)
+            self._start_instruments(input_str)
+            self.visitor.set_step_budget(self.max_steps, self.step_interval)
+            try:
+                with self._phase("execute"), self._quota():
+                    self.visitor.visit(root)
+            finally:
+                self._stop_instruments()
+        except InternalRuntimeError as e:
+            print(e)
+        except InternalTypeError as e:
+            print(e)
+        except InternalTokenError as e:
+            print(e)
+        except InternalParseError as e:
+            print(e)
+        except RecursionError:
+            print(self._recursion_error_msg())
+
+    async def run_string_async(self, input_str, slice_steps=None):
+        """
+        Run a single string within the current VM context like run_string does, while
+        letting other tasks of the asyncio event loop run every slice_steps steps(loop
+        iterations and function calls, default: the step interval of the VM). The
+        code is always evaluated using an explicit call stack, which can be suspended
+        between two slices. Lexing and parsing the string is not split into slices.
+        Only a single string may be evaluated by a VM at a time.
+        """
+        self._load_stdlib()
+        visitor = self.visitor
+        if not self.explicit_stack:
+            visitor = self._new_visitor(True)
+        if slice_steps is None:
+            slice_steps = self.step_interval
+        try:
+            root = self._compile(input_str)
+            self._start_instruments(input_str)
+            visitor.set_step_budget(self.max_steps, slice_steps)
+            slices = visitor.visit_slices(root)
+            try:
+                while True:
+                    # The memory quota is only active while the VM evaluates code, so
+                    # other VMs running in between are charged to their own quotas.
+                    with self._phase("execute"), self._quota():
+                        try:
+                            next(slices)
+                        except StopIteration:
+                            break
+                    await asyncio.sleep(0)
+            finally:
+                slices.close()
+                self._stop_instruments()
         except InternalRuntimeError as e:
             print(e)
         except InternalTypeError as e: